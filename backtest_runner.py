@@ -0,0 +1,313 @@
+"""
+Backtest Runner - One strategy over many assets / CSV files in parallel
+Per-asset backtests fan out over a process pool and merge into a portfolio summary
+
+Targets are (asset, timeframe) series of the historical dataset ("all" =
+every series) and/or individual CSV files. Workers receive only the target
+name: dataset series are sliced from the memory-mapped dataset block, CSV
+files are read by the worker, so no candles are pickled.
+
+Every target trades its own initial_balance account. The portfolio is the
+sum of those accounts: its drawdown is measured on the combined equity
+curve, with trades from all targets ordered by settle time.
+
+CLI:
+    python backtest_runner.py --strategy "RSI Reversal" --assets all --timeframe 60
+    python backtest_runner.py --strategy my_strategy.json --files data_5m/GBPUSD_2024_2_6_6.csv --limit 150
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backtesting_engine import get_backtest_engine
+from historical_data import asset_key, merge_series, read_csv, slice_candles
+
+# (label, asset or None, period, csv path or None)
+Target = Tuple[str, Optional[str], int, Optional[str]]
+
+# A spawned worker takes ~0.5 s to start (interpreter, numpy, dataset map) - about
+# 900 backtests of one target - so each one needs at least this many to pay off
+MIN_RUNS_PER_WORKER = 2000
+
+
+def resolve_targets(assets=None, files: Optional[List[str]] = None,
+                    periods: Optional[List[int]] = None) -> List[Target]:
+    """
+    Backtest targets for asset names (list or comma-separated, 'all' = every series) and CSV paths
+
+    periods limits the timeframes of both (None = all the asset has); a CSV's timeframe is
+    its directory. Paths must be CSV files inside the data_1m/ or data_5m/ directory
+    (ValueError otherwise).
+    """
+    engine = get_backtest_engine()
+    dataset = engine.dataset
+    targets = []
+
+    if isinstance(assets, str):
+        assets = [asset.strip() for asset in assets.split(',') if asset.strip()]
+    if assets:
+        if 'all' in assets:
+            series = sorted(dataset.load().series)
+        else:
+            wanted = {asset_key(asset) for asset in assets}
+            series = sorted(key for key in dataset.load().series if key[0] in wanted)
+        for asset, period in series:
+            if not periods or period in periods:
+                targets.append((f"{asset}/{period}", asset, period, None))
+
+    data_dirs = {os.path.realpath(engine.data_dir_1m): 60, os.path.realpath(engine.data_dir_5m): 300}
+    for path in files or []:
+        real = os.path.realpath(path)
+        period = data_dirs.get(os.path.dirname(real))
+        if period is None or not real.lower().endswith('.csv') or not os.path.isfile(real):
+            raise ValueError(f"Not a CSV file in {engine.data_dir_1m}/ or {engine.data_dir_5m}/: {path}")
+        if periods and period not in periods:
+            continue
+        targets.append((os.path.normpath(path), None, period, real))
+
+    return targets
+
+
+def load_target(target: Target, options: Dict) -> np.ndarray:
+    """(n, 5) candles of a target, within options' start / end / limit"""
+    label, asset, period, path = target
+    start, end, limit = options.get('start'), options.get('end'), options.get('limit')
+    if path:
+        return slice_candles(merge_series([read_csv(path)]), start, end, limit)
+    return get_backtest_engine().load_candles(asset, period, start, end, limit)
+
+
+def run_target(strategy_config: Dict, target: Target, options: Dict,
+               candles: Optional[np.ndarray] = None, indicator_memo: Optional[Dict] = None) -> Dict:
+    """Backtest one target (runs in a worker process)"""
+    if candles is None:
+        candles = load_target(target, options)
+
+    result = get_backtest_engine().backtest_strategy(
+        strategy_config,
+        candles,
+        initial_balance=options.get('initial_balance', 100.0),
+        payout_percent=options.get('payout_percent', 85.0),
+        min_data_quality=options.get('min_data_quality', 0.8),
+        equity_curve=True,
+        indicator_memo=indicator_memo,
+        period=target[2]
+    )
+    result['candles'] = len(candles)
+    return result
+
+
+def _run_chunk(strategy_config: Dict, targets: List[Target], options: Dict) -> List[Tuple[str, Dict]]:
+    results = []
+    for target in targets:
+        try:
+            results.append((target[0], run_target(strategy_config, target, options)))
+        except Exception as e:
+            results.append((target[0], target_error(e)))
+    return results
+
+
+def target_error(error: Exception) -> Dict:
+    """Per-target error result - the exception type only, its message can quote file contents"""
+    return {'error': f'Backtest failed ({type(error).__name__})', 'total_trades': 0}
+
+
+def worker_count(workers: int, jobs: int, runs: Optional[int] = None) -> int:
+    """
+    workers=0: one per CPU core, never more than there are jobs
+
+    runs (single-target backtests the jobs add up to) also caps the pool at one
+    worker per MIN_RUNS_PER_WORKER, so small grids run in-line.
+    """
+    count = min(max(1, workers or os.cpu_count() or 1), max(1, jobs))
+    if runs is not None:
+        count = min(count, max(1, runs // MIN_RUNS_PER_WORKER))
+    return count
+
+
+def process_pool(workers: int) -> ProcessPoolExecutor:
+    # 'spawn': the bot process runs Flask/Selenium threads, which fork() does not copy safely
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def portfolio_curve(curves: List[List[List[float]]], initial_balance: float) -> List[List[float]]:
+    """[[settle timestamp, summed balance], ...] of the accounts, trades of all curves in settle-time order"""
+    events = sorted((ts, index, balance) for index, curve in enumerate(curves) for ts, balance in curve)
+    balances = [initial_balance] * len(curves)
+    equity = initial_balance * len(curves)
+    combined = []
+    for ts, index, balance in events:
+        equity += balance - balances[index]
+        balances[index] = balance
+        combined.append([ts, equity])
+    return combined
+
+
+def curve_drawdown(curve: List[List[float]], starting: float) -> float:
+    """Max drawdown (%) of an equity curve that starts at `starting`"""
+    peak = starting
+    max_drawdown = 0.0
+    for _, equity in curve:
+        if equity > peak:
+            peak = equity
+        elif peak > 0:
+            max_drawdown = max(max_drawdown, (peak - equity) / peak * 100)
+    return max_drawdown
+
+
+def portfolio_drawdown(curves: List[List[List[float]]], initial_balance: float) -> float:
+    """Max drawdown (%) of the summed accounts, trades of all curves in settle-time order"""
+    return curve_drawdown(portfolio_curve(curves, initial_balance), initial_balance * len(curves))
+
+
+def merge_results(results: List[Tuple[str, Dict]], initial_balance: float) -> Dict:
+    """Portfolio summary + per-target breakdown"""
+    per_asset = {}
+    errors = {}
+    curves = []
+    wins = losses = 0
+    gross_profit = gross_loss = total_profit = 0.0
+
+    for label, result in results:
+        if 'error' in result:
+            errors[label] = result['error']
+            continue
+        wins += result['wins']
+        losses += result['losses']
+        gross_profit += result['gross_profit']
+        gross_loss += result['gross_loss']
+        total_profit += result['total_profit']
+        curves.append(result['equity_curve'])
+        per_asset[label] = {
+            'candles': result['candles'],
+            'total_trades': result['total_trades'],
+            'wins': result['wins'],
+            'losses': result['losses'],
+            'win_rate': round(result['win_rate'], 2),
+            'total_profit': result['total_profit'],
+            'profit_factor': result['profit_factor'],
+            'max_drawdown': result['max_drawdown'],
+        }
+
+    total_trades = wins + losses
+    starting = initial_balance * len(per_asset)
+    return {
+        'targets': len(results),
+        'assets_tested': len(per_asset),
+        'total_trades': total_trades,
+        'wins': wins,
+        'losses': losses,
+        'win_rate': round(wins / total_trades * 100, 2) if total_trades else 0.0,
+        'initial_balance': starting,
+        'final_balance': round(starting + total_profit, 2),
+        'total_profit': round(total_profit, 2),
+        'profit_percent': round(total_profit / starting * 100, 2) if starting else 0.0,
+        'profit_factor': round(gross_profit / gross_loss, 2) if gross_loss > 0 else 0,
+        'gross_profit': round(gross_profit, 4),
+        'gross_loss': round(gross_loss, 4),
+        'max_drawdown': round(portfolio_drawdown(curves, initial_balance), 2),
+        'worst_asset_drawdown': max((stats['max_drawdown'] for stats in per_asset.values()), default=0.0),
+        'per_asset': per_asset,
+        'errors': errors,
+    }
+
+
+def run_backtests(strategy_config: Dict, targets: List[Target], workers: int = 0,
+                  start=None, end=None, limit: Optional[int] = None,
+                  initial_balance: float = 100.0, payout_percent: float = 85.0,
+                  min_data_quality: float = 0.8) -> Dict:
+    """
+    Backtest strategy_config on every target, in parallel
+
+    workers=0: one process per CPU core (a single process runs in-line).
+    """
+    started = time.perf_counter()
+    options = {
+        'start': start, 'end': end, 'limit': limit,
+        'initial_balance': initial_balance, 'payout_percent': payout_percent,
+        'min_data_quality': min_data_quality,
+    }
+
+    # Build the dataset cache once here, so workers only map it
+    get_backtest_engine().dataset.load()
+
+    workers = worker_count(workers, len(targets))
+    if workers == 1:
+        results = _run_chunk(strategy_config, targets, options)
+    else:
+        # Strided chunks: one task per worker, and big/small series spread evenly
+        chunks = [targets[i::workers] for i in range(workers)]
+        with process_pool(workers) as executor:
+            futures = [executor.submit(_run_chunk, strategy_config, chunk, options) for chunk in chunks]
+            by_label = dict(result for future in futures for result in future.result())
+        results = [(target[0], by_label[target[0]]) for target in targets]
+
+    summary = merge_results(results, initial_balance)
+    summary['workers'] = workers
+    summary['elapsed_sec'] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def load_strategy(name: str, strategies_file: str = 'custom_strategies.json') -> Dict:
+    """Strategy config from a JSON file, or by id / name from custom_strategies.json"""
+    if os.path.exists(name):
+        with open(name, 'r') as f:
+            return json.load(f)
+
+    with open(strategies_file, 'r') as f:
+        strategies = json.load(f)
+    if name in strategies:
+        return strategies[name]
+    for strategy in strategies.values():
+        if strategy.get('name') == name:
+            return strategy
+    raise KeyError(f"Strategy '{name}' not found in {strategies_file}")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Backtest a strategy over many assets / CSV files in parallel')
+    parser.add_argument('--strategy', required=True, help='Strategy JSON file, or id / name in custom_strategies.json')
+    parser.add_argument('--assets', default='', help="Comma-separated assets, or 'all'")
+    parser.add_argument('--files', nargs='*', default=[], help='CSV files to backtest one by one')
+    parser.add_argument('--timeframe', type=int, action='append', help='60 and/or 300 (default: all)')
+    parser.add_argument('--start', help='First candle (epoch seconds or ISO date)')
+    parser.add_argument('--end', help='End of the range (exclusive)')
+    parser.add_argument('--limit', type=int, help='Most recent candles per series (default: all)')
+    parser.add_argument('--workers', type=int, default=0, help='Processes (0 = one per CPU core)')
+    parser.add_argument('--json', action='store_true', help='Print the full summary as JSON')
+    args = parser.parse_args(argv)
+
+    assets = args.assets or (None if args.files else 'all')
+
+    strategy = load_strategy(args.strategy)
+    targets = resolve_targets(assets, args.files, args.timeframe)
+    summary = run_backtests(strategy, targets, workers=args.workers, start=args.start, end=args.end,
+                            limit=args.limit)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"\n📊 {strategy.get('name', args.strategy)}: {summary['assets_tested']} series, "
+          f"{summary['workers']} workers, {summary['elapsed_sec']}s")
+    for label, stats in summary['per_asset'].items():
+        print(f"   {label:<20} trades {stats['total_trades']:>4} | win {stats['win_rate']:>6.2f}% | "
+              f"profit {stats['total_profit']:>8.2f} | DD {stats['max_drawdown']:>6.2f}%")
+    for label, error in summary['errors'].items():
+        print(f"   ⚠️ {label}: {error}")
+    print(f"\n   Total trades: {summary['total_trades']} | Win rate: {summary['win_rate']}% | "
+          f"Profit factor: {summary['profit_factor']} | Max drawdown: {summary['max_drawdown']}%")
+    print(f"   Profit: {summary['total_profit']} ({summary['profit_percent']}%)")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
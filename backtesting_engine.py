@@ -3,11 +3,42 @@ Backtesting Engine - Test strategies on historical data
 Simple but effective backtesting for strategy validation
 """
 
-import json
-import os
-from typing import Dict, List, Tuple, Optional
 from datetime import datetime
-from glob import glob
+from typing import Dict, List, Tuple, Optional
+
+import numpy as np
+
+from data_quality import flat_run_mask, gap_before_mask
+from historical_data import HistoricalDataset
+import indicator_lib
+from indicator_graph import strategy_conditions
+from strategy_compiler import ADVANCED_OPERATORS, OPERATORS, AtomTable, CompiledStrategy
+from strategy_masks import strategy_series
+
+# Entry conditions only ever supported these operators - anything else never matches.
+# condition_groups use the live AdvancedStrategyBuilder's ADVANCED_OPERATORS.
+BACKTEST_OPERATORS = {name: OPERATORS[name] for name in ('>', '<', '>=', '<=', '==')}
+
+# Indicator periods (a strategy's 'indicator_params' overrides them). ema_cross compares
+# SMA fast_period vs slow_period - the backtest's simplified EMAs.
+INDICATOR_PARAMS = {'rsi_period': 14, 'fast_period': 10, 'slow_period': 20, 'adx_period': 14}
+ADX_INDICATORS = {'adx', 'plus_di', 'minus_di', 'di_cross'}  # Only computed when a condition reads them
+# Everything _indicator_columns produces - conditions on any other indicator never match
+INDICATORS = {'rsi', 'price', 'sma_fast', 'sma_slow', 'ema_cross', 'macd_line', 'macd_histogram',
+              'upper_bb', 'lower_bb', 'middle_bb', 'bollinger_position'} | ADX_INDICATORS
+
+
+def uses_adx(conditions: List[Dict]) -> bool:
+    """True if any condition reads an ADX indicator (as its indicator or its compared value)"""
+    referenced = {c.get('indicator') for c in conditions} | {c.get('value') for c in conditions
+                                                             if isinstance(c.get('value'), str)}
+    return bool(referenced & ADX_INDICATORS)
+
+
+def unknown_indicators(strategy_config: Dict) -> List[str]:
+    """Indicators the strategy's conditions read that the backtest does not compute"""
+    return sorted({condition.get('indicator') for condition in strategy_conditions(strategy_config)}
+                  - INDICATORS, key=str)
 
 
 class BacktestEngine:
@@ -20,52 +51,62 @@ class BacktestEngine:
     def __init__(self):
         self.data_dir_1m = "data_1m"
         self.data_dir_5m = "data_5m"
+        self.dataset = HistoricalDataset({60: self.data_dir_1m, 300: self.data_dir_5m})
 
-    def load_historical_data(self, asset: str = None, limit: int = 1000) -> List:
+    def load_candles(self, asset: str = None, period: int = 60, start=None, end=None,
+                     limit: Optional[int] = None) -> np.ndarray:
+        """
+        (n, 5) historical candles [timestamp, open, close, high, low] from the dataset
+
+        asset=None picks the first asset with data for the timeframe. start / end
+        take epoch seconds, datetimes or ISO strings.
+        """
+        if asset is None:
+            assets = self.dataset.assets(period)
+            if not assets:
+                return np.empty((0, 5), dtype=np.float64)
+            asset = assets[0]
+        return self.dataset.candles(asset, period, start, end, limit)
+
+    def load_historical_data(self, asset: str = None, limit: int = 1000, period: int = 60,
+                             start=None, end=None) -> List:
         """
         Load historical candle data
 
         Returns: List of candles
         """
-        # Try to load from data_1m directory
-        if os.path.exists(self.data_dir_1m):
-            files = glob(os.path.join(self.data_dir_1m, "*.json"))
-
-            if files:
-                # Load first file (or specific asset if provided)
-                target_file = files[0]
-
-                if asset:
-                    for f in files:
-                        if asset.lower().replace('/', '_') in f.lower():
-                            target_file = f
-                            break
-
-                try:
-                    with open(target_file, 'r') as f:
-                        data = json.load(f)
-                        candles = data.get('candles', [])
-                        return candles[-limit:] if len(candles) > limit else candles
-                except:
-                    pass
-
-        return []
+        return self.load_candles(asset, period, start, end, limit).tolist()
 
     def backtest_strategy(
         self,
         strategy_config: Dict,
         historical_candles: List,
         initial_balance: float = 100.0,
-        payout_percent: float = 85.0
+        payout_percent: float = 85.0,
+        min_data_quality: float = 0.8,
+        expiry_candles: int = 1,
+        equity_curve: bool = False,
+        indicator_memo: Optional[Dict] = None,
+        period: Optional[int] = None
     ) -> Dict:
         """
         Run backtest on a strategy
 
         Args:
             strategy_config: Strategy configuration from strategy_builder
-            historical_candles: List of historical candles
+            historical_candles: List (or (n, 5) array) of historical candles
             initial_balance: Starting balance
             payout_percent: Payout percentage (e.g., 85 = 1.85x on win)
+            min_data_quality: Skip bars whose 50-candle window has less than this share of
+                real (non flat-run) candles, and bars entering/exiting inside a flat run.
+                0 disables the check.
+            expiry_candles: Candles until the trade is settled
+            equity_curve: Also return [[settle timestamp, balance], ...] for every trade
+            indicator_memo: {(indicator, period): series} already computed for these
+                candles - reused, and filled in with what this run computes
+            period: Candle period in seconds (None = the most common timestamp step).
+                Merged series join sessions with gaps: bars whose 50-candle window or
+                expiry crosses a gap are skipped.
 
         Returns:
             {
@@ -79,18 +120,15 @@ class BacktestEngine:
                 'trades': [...]
             }
         """
-        if not historical_candles or len(historical_candles) < 50:
+        if historical_candles is None or len(historical_candles) < 50:
             return {
                 'error': 'Insufficient historical data',
                 'total_trades': 0
             }
 
-        balance = initial_balance
-        peak_balance = initial_balance
-        max_drawdown = 0.0
-
-        trades = []
-        consecutive_losses = 0
+        candles = np.asarray(historical_candles, dtype=np.float64)
+        n = len(candles)
+        first, last = 50, n - expiry_candles  # Need history + the expiry candles
 
         # Risk management
         risk_mgmt = strategy_config.get('risk_management', {})
@@ -98,53 +136,130 @@ class BacktestEngine:
         max_consecutive_losses = risk_mgmt.get('max_consecutive_losses', 999)
         position_size_percent = risk_mgmt.get('position_size_percent', 2.0)
 
-        # Slide through candles
-        for i in range(50, len(historical_candles) - 1):  # Need history + 1 future candle
-            # Stop if max trades reached
-            if len(trades) >= max_trades:
-                break
+        # ⚡ Every bar at once: indicator series, entry mask, flat-run / gap skips, trade outcomes
+        series = self._calculate_indicator_series(candles, strategy_config.get('indicator_params'), indicator_memo,
+                                                  with_adx=uses_adx(list(strategy_conditions(strategy_config))))
+        entry, action = self._entry_signals(strategy_config, self._indicator_columns(series), n,
+                                            self._bar_hours(strategy_config, candles[:, 0]))
+
+        # Flat runs (weekends, frozen feeds) would be scored as ties/losses and skew the result
+        bars = np.arange(first, max(first, last))
+        flat_skip = np.zeros(n, dtype=bool)
+        if min_data_quality > 0:
+            synthetic = flat_run_mask(candles[:, :5])
+            synthetic_count = np.concatenate(([0], np.cumsum(synthetic)))
+            flat_skip[bars] = (synthetic[bars] | synthetic[bars + expiry_candles]
+                               | (synthetic_count[bars + 1] - synthetic_count[bars - 49] > 50 * (1 - min_data_quality)))
+
+        # Sessions joined with gaps: no 50-candle window or trade may span one
+        if period is None:
+            steps, counts = np.unique(np.diff(candles[:, 0]), return_counts=True)
+            period = steps[np.argmax(counts)]
+        gap_count = np.concatenate(([0], np.cumsum(gap_before_mask(candles[:, 0], period))))
+        gap_skip = np.zeros(n, dtype=bool)
+        gap_skip[bars] = gap_count[bars + expiry_candles + 1] - gap_count[bars - 48] > 0
+        skip = flat_skip | gap_skip
+
+        closes = candles[:, 2]
+        exits = np.full(n, np.nan)
+        exits[:n - expiry_candles] = closes[expiry_candles:]
+        if action == 'call':
+            won = exits > closes
+        elif action == 'put':
+            won = exits < closes
+        else:
+            won = None  # Signals without a call/put action never trade
+
+        signal_bars = np.flatnonzero(entry[first:last] & ~skip[first:last]) + first
+
+        balance, max_drawdown, trades, stop = self._walk_trades(
+            signal_bars, action, won, closes, exits, initial_balance, payout_percent,
+            position_size_percent, max_trades, max_consecutive_losses, first, last
+        )
+        skipped_flat_bars = int(flat_skip[first:stop].sum())
+        skipped_gap_bars = int((gap_skip & ~flat_skip)[first:stop].sum())
 
-            # Stop if too many consecutive losses
-            if consecutive_losses >= max_consecutive_losses:
-                break
+        # Calculate stats
+        total_trades = len(trades)
+        wins = sum(1 for t in trades if t['result'] == 'win')
+        losses = total_trades - wins
+        win_rate = (wins / total_trades * 100) if total_trades > 0 else 0.0
+        total_profit = balance - initial_balance
+        gross_profit = sum(t['profit'] for t in trades if t['profit'] > 0)
+        gross_loss = -sum(t['profit'] for t in trades if t['profit'] < 0)
+        profit_factor = abs(gross_profit / gross_loss) if losses > 0 else 0
 
-            # Get current candle window
-            candle_window = historical_candles[i-49:i+1]  # 50 candles for indicators
+        results = {
+            'total_trades': total_trades,
+            'wins': wins,
+            'losses': losses,
+            'win_rate': win_rate,
+            'initial_balance': initial_balance,
+            'final_balance': round(balance, 2),
+            'total_profit': round(total_profit, 2),
+            'profit_percent': round((total_profit / initial_balance) * 100, 2),
+            'max_drawdown': round(max_drawdown, 2),
+            'profit_factor': round(profit_factor, 2),
+            'gross_profit': round(gross_profit, 4),
+            'gross_loss': round(gross_loss, 4),
+            'avg_profit_per_trade': round(total_profit / total_trades, 2) if total_trades > 0 else 0,
+            'skipped_flat_bars': skipped_flat_bars,
+            'skipped_gap_bars': skipped_gap_bars,
+            'trades': trades[-20:]  # Last 20 trades only
+        }
+        if equity_curve:
+            results['equity_curve'] = [[float(candles[t['candle_index'] + expiry_candles, 0]), t['balance']]
+                                       for t in trades]
+        return results
 
-            # Calculate indicators (simplified)
-            indicators = self._calculate_simple_indicators(candle_window)
+    def walk_forward(self, strategy_config: Dict, ranges: Dict, **options) -> Dict:
+        """
+        Walk-forward analysis: optimise on window k, trade window k + 1 out-of-sample
 
-            # Evaluate strategy
-            entry_conditions = strategy_config.get('entry_conditions', [])
-            action, met = self._evaluate_entry_conditions(entry_conditions, indicators)
+        ranges are strategy_optimizer ranges. options are walk_forward.walk_forward's
+        (assets, files, timeframes, windows, metric, min_trades, workers, ...).
+        Returns every fold's chosen parameters with its in-sample and
+        out-of-sample summaries, and the stitched out-of-sample equity curve.
+        """
+        from walk_forward import walk_forward
+        return walk_forward(strategy_config, ranges, **options)
 
-            if not met:
-                continue  # No signal
+    @staticmethod
+    def _walk_trades(signal_bars, action, won, closes, exits, initial_balance, payout_percent,
+                     position_size_percent, max_trades, max_consecutive_losses,
+                     first: int, last: int) -> Tuple[float, float, List[Dict], int]:
+        """
+        Balance, drawdown and stop rules over the signal bars, in order
 
+        Returns (final balance, max drawdown %, trades, stop bar). Bars from the stop bar on
+        were never reached: max trades / consecutive losses end the run on the
+        bar after the last trade, an oversized position on its own signal bar.
+        """
+        balance = initial_balance
+        peak_balance = initial_balance
+        max_drawdown = 0.0
+        trades = []
+        consecutive_losses = 0
+
+        if max_trades <= 0 or max_consecutive_losses <= 0:
+            return balance, max_drawdown, trades, first
+
+        payout = payout_percent / 100
+        stop = last
+        for i in signal_bars.tolist():
             # Calculate position size
             position_size = (balance * position_size_percent / 100)
 
             if position_size > balance:
+                stop = i
                 break  # Not enough balance
 
-            # Entry price
-            entry_price = candle_window[-1][2]  # Close price
-
-            # Next candle (future) for result
-            next_candle = historical_candles[i+1]
-            exit_price = next_candle[2]
-
-            # Determine result
-            if action == 'call':
-                won = exit_price > entry_price
-            elif action == 'put':
-                won = exit_price < entry_price
-            else:
+            if won is None:
                 continue
 
-            # Calculate profit/loss
-            if won:
-                profit = position_size * (payout_percent / 100)
+            # Determine result
+            if won[i]:
+                profit = position_size * payout
                 balance += profit
                 consecutive_losses = 0
             else:
@@ -164,66 +279,75 @@ class BacktestEngine:
             trades.append({
                 'candle_index': i,
                 'action': action,
-                'entry_price': entry_price,
-                'exit_price': exit_price,
+                'entry_price': float(closes[i]),
+                'exit_price': float(exits[i]),
                 'position_size': position_size,
-                'result': 'win' if won else 'loss',
+                'result': 'win' if won[i] else 'loss',
                 'profit': profit,
                 'balance': balance
             })
 
-        # Calculate stats
-        total_trades = len(trades)
-        wins = sum(1 for t in trades if t['result'] == 'win')
-        losses = total_trades - wins
-        win_rate = (wins / total_trades * 100) if total_trades > 0 else 0.0
-        total_profit = balance - initial_balance
-        profit_factor = abs(sum(t['profit'] for t in trades if t['profit'] > 0) / sum(t['profit'] for t in trades if t['profit'] < 0)) if losses > 0 else 0
-
-        return {
-            'total_trades': total_trades,
-            'wins': wins,
-            'losses': losses,
-            'win_rate': win_rate,
-            'initial_balance': initial_balance,
-            'final_balance': round(balance, 2),
-            'total_profit': round(total_profit, 2),
-            'profit_percent': round((total_profit / initial_balance) * 100, 2),
-            'max_drawdown': round(max_drawdown, 2),
-            'profit_factor': round(profit_factor, 2),
-            'avg_profit_per_trade': round(total_profit / total_trades, 2) if total_trades > 0 else 0,
-            'trades': trades[-20:]  # Last 20 trades only
-        }
-
-    def _calculate_simple_indicators(self, candles: List) -> Dict:
-        """Calculate basic indicators for backtesting"""
-        if not candles or len(candles) < 14:
-            return {}
-
-        closes = [c[2] for c in candles]
-        highs = [c[3] for c in candles]
-        lows = [c[4] for c in candles]
-
-        current_price = closes[-1]
-
-        # RSI (simplified)
-        rsi = self._calculate_simple_rsi(closes, 14)
+            # Stop if max trades reached / too many consecutive losses
+            if len(trades) >= max_trades or consecutive_losses >= max_consecutive_losses:
+                stop = min(i + 1, last)
+                break
 
-        # Simple Moving Averages
-        sma_fast = sum(closes[-10:]) / 10 if len(closes) >= 10 else current_price
-        sma_slow = sum(closes[-20:]) / 20 if len(closes) >= 20 else current_price
+        return balance, max_drawdown, trades, stop
 
-        # MACD (very simplified)
-        ema_12 = sum(closes[-12:]) / 12 if len(closes) >= 12 else current_price
-        ema_26 = sum(closes[-26:]) / 26 if len(closes) >= 26 else current_price
-        macd_line = ema_12 - ema_26
-        macd_histogram = macd_line  # Simplified
+    def _calculate_indicator_series(self, candles, params: Optional[Dict] = None,
+                                    memo: Optional[Dict] = None, with_adx: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Full-length indicator series for the whole backtest, computed once
 
-        # Bollinger Bands (simplified)
-        sma_20 = sum(closes[-20:]) / 20 if len(closes) >= 20 else current_price
-        std_dev = (sum((c - sma_20) ** 2 for c in closes[-20:]) / 20) ** 0.5 if len(closes) >= 20 else 0
-        upper_bb = sma_20 + (2 * std_dev)
-        lower_bb = sma_20 - (2 * std_dev)
+        params overrides INDICATOR_PARAMS. memo caches series by (indicator, period),
+        so runs over the same candles with other periods only compute what changed.
+        """
+        params = {**INDICATOR_PARAMS, **(params or {})}
+        memo = {} if memo is None else memo
+        candles = np.asarray(candles, dtype=np.float64)
+        closes = candles[:, 2]
+
+        def cached(name, period, compute):
+            key = (name, period)
+            if key not in memo:
+                memo[key] = compute(period)
+            return memo[key]
+
+        upper_bb, middle_bb, lower_bb = cached('bollinger', 20, lambda p: indicator_lib.bollinger(closes, p, 2))
+        series = {
+            'price': closes,
+            'rsi': cached('rsi', params['rsi_period'], lambda p: indicator_lib.rsi(closes, p, smoothing='simple')),
+            'sma_fast': cached('sma', params['fast_period'], lambda p: indicator_lib.sma(closes, p)),
+            'sma_slow': cached('sma', params['slow_period'], lambda p: indicator_lib.sma(closes, p)),
+            # MACD (very simplified - SMA 12 vs SMA 26)
+            'ema_12': cached('sma', 12, lambda p: indicator_lib.sma(closes, p)),
+            'ema_26': cached('sma', 26, lambda p: indicator_lib.sma(closes, p)),
+            'upper_bb': upper_bb,
+            'middle_bb': middle_bb,
+            'lower_bb': lower_bb,
+        }
+        if with_adx:
+            series['adx'], series['plus_di'], series['minus_di'] = cached(
+                'adx', params['adx_period'], lambda p: indicator_lib.adx(candles[:, 3], candles[:, 4], closes, p))
+        return series
+
+    def _indicators_at(self, series: Dict[str, np.ndarray], i: int) -> Dict:
+        """Indicator dict for bar i (one row of _indicator_columns)"""
+        current_price = float(series['price'][i])
+
+        def value(name, default):
+            v = series[name][i]
+            return default if np.isnan(v) else float(v)
+
+        rsi = value('rsi', 50.0)
+        sma_fast = value('sma_fast', current_price)
+        sma_slow = value('sma_slow', current_price)
+        macd_line = value('ema_12', current_price) - value('ema_26', current_price)
+        middle_bb = value('middle_bb', current_price)
+        upper_bb = value('upper_bb', current_price)
+        lower_bb = value('lower_bb', current_price)
+        plus_di = value('plus_di', 50.0)
+        minus_di = value('minus_di', 50.0)
 
         return {
             'rsi': rsi,
@@ -232,102 +356,90 @@ class BacktestEngine:
             'sma_slow': sma_slow,
             'ema_cross': 'Bullish' if sma_fast > sma_slow else 'Bearish',
             'macd_line': macd_line,
-            'macd_histogram': macd_histogram,
+            'macd_histogram': macd_line,  # Simplified
             'upper_bb': upper_bb,
             'lower_bb': lower_bb,
-            'middle_bb': sma_20,
-            'bollinger_position': 'Above' if current_price > upper_bb else 'Below' if current_price < lower_bb else 'Middle'
+            'middle_bb': middle_bb,
+            'bollinger_position': 'Above' if current_price > upper_bb else 'Below' if current_price < lower_bb else 'Middle',
+            'adx': value('adx', 25.0),
+            'plus_di': plus_di,
+            'minus_di': minus_di,
+            'di_cross': 'bullish' if plus_di > minus_di else 'bearish' if minus_di > plus_di else 'neutral'
         }
 
-    def _calculate_simple_rsi(self, closes: List[float], period: int = 14) -> float:
-        """Calculate RSI (simplified)"""
-        if len(closes) < period + 1:
-            return 50.0
+    def _calculate_simple_indicators(self, candles: List) -> Dict:
+        """Calculate basic indicators for backtesting (last bar of `candles`)"""
+        if not candles or len(candles) < 14:
+            return {}
 
-        gains = []
-        losses = []
+        return self._indicators_at(self._calculate_indicator_series(candles), len(candles) - 1)
 
-        for i in range(1, len(closes)):
-            change = closes[i] - closes[i-1]
-            if change > 0:
-                gains.append(change)
-                losses.append(0)
-            else:
-                gains.append(0)
-                losses.append(abs(change))
+    def _indicator_columns(self, series: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Per-bar arrays of the _indicators_at values (warm-up NaNs replaced by the same defaults)"""
+        price = series['price']
 
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
+        def value(name, default):
+            return np.where(np.isnan(series[name]), default, series[name])
 
-        if avg_loss == 0:
-            return 100.0
+        sma_fast = value('sma_fast', price)
+        sma_slow = value('sma_slow', price)
+        macd_line = value('ema_12', price) - value('ema_26', price)
+        upper_bb = value('upper_bb', price)
+        lower_bb = value('lower_bb', price)
 
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-
-        return rsi
+        columns = {
+            'rsi': value('rsi', 50.0),
+            'price': price,
+            'sma_fast': sma_fast,
+            'sma_slow': sma_slow,
+            'ema_cross': np.where(sma_fast > sma_slow, 'Bullish', 'Bearish'),
+            'macd_line': macd_line,
+            'macd_histogram': macd_line,  # Simplified
+            'upper_bb': upper_bb,
+            'lower_bb': lower_bb,
+            'middle_bb': value('middle_bb', price),
+            'bollinger_position': np.where(price > upper_bb, 'Above', np.where(price < lower_bb, 'Below', 'Middle'))
+        }
+        if 'adx' in series:
+            plus_di = value('plus_di', 50.0)
+            minus_di = value('minus_di', 50.0)
+            columns.update({
+                'adx': value('adx', 25.0),
+                'plus_di': plus_di,
+                'minus_di': minus_di,
+                'di_cross': np.where(plus_di > minus_di, 'bullish', np.where(minus_di > plus_di, 'bearish', 'neutral'))
+            })
+        return columns
 
-    def _evaluate_entry_conditions(
-        self,
-        conditions: List[Dict],
-        indicators: Dict
-    ) -> Tuple[Optional[str], bool]:
-        """
-        Evaluate entry conditions
-        Returns: (action, conditions_met)
+    def _entry_signals(self, strategy_config: Dict, columns: Dict[str, np.ndarray], n: int,
+                       hours: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Optional[str]]:
         """
-        if not conditions:
-            return (None, False)
+        Entry mask over all bars + the signal action
 
-        met_count = 0
-        actions = []
-
-        for condition in conditions:
-            indicator_name = condition.get('indicator')
-            operator = condition.get('operator')
-            threshold = condition.get('value')
-            action = condition.get('action', 'call')
-
-            # Get indicator value
-            indicator_value = indicators.get(indicator_name)
-
-            if indicator_value is None:
-                continue
-
-            # Handle special thresholds
-            if isinstance(threshold, str) and threshold in indicators:
-                threshold = indicators[threshold]
-
-            # Evaluate
-            met = False
-
-            try:
-                if operator == '>':
-                    met = float(indicator_value) > float(threshold)
-                elif operator == '<':
-                    met = float(indicator_value) < float(threshold)
-                elif operator == '>=':
-                    met = float(indicator_value) >= float(threshold)
-                elif operator == '<=':
-                    met = float(indicator_value) <= float(threshold)
-                elif operator == '==':
-                    met = str(indicator_value).lower() == str(threshold).lower()
-            except:
-                met = False
-
-            if met:
-                met_count += 1
-                actions.append(action)
-
-        # All conditions must be met
-        all_met = (met_count == len(conditions))
-
-        if all_met and actions:
-            # Return most common action
-            action = max(set(actions), key=actions.count)
-            return (action, True)
-
-        return (None, False)
+        The live builders' rules, via strategy_masks.strategy_series: old-style
+        entry_conditions must all be met (majority condition action), condition_groups
+        pass on AND/OR logic and min_confidence (the strategy's action). Regime and
+        timeframe alignment have no historical series and are not applied. The action
+        is the same for every bar.
+        """
+        if strategy_config.get('condition_groups'):
+            table = AtomTable(ADVANCED_OPERATORS)
+        else:
+            table = AtomTable(BACKTEST_OPERATORS)
+        compiled = CompiledStrategy(strategy_config, table)
+        result = strategy_series(strategy_config, compiled, columns, n, hours=hours)
+
+        entry = result['entry']
+        if not entry.any():
+            return entry, None
+        return entry, result['action'][entry][0]
+
+    @staticmethod
+    def _bar_hours(strategy_config: Dict, timestamps: np.ndarray) -> Optional[np.ndarray]:
+        """Local hour of every bar for an enabled time_filter (the live bot checks datetime.now().hour)"""
+        if not strategy_config.get('time_filter', {}).get('enabled', False):
+            return None
+        return np.array([datetime.fromtimestamp(ts).hour for ts in timestamps.tolist()])
 
 
 # Global instance
@@ -0,0 +1,340 @@
+"""
+Candle Store - Fixed-capacity ring buffers for streamed candles
+Struct-of-arrays float64 storage with O(1) append/update and zero-copy NumPy views
+
+With a cache directory the buffers live in memory-mapped .npy files
+(one per asset/period), so candles survive restarts and are reloaded as
+"pending" until the first live frame confirms there is no gap.
+"""
+
+import os
+from typing import Iterable, List, Optional
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+
+DEFAULT_CAPACITY = 1000
+
+# Column order matches the legacy candle lists: [timestamp, open, close, high, low]
+TS, OPEN, CLOSE, HIGH, LOW = range(5)
+COLUMNS = 5
+
+# Extra rows after the candle columns:
+#   FLAGS - per-candle data-quality bits (see FLAG_*)
+#   META  - [head, count, 0, ...] so a memory-mapped buffer reopens where it stopped
+FLAGS = COLUMNS
+META = COLUMNS + 1
+ROWS = COLUMNS + 2
+META_HEAD, META_COUNT = 0, 1
+
+FLAG_FILLED = 1  # Synthetic candle forward-filled over a gap in the stream
+FLAG_GAP_BEFORE = 2  # One or more periods are missing right before this candle
+
+
+class CandleBuffer:
+    """
+    Fixed-capacity candle history for a single (asset, period)
+
+    Storage is one (7, 2 * capacity) float64 block, one row per column plus
+    a flags row and a metadata row. Every write lands in slot i and in its mirror slot
+    i + capacity, so the most recent candles are always contiguous in memory
+    and can be handed to indicators as views instead of copies.
+
+    The block may be a np.memmap, in which case every write is persisted.
+    pending is True for candles restored from disk that no live frame has
+    confirmed yet - they must not be traded on.
+
+    view() returns an (n, 5) array whose rows look like the old lists:
+        candles[-1][2]   -> last close
+        candles[:, 2]    -> all closes (zero-copy)
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, block: Optional[np.ndarray] = None):
+        if capacity < 2:
+            raise ValueError("Candle buffer capacity must be at least 2")
+
+        self.capacity = capacity
+        if block is None:
+            block = np.zeros((ROWS, 2 * capacity), dtype=np.float64)
+        elif block.shape != (ROWS, 2 * capacity):
+            raise ValueError(f"Candle block shape {block.shape} does not match capacity {capacity}")
+
+        self._block = block
+        self._data = block[:COLUMNS]
+        self._flags = block[FLAGS]
+        self._meta = block[META]
+        self._head = int(self._meta[META_HEAD]) % capacity  # Next write slot, always in [0, capacity)
+        self._count = min(int(self._meta[META_COUNT]), capacity)
+        self.pending = False
+        self.generation = 0  # Bumped on every non-incremental change (load/clear)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __repr__(self) -> str:
+        return f"CandleBuffer(len={self._count}, capacity={self.capacity}, last_ts={self.last_ts})"
+
+    def _sync_meta(self):
+        self._meta[META_HEAD] = self._head
+        self._meta[META_COUNT] = self._count
+
+    @property
+    def _start(self) -> int:
+        return (self._head - self._count) % self.capacity
+
+    @property
+    def _last(self) -> int:
+        return (self._head - 1) % self.capacity
+
+    @property
+    def last_ts(self) -> Optional[float]:
+        """Timestamp of the newest candle (None when empty)"""
+        if not self._count:
+            return None
+        return float(self._data[TS, self._last])
+
+    def append(self, tstamp: float, open_price: float, close: float, high: float, low: float, flags: int = 0):
+        """Append a new candle, overwriting the oldest one when full - O(1)"""
+        head = self._head
+        data = self._data
+        for column, value in ((TS, tstamp), (OPEN, open_price), (CLOSE, close), (HIGH, high), (LOW, low)):
+            data[column, head] = value
+            data[column, head + self.capacity] = value
+        self._flags[head] = self._flags[head + self.capacity] = flags
+
+        self._head = (head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        self._sync_meta()
+
+    def update_last(self, price: float):
+        """Apply a tick to the forming candle (close, high, low) - O(1)"""
+        if not self._count:
+            return
+
+        data = self._data
+        idx = self._last
+        mirror = idx + self.capacity
+
+        data[CLOSE, idx] = data[CLOSE, mirror] = price
+        if price > data[HIGH, idx]:
+            data[HIGH, idx] = data[HIGH, mirror] = price
+        if price < data[LOW, idx]:
+            data[LOW, idx] = data[LOW, mirror] = price
+
+    def load(self, candles: Iterable):
+        """
+        Replace the buffer contents with a candle snapshot
+
+        Args:
+            candles: Iterable of [timestamp, open, close, high, low, ...] rows in time order
+        """
+        rows = [row[:COLUMNS] for row in candles]
+        self.clear()
+        if not rows:
+            return
+
+        block = np.asarray(rows[-self.capacity:], dtype=np.float64).T
+        n = block.shape[1]
+        self._data[:, :n] = block
+        self._data[:, self.capacity:self.capacity + n] = block
+        self._flags[:n] = 0
+        self._flags[self.capacity:self.capacity + n] = 0
+        self._head = n % self.capacity
+        self._count = n
+        self._sync_meta()
+
+    def clear(self):
+        """Drop all candles (storage is reused)"""
+        self._head = 0
+        self._count = 0
+        self.generation += 1
+        self._sync_meta()
+
+    def merge_history(self, candles: Iterable, period: int) -> bool:
+        """
+        Load a live history snapshot on top of cached candles
+
+        Cached candles older than the snapshot are kept when they join up
+        with it (no missing period in between). Returns False when a gap
+        was found and the cache was discarded.
+        """
+        rows = [row[:COLUMNS] for row in candles]
+        if not rows or not self._count:
+            self.load(rows)
+            return True
+
+        first_ts = float(rows[0][TS])
+        older = self.view()[self.ts < first_ts]
+        contiguous = len(older) > 0 and older[-1, TS] + period >= first_ts
+
+        if contiguous:
+            self.load(older.tolist() + rows)
+        else:
+            self.load(rows)
+        return contiguous
+
+    def resume(self, tstamp: float, period: int) -> bool:
+        """
+        Check the first live tick against restored candles
+
+        The tick must fall inside the last cached candle or the one right
+        after it. Returns False (and clears the buffer) on a gap.
+        """
+        last_ts = self.last_ts
+        if last_ts is None or tstamp - last_ts >= 2 * period:
+            self.clear()
+            return False
+
+        if tstamp >= last_ts + period:
+            # We missed the boundary tick - open the candle it belongs to
+            open_ts = tstamp - tstamp % period
+            last_close = float(self._data[CLOSE, self._last])
+            self.append(open_ts, last_close, last_close, last_close, last_close)
+        return True
+
+    def flush(self):
+        """Push pending writes of a memory-mapped buffer to disk"""
+        if isinstance(self._block, np.memmap):
+            self._block.flush()
+
+    def view(self) -> np.ndarray:
+        """Zero-copy (n, 5) view of the stored candles, oldest first"""
+        start = self._start
+        return self._data[:, start:start + self._count].T
+
+    def column(self, index: int) -> np.ndarray:
+        """Zero-copy 1-D view of a single column (TS, OPEN, CLOSE, HIGH or LOW)"""
+        start = self._start
+        return self._data[index, start:start + self._count]
+
+    @property
+    def ts(self) -> np.ndarray:
+        return self.column(TS)
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.column(OPEN)
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.column(CLOSE)
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.column(HIGH)
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.column(LOW)
+
+    @property
+    def flags(self) -> np.ndarray:
+        """Zero-copy view of the FLAG_* bits, aligned with view()"""
+        start = self._start
+        return self._flags[start:start + self._count]
+
+    def to_list(self) -> List[List[float]]:
+        """Copy out as legacy list-of-lists (for modules that expect lists)"""
+        return self.view().tolist()
+
+
+class CandleStore(dict):
+    """
+    Candle buffers keyed by asset, then by period in seconds
+
+    Keeps the CANDLES[asset][period] shape the bot has always used, but every
+    leaf is a CandleBuffer instead of a growing Python list.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        super().__init__()
+        self.capacity = capacity
+        self.cache_dir = None
+
+    def buffer(self, asset: str, period: int) -> CandleBuffer:
+        """Get (or create) the buffer for one asset/period"""
+        timeframes = self.get(asset)
+        if timeframes is None:
+            timeframes = self[asset] = {}
+
+        buffer = timeframes.get(period)
+        if buffer is None:
+            block = self._open_block(asset, period) if self.cache_dir else None
+            buffer = timeframes[period] = CandleBuffer(self.capacity, block)
+        return buffer
+
+    # ==================== DISK CACHE ====================
+
+    def _cache_path(self, asset: str, period: int) -> str:
+        # Quoted so names like "#AAPL_otc" map back to the same asset on restore
+        return os.path.join(self.cache_dir, f"{quote(asset, safe='')}__{period}.npy")
+
+    def _open_block(self, asset: str, period: int, create: bool = True) -> Optional[np.memmap]:
+        path = self._cache_path(asset, period)
+        shape = (ROWS, 2 * self.capacity)
+
+        if os.path.exists(path):
+            try:
+                block = np.load(path, mmap_mode='r+')
+                if block.shape == shape and block.dtype == np.float64:
+                    return block
+            except (ValueError, OSError):
+                pass  # Corrupt or foreign file - recreate below
+
+        if not create:
+            return None
+        return np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=shape)
+
+    def enable_cache(self, cache_dir: str) -> List[str]:
+        """
+        Persist all buffers under cache_dir and restore what is already there
+
+        Restored buffers are marked pending. Returns "asset/period" keys of the
+        buffers that were restored with data.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+
+        # Move in-memory buffers onto disk
+        for asset, timeframes in self.items():
+            for period, buffer in list(timeframes.items()):
+                if isinstance(buffer._block, np.memmap):
+                    continue
+                block = self._open_block(asset, period)
+                block[:] = buffer._block
+                migrated = timeframes[period] = CandleBuffer(self.capacity, block)
+                migrated.pending = buffer.pending
+
+        restored = []
+        for filename in sorted(os.listdir(cache_dir)):
+            if not filename.endswith('.npy') or '__' not in filename:
+                continue
+            quoted_asset, _, period = filename[:-4].rpartition('__')
+            asset = unquote(quoted_asset)
+            if not period.isdigit() or int(period) in self.get(asset, {}):
+                continue
+
+            block = self._open_block(asset, int(period), create=False)
+            if block is None:
+                continue
+            buffer = CandleBuffer(self.capacity, block)
+            if not len(buffer):
+                continue
+            buffer.pending = True
+            self.setdefault(asset, {})[int(period)] = buffer
+            restored.append(f"{asset}/{period}")
+        return restored
+
+    def flush(self):
+        """Flush every memory-mapped buffer"""
+        for timeframes in self.values():
+            for buffer in timeframes.values():
+                buffer.flush()
+
+    def disable_cache(self):
+        """Flush and detach from disk (buffers already open stay memory-mapped)"""
+        self.flush()
+        self.cache_dir = None
+
@@ -0,0 +1,150 @@
+"""
+Data Quality - Gap and flat-run detection for candle series
+Vectorised checks shared by live ingestion, check_indicators and backtests
+
+A flat bar has open == close == high == low == previous close: the price
+did not move at all. One such bar can be a quiet market; a run of them
+(weekends, frozen feeds, forward-filled gaps) is synthetic and skews
+indicators (ATR/BB collapse to zero, RSI divides by zero) and backtests
+(every trade inside the run is a tie).
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from candle_store import TS, OPEN, CLOSE, HIGH, LOW, FLAG_FILLED, FLAG_GAP_BEFORE
+from tick_aggregator import CANDLE_GAP
+
+DEFAULT_MIN_FLAT_RUN = 3  # Consecutive flat bars before a run counts as synthetic
+
+
+def flat_bar_mask(candles: np.ndarray) -> np.ndarray:
+    """Bars with no price movement at all (first bar is never flat)"""
+    candles = np.asarray(candles, dtype=np.float64)
+    mask = np.zeros(len(candles), dtype=bool)
+    if len(candles) < 2:
+        return mask
+
+    bars = candles[1:]
+    mask[1:] = ((bars[:, OPEN] == bars[:, CLOSE])
+                & (bars[:, HIGH] == bars[:, LOW])
+                & (bars[:, OPEN] == bars[:, HIGH])
+                & (bars[:, OPEN] == candles[:-1, CLOSE]))
+    return mask
+
+
+def flat_run_mask(candles: np.ndarray, min_run: int = DEFAULT_MIN_FLAT_RUN) -> np.ndarray:
+    """Bars that belong to a run of at least min_run consecutive flat bars"""
+    flat = flat_bar_mask(candles)
+    if min_run <= 1 or not flat.any():
+        return flat
+
+    # Run boundaries: +1 where a run starts, -1 one past where it ends
+    edges = np.diff(np.concatenate(([0], flat.view(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    mask = np.zeros(len(flat), dtype=bool)
+    for start, end in zip(starts, ends):
+        if end - start >= min_run:
+            mask[start:end] = True
+    return mask
+
+
+def gap_before_mask(ts: np.ndarray, period: int) -> np.ndarray:
+    """Bars not exactly one period after the previous bar - the start of a new session (first bar never)"""
+    ts = np.asarray(ts, dtype=np.float64)
+    mask = np.zeros(len(ts), dtype=bool)
+    if len(ts) >= 2:
+        mask[1:] = np.diff(ts) != period
+    return mask
+
+
+def missing_bars(ts: np.ndarray, period: int) -> int:
+    """Number of period slots absent between the first and last timestamp"""
+    if len(ts) < 2:
+        return 0
+    steps = np.diff(np.asarray(ts, dtype=np.float64)) / period
+    return int(np.maximum(np.round(steps) - 1, 0).sum())
+
+
+def quality_report(candles: np.ndarray, period: int, flags: Optional[np.ndarray] = None,
+                   min_run: int = DEFAULT_MIN_FLAT_RUN) -> Dict:
+    """
+    Data-quality summary for one candle series
+
+    quality is the share of bars that are real (not forward-filled and not
+    part of a flat run), 1.0 for a clean series.
+    """
+    candles = np.asarray(candles, dtype=np.float64)
+    n = len(candles)
+    if not n:
+        return {'candles': 0, 'missing': 0, 'filled': 0, 'gaps_marked': 0, 'flat_run_bars': 0, 'quality': 0.0}
+
+    flat_runs = flat_run_mask(candles, min_run)
+    synthetic = flat_runs
+    filled = gaps_marked = 0
+    if flags is not None:
+        bits = np.asarray(flags).astype(np.int64)
+        is_filled = (bits & FLAG_FILLED) != 0
+        filled = int(is_filled.sum())
+        gaps_marked = int(((bits & FLAG_GAP_BEFORE) != 0).sum())
+        synthetic = synthetic | is_filled
+
+    return {
+        'candles': n,
+        'missing': missing_bars(candles[:, TS], period),
+        'filled': filled,
+        'gaps_marked': gaps_marked,
+        'flat_run_bars': int(flat_runs.sum()),
+        'quality': round(1.0 - float(synthetic.sum()) / n, 4),
+    }
+
+
+def buffer_quality(buffer, period: int, window: Optional[int] = None,
+                   min_run: int = DEFAULT_MIN_FLAT_RUN) -> Dict:
+    """quality_report for a CandleBuffer (optionally only its last `window` candles)"""
+    candles = buffer.view()
+    flags = buffer.flags
+    if window:
+        candles = candles[-window:]
+        flags = flags[-window:]
+    return quality_report(candles, period, flags, min_run)
+
+
+class DataQualityMonitor:
+    """
+    Live data-quality tracking per asset
+
+    Counts stream gaps reported by the tick aggregator (these outlive the
+    fixed-capacity buffers) and builds per-asset reports from the store.
+    """
+
+    def __init__(self):
+        self.gap_events: Dict[str, Dict[int, Dict]] = {}  # {asset: {period: {'stream_gaps', 'stream_missing'}}}
+
+    def on_candle_event(self, event: Dict):
+        """Tick aggregator subscriber"""
+        if event['type'] != CANDLE_GAP:
+            return
+        counter = self.gap_events.setdefault(event['asset'], {}).setdefault(
+            event['period'], {'stream_gaps': 0, 'stream_missing': 0})
+        counter['stream_gaps'] += 1
+        counter['stream_missing'] += event.get('missing', 0)
+
+    def reset(self):
+        self.gap_events.clear()
+
+    def report(self, store, min_run: int = DEFAULT_MIN_FLAT_RUN) -> Dict:
+        """{asset: {period: quality_report + live gap counters}}"""
+        result = {}
+        for asset, timeframes in store.items():
+            periods = {}
+            for period, buffer in timeframes.items():
+                entry = buffer_quality(buffer, period, min_run=min_run)
+                entry.update(self.gap_events.get(asset, {}).get(period, {'stream_gaps': 0, 'stream_missing': 0}))
+                entry['pending'] = buffer.pending
+                periods[period] = entry
+            result[asset] = periods
+        return result
@@ -0,0 +1,80 @@
+"""
+Evaluation Scheduler - Only analyze assets whose candles changed
+Dirty-set scheduling driven by tick aggregator events
+
+Modes:
+    tick          - an asset is dirty after any tick that changed its candles
+    candle_close  - an asset is dirty only when one of its candles closes
+
+History loads always mark the asset dirty (its whole series changed).
+"""
+
+from typing import Dict, Iterable, List
+
+from tick_aggregator import CANDLE_CLOSED, HISTORY_LOADED
+
+TRIGGER_TICK = 'tick'
+TRIGGER_CANDLE_CLOSE = 'candle_close'
+TRIGGERS = (TRIGGER_TICK, TRIGGER_CANDLE_CLOSE)
+
+
+class EvaluationScheduler:
+    """
+    Keeps the set of assets that need a strategy pass
+
+    Insertion-ordered, so assets are evaluated in the order they changed.
+    """
+
+    def __init__(self, mode: str = TRIGGER_TICK):
+        self.mode = mode
+        self._dirty: Dict[str, None] = {}
+        self.marked = 0
+        self.evaluated = 0
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @mode.setter
+    def mode(self, value: str):
+        self._mode = value if value in TRIGGERS else TRIGGER_TICK
+
+    def mark(self, asset: str):
+        self._dirty[asset] = None
+        self.marked += 1
+
+    def mark_many(self, assets: Iterable[str]):
+        for asset in assets:
+            self.mark(asset)
+
+    def on_tick(self, asset: str):
+        """A tick changed the asset's candles"""
+        if self._mode == TRIGGER_TICK:
+            self.mark(asset)
+
+    def on_candle_event(self, event: Dict):
+        """Tick aggregator subscriber"""
+        if event['type'] == HISTORY_LOADED or (
+                event['type'] == CANDLE_CLOSED and self._mode == TRIGGER_CANDLE_CLOSE):
+            self.mark(event['asset'])
+
+    def take_dirty(self) -> List[str]:
+        """Return and clear the dirty assets"""
+        assets = list(self._dirty)
+        self._dirty.clear()
+        self.evaluated += len(assets)
+        return assets
+
+    def __len__(self) -> int:
+        return len(self._dirty)
+
+    def clear(self):
+        self._dirty.clear()
+
+    def get_stats(self) -> Dict:
+        return {
+            'mode': self._mode,
+            'pending': len(self._dirty),
+            'marked': self.marked,
+            'evaluated': self.evaluated,
+        }
@@ -0,0 +1,167 @@
+"""
+Frame Recorder - Record and replay Pocket Option WebSocket frames
+Append-only gzip session files plus a browser-free replay engine
+
+File layout (inside the gzip stream):
+    MAGIC, then per frame: <received_at: float64><length: uint32><payload utf-8>
+
+Every open() in append mode starts a new gzip member, and gzip readers
+treat concatenated members as one stream, so a session can be resumed
+into the same file.
+
+Replay:
+    python frame_recorder.py recordings/session.pof.gz --speed 10
+    python frame_recorder.py recordings/session.pof.gz --speed max
+"""
+
+import asyncio
+import gzip
+import os
+import struct
+import sys
+import time
+from typing import Awaitable, Callable, Dict, Iterator, Optional, Tuple
+
+MAGIC = b'POFR1\n'
+HEADER = struct.Struct('<dI')
+FLUSH_INTERVAL = 1.0  # Seconds between forced flushes to disk
+
+
+class FrameRecorder:
+    """Append decoded WebSocket payloads to a compressed session file"""
+
+    def __init__(self, path: str, compresslevel: int = 6):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = gzip.open(path, 'ab', compresslevel=compresslevel)
+        if is_new:
+            self._file.write(MAGIC)
+
+        self.frames = 0
+        self.bytes = 0
+        self._last_flush = time.time()
+
+    def record(self, payload: str, received_at: Optional[float] = None):
+        """Write one frame (received_at defaults to now)"""
+        if self._file is None:
+            return
+
+        now = time.time()
+        body = payload.encode('utf-8')
+        self._file.write(HEADER.pack(received_at if received_at is not None else now, len(body)))
+        self._file.write(body)
+        self.frames += 1
+        self.bytes += len(body)
+
+        if now - self._last_flush >= FLUSH_INTERVAL:
+            self._file.flush()
+            self._last_flush = now
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_frames(path: str) -> Iterator[Tuple[float, str]]:
+    """Yield (received_at, payload) for every frame in a session file"""
+    with gzip.open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a frame recording")
+
+        while True:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return  # End of file (or a truncated final frame)
+
+            received_at, length = HEADER.unpack(header)
+            body = f.read(length)
+            if len(body) < length:
+                return
+            yield received_at, body.decode('utf-8')
+
+
+class FrameReplayer:
+    """
+    Feed a recording through an ingest + analyze pipeline without a browser
+
+    speed: 1.0 = original pacing, N = N times faster, 0 = as fast as possible
+    """
+
+    def __init__(self, path: str, speed: float = 0.0):
+        self.path = path
+        self.speed = speed
+
+    async def run(self, ingest: Callable[[str], None],
+                  analyze: Callable[[], Awaitable[None]]) -> Dict:
+        """
+        Replay all frames and return throughput stats
+
+        Args:
+            ingest: Called with each payload (candle building)
+            analyze: Awaited after each frame (indicator/strategy pass)
+        """
+        frames = 0
+        ingest_time = 0.0
+        analyze_time = 0.0
+        first_at = None
+        started = time.perf_counter()
+
+        for received_at, payload in read_frames(self.path):
+            if first_at is None:
+                first_at = received_at
+
+            if self.speed > 0:
+                # Sleep until this frame's (scaled) offset from the first one
+                due = started + (received_at - first_at) / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            t0 = time.perf_counter()
+            ingest(payload)
+            t1 = time.perf_counter()
+            await analyze()
+            t2 = time.perf_counter()
+
+            ingest_time += t1 - t0
+            analyze_time += t2 - t1
+            frames += 1
+
+        elapsed = time.perf_counter() - started
+        return {
+            'frames': frames,
+            'elapsed_sec': round(elapsed, 3),
+            'frames_per_sec': round(frames / elapsed, 1) if elapsed > 0 else 0.0,
+            'avg_ingest_us': round(ingest_time / frames * 1e6, 1) if frames else 0.0,
+            'avg_decision_ms': round(analyze_time / frames * 1e3, 3) if frames else 0.0,
+        }
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Replay a recorded Pocket Option session')
+    parser.add_argument('path', help='Recording file (.pof.gz)')
+    parser.add_argument('--speed', default='max', help="Replay speed: 1, 10, ... or 'max'")
+    args = parser.parse_args(argv)
+
+    speed = 0.0 if args.speed == 'max' else float(args.speed)
+
+    import main as bot  # Heavy import - only needed when replaying
+    stats = asyncio.run(bot.replay_session(args.path, speed=speed))
+
+    print(f"\n📼 Replayed {stats['frames']} frames in {stats['elapsed_sec']}s "
+          f"({stats['frames_per_sec']} frames/s)")
+    print(f"   Ingest: {stats['avg_ingest_us']}µs/frame, decision: {stats['avg_decision_ms']}ms/frame")
+    print(f"   Signals: {len(stats['signals'])}")
+    for tstamp, asset, action, reason in stats['signals']:
+        print(f"   {tstamp:.0f} {asset} {action.upper()} - {reason}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
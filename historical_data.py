@@ -0,0 +1,274 @@
+"""
+Historical Data - Columnar candle dataset built from the data_1m/ and data_5m/ CSVs
+Every CSV is parsed once into one memory-mapped .npy block; later loads only read a small index
+
+The CSVs are named ASSET_YYYY_M_D_H.csv. Their header labels vary between
+files, but the columns are always [index, timestamp, open, close, high, low]
+(the order test_on_historical_data.py reads), so they are read by position.
+
+All files of an asset and timeframe are merged into one series, sorted by
+timestamp with duplicates dropped, and stored as consecutive (n, 5) rows
+[timestamp, open, close, high, low] - the CandleBuffer.view() layout - in
+historical_cache/candles.npy. historical_cache/index.json records the row
+range of every (asset, period) and the mtime/size of every source CSV; a
+load rebuilds the block when any CSV is added, removed or changed.
+
+Assets are keyed by upper-case letters and digits only, so 'AUDCAD_otc',
+'#AUDCAD_otc' and the file prefix 'AUDCADOTC' all name the same series.
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from candle_store import COLUMNS, TS
+
+TIMEFRAMES = {60: 'data_1m', 300: 'data_5m'}  # period (seconds) -> CSV directory
+CACHE_DIR = 'historical_cache'
+INDEX_VERSION = 1
+
+
+def asset_key(name: str) -> str:
+    """Dataset key of an asset name ('#AUDCAD_otc' -> 'AUDCADOTC')"""
+    return re.sub(r'[^A-Z0-9]', '', name.upper())
+
+
+def file_asset(filename: str) -> str:
+    """Asset key of a CSV name ('AUDCADOTC_2024_2_2_18.csv' -> 'AUDCADOTC')"""
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    parts = stem.split('_')
+    while len(parts) > 1 and parts[-1].isdigit():
+        parts.pop()
+    return asset_key('_'.join(parts))
+
+
+def read_csv(path: str) -> np.ndarray:
+    """(n, 5) [timestamp, open, close, high, low] rows of one CSV"""
+    rows = np.loadtxt(path, delimiter=',', skiprows=1, usecols=(1, 2, 3, 4, 5), ndmin=2, dtype=np.float64)
+    return rows.reshape(-1, COLUMNS)
+
+
+def merge_series(parts: List[np.ndarray]) -> np.ndarray:
+    """Concatenate, sort by timestamp, keep the last row of duplicated timestamps"""
+    candles = np.concatenate(parts) if len(parts) > 1 else parts[0]
+    candles = candles[np.argsort(candles[:, TS], kind='stable')]
+    if len(candles) > 1:
+        keep = np.append(candles[1:, TS] != candles[:-1, TS], True)
+        candles = candles[keep]
+    return candles
+
+
+def to_timestamp(value) -> Optional[float]:
+    """None, epoch seconds, datetime or ISO date string -> epoch seconds"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+
+def slice_candles(candles: np.ndarray, start=None, end=None, limit: Optional[int] = None) -> np.ndarray:
+    """Time-sorted candles with start <= timestamp < end, the last `limit` of them (views, no copy)"""
+    start, end = to_timestamp(start), to_timestamp(end)
+    if start is not None or end is not None:
+        ts = candles[:, TS]
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side='left'))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, end, side='left'))
+        candles = candles[lo:hi]
+    if limit:
+        candles = candles[-limit:]
+    return candles
+
+
+class HistoricalDataset:
+    """
+    Usage:
+        dataset = get_dataset()
+        candles = dataset.candles('AUDCAD_otc', period=60, start='2024-02-05')
+        for (asset, period), candles in dataset.select(periods=[300]).items(): ...
+
+    Returned arrays are read-only slices of the memory-mapped block.
+    """
+
+    def __init__(self, timeframes: Dict[int, str] = TIMEFRAMES, cache_dir: str = CACHE_DIR):
+        self.timeframes = timeframes
+        self.cache_dir = cache_dir
+        self.block: Optional[np.ndarray] = None
+        self.series: Dict[Tuple[str, int], Tuple[int, int]] = {}  # (asset, period) -> (start row, stop row)
+        self.files: Dict[Tuple[str, int], List[str]] = {}
+        self._sources: Dict[str, List[int]] = {}
+        self.builds = 0
+        self.loads = 0
+
+    @property
+    def block_path(self) -> str:
+        return os.path.join(self.cache_dir, 'candles.npy')
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.cache_dir, 'index.json')
+
+    def scan(self) -> Dict[str, List[int]]:
+        """{csv path: [mtime_ns, size]} of every source file"""
+        sources = {}
+        for period, directory in sorted(self.timeframes.items()):
+            if not os.path.isdir(directory):
+                continue
+            for filename in sorted(os.listdir(directory)):
+                if filename.endswith('.csv'):
+                    path = os.path.join(directory, filename)
+                    stat = os.stat(path)
+                    sources[path] = [stat.st_mtime_ns, stat.st_size]
+        return sources
+
+    def load(self, force: bool = False) -> 'HistoricalDataset':
+        """Map the cached block, rebuilding it first if any CSV changed"""
+        sources = self.scan()
+        if self.block is not None and not force and sources == self._sources:
+            return self
+        if force or not self._read_index(sources):
+            self.build(sources)
+        self.block = np.load(self.block_path, mmap_mode='r')
+        self.loads += 1
+        return self
+
+    def _read_index(self, sources: Dict[str, List[int]]) -> bool:
+        if not os.path.exists(self.index_path) or not os.path.exists(self.block_path):
+            return False
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except (ValueError, OSError):
+            return False
+        if index.get('version') != INDEX_VERSION or index.get('sources') != sources:
+            return False
+
+        self._set_index(index)
+        return True
+
+    def _set_index(self, index: Dict):
+        self._sources = index['sources']
+        self.series = {}
+        self.files = {}
+        for entry in index['series']:
+            key = (entry['asset'], entry['period'])
+            self.series[key] = (entry['start'], entry['stop'])
+            self.files[key] = entry['files']
+
+    def build(self, sources: Optional[Dict[str, List[int]]] = None):
+        """Parse every CSV into the columnar block and write the index"""
+        sources = self.scan() if sources is None else sources
+        period_of = {os.path.normpath(directory): period for period, directory in self.timeframes.items()}
+
+        grouped: Dict[Tuple[str, int], List[Tuple[str, np.ndarray]]] = {}
+        for path in sources:
+            try:
+                rows = read_csv(path)
+            except ValueError as e:
+                print(f"⚠️ Skipping unreadable historical file {path}: {e}")
+                continue
+            if len(rows):
+                key = (file_asset(path), period_of[os.path.normpath(os.path.dirname(path))])
+                grouped.setdefault(key, []).append((path, rows))
+
+        entries = []
+        blocks = []
+        offset = 0
+        for asset, period in sorted(grouped):
+            parts = grouped[(asset, period)]
+            candles = merge_series([rows for _, rows in parts])
+            blocks.append(candles)
+            entries.append({'asset': asset, 'period': period, 'start': offset, 'stop': offset + len(candles),
+                            'files': [path for path, _ in parts]})
+            offset += len(candles)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        block = np.concatenate(blocks) if blocks else np.empty((0, COLUMNS), dtype=np.float64)
+
+        # Write to temporary names first so a crash never leaves a block that doesn't match its index
+        np.save(self.block_path + '.tmp.npy', block)
+        os.replace(self.block_path + '.tmp.npy', self.block_path)
+        index = {'version': INDEX_VERSION, 'sources': sources, 'series': entries}
+        with open(self.index_path + '.tmp', 'w') as f:
+            json.dump(index, f)
+        os.replace(self.index_path + '.tmp', self.index_path)
+
+        self._set_index(index)
+        self.builds += 1
+
+    # ==================== SELECTION ====================
+
+    def assets(self, period: Optional[int] = None) -> List[str]:
+        self.load()
+        return sorted({asset for asset, p in self.series if period is None or p == period})
+
+    def periods(self, asset: str) -> List[int]:
+        self.load()
+        return sorted(p for a, p in self.series if a == asset_key(asset))
+
+    def candles(self, asset: str, period: int = 60, start=None, end=None,
+                limit: Optional[int] = None) -> np.ndarray:
+        """
+        (n, 5) candles of one asset and timeframe
+
+        start / end bound the candle timestamps (inclusive / exclusive) and
+        accept epoch seconds, datetimes or ISO strings. limit keeps the most
+        recent candles. Unknown assets give an empty array.
+        """
+        self.load()
+        return self._slice(asset_key(asset), period, start, end, limit)
+
+    def _slice(self, asset: str, period: int, start, end, limit: Optional[int]) -> np.ndarray:
+        rows = self.series.get((asset, period))
+        if rows is None:
+            return np.empty((0, COLUMNS), dtype=np.float64)
+
+        return slice_candles(self.block[rows[0]:rows[1]], start, end, limit)
+
+    def select(self, assets: Optional[List[str]] = None, periods: Optional[List[int]] = None,
+               start=None, end=None, limit: Optional[int] = None) -> Dict[Tuple[str, int], np.ndarray]:
+        """{(asset, period): candles} for the given assets / timeframes (None = all)"""
+        self.load()
+        wanted = {asset_key(asset) for asset in assets} if assets else None
+        selected = {}
+        for asset, period in sorted(self.series):
+            if wanted is not None and asset not in wanted:
+                continue
+            if periods and period not in periods:
+                continue
+            candles = self._slice(asset, period, start, end, limit)
+            if len(candles):
+                selected[(asset, period)] = candles
+        return selected
+
+    def get_stats(self) -> Dict:
+        self.load()
+        return {
+            'files': len(self._sources),
+            'series': len(self.series),
+            'assets': len({asset for asset, _ in self.series}),
+            'candles': int(len(self.block)) if self.block is not None else 0,
+            'builds': self.builds,
+            'loads': self.loads,
+        }
+
+
+# Global instance
+_dataset_instance = None
+
+
+def get_dataset() -> HistoricalDataset:
+    """Get or create global historical dataset instance"""
+    global _dataset_instance
+    if _dataset_instance is None:
+        _dataset_instance = HistoricalDataset()
+    return _dataset_instance
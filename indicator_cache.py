@@ -0,0 +1,111 @@
+"""
+Indicator Cache - Per-bar memoisation of indicator values
+LRU cache keyed by (asset, period, last closed bar ts, indicator, params)
+
+Two kinds of entries share the cache:
+    closed   - computed from closed candles only (candles[:-1]); valid until
+               the next candle closes
+    forming  - depend on the forming candle too; the entry remembers the
+               forming bar it was computed for and is recomputed only when
+               that bar changed
+
+History reloads rewrite closed candles without moving the last timestamp,
+so the cache drops an asset/period's entries on 'history_loaded' events.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+from candle_store import TS
+from tick_aggregator import HISTORY_LOADED
+
+DEFAULT_MAXSIZE = 4096
+
+_MISSING = object()
+
+
+def bar_key(candles) -> Tuple[Optional[float], Tuple[float, ...]]:
+    """(last closed bar ts, forming bar) for an (n, 5) candle array"""
+    n = len(candles)
+    closed_ts = float(candles[-2][TS]) if n > 1 else None
+    forming = tuple(float(v) for v in candles[-1][:5]) if n else ()
+    return closed_ts, forming
+
+
+class IndicatorCache:
+    """
+    Usage:
+        found, value = cache.get(asset, period, candles, 'bollinger', (20, 2))
+        if not found:
+            value = compute()
+            cache.put(asset, period, candles, 'bollinger', (20, 2), value)
+
+    closed=True keys the entry on closed candles only.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple, Tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _key(self, asset: str, period: int, candles, name: str, params: Hashable, closed: bool):
+        closed_ts, forming = bar_key(candles)
+        return (asset, period, closed_ts, name, params), (None if closed else forming)
+
+    def get(self, asset: str, period: int, candles, name: str, params: Hashable = (),
+            closed: bool = False) -> Tuple[bool, object]:
+        key, forming = self._key(asset, period, candles, name, params, closed)
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING or entry[0] != forming:
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[1]
+
+    def put(self, asset: str, period: int, candles, name: str, params: Hashable, value,
+            closed: bool = False):
+        key, forming = self._key(asset, period, candles, name, params, closed)
+        self._entries[key] = (forming, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, asset: str, period: Optional[int] = None):
+        """Drop an asset's entries (optionally one period only)"""
+        stale = [key for key in self._entries
+                 if key[0] == asset and (period is None or key[1] == period)]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+
+    def on_candle_event(self, event: Dict):
+        """Tick aggregator subscriber"""
+        if event['type'] == HISTORY_LOADED:
+            self.invalidate(event['asset'], event['period'])
+
+    def clear(self):
+        self._entries.clear()
+
+    def reset_stats(self):
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
@@ -0,0 +1,543 @@
+"""
+Indicator Engine - Incremental indicator state per candle series
+O(1) work per tick instead of recomputing every indicator over the whole buffer
+
+Every indicator keeps "committed" state for closed candles and evaluates
+the forming (last) candle on top of it without mutating that state:
+
+    commit(bar)  - a candle closed, fold it in (once per candle)
+    peek(bar)    - value including the forming candle (every tick)
+
+The formulas match the scalar functions in main.py (calculate_ema,
+calculate_rsi, calculate_atr, calculate_macd, calculate_stochastic,
+calculate_supertrend, calculate_adx, calculate_synthetic_volume +
+calculate_vwap) so results agree to float rounding.
+Seeds (first SMA of EMA/Wilder series) are taken at the start of the
+series the engine was built from.
+
+IndicatorRegistry keeps one engine per (asset, period) in sync with its
+CandleBuffer and rebuilds it when the buffer is reloaded, or when a full
+ring buffer drops candles while the engine's seeds still carry weight
+(see SETTLE_SPANS).
+"""
+
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Bar tuple layout, same column order as the candle buffers
+TS, OPEN, CLOSE, HIGH, LOW = range(5)
+
+# A seed's weight decays by (1 - 1/span) per candle; after 40 spans it is
+# below float rounding, so dropping the candles it came from changes nothing
+SETTLE_SPANS = 40
+
+
+def true_range(high: float, low: float, prev_close: float) -> float:
+    return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+
+class EMAState:
+    """EMA seeded with the SMA of the first `period` closes"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.multiplier = 2 / (period + 1)
+        self.count = 0
+        self._seed_sum = 0.0
+        self.value: Optional[float] = None  # EMA of the committed closes
+
+    def _step(self, close: float) -> Optional[float]:
+        if self.count + 1 < self.period:
+            return None
+        if self.count + 1 == self.period:
+            return (self._seed_sum + close) / self.period
+        return (close - self.value) * self.multiplier + self.value
+
+    def commit(self, close: float):
+        self.value = self._step(close)
+        if self.count < self.period:
+            self._seed_sum += close
+        self.count += 1
+
+    def peek(self, close: float) -> Optional[float]:
+        return self._step(close)
+
+
+class WilderState:
+    """Wilder smoothing: SMA of the first `period` values, then (s * (p - 1) + x) / p"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self._seed_sum = 0.0
+        self.value: Optional[float] = None
+
+    def _step(self, x: float) -> Optional[float]:
+        if self.count + 1 < self.period:
+            return None
+        if self.count + 1 == self.period:
+            return (self._seed_sum + x) / self.period
+        return (self.value * (self.period - 1) + x) / self.period
+
+    def commit(self, x: float) -> Optional[float]:
+        self.value = self._step(x)
+        if self.count < self.period:
+            self._seed_sum += x
+        self.count += 1
+        return self.value
+
+    def peek(self, x: float) -> Optional[float]:
+        return self._step(x)
+
+
+class RSIState:
+    """RSI from simple average gain/loss over the last `period` close-to-close moves"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._deltas = deque(maxlen=period - 1)
+        self._last_close: Optional[float] = None
+
+    def commit(self, bar):
+        close = bar[CLOSE]
+        if self._last_close is not None:
+            self._deltas.append(close - self._last_close)
+        self._last_close = close
+
+    def peek(self, bar) -> Optional[float]:
+        if self._last_close is None or len(self._deltas) < self.period - 1:
+            return None
+
+        deltas = list(self._deltas)
+        deltas.append(bar[CLOSE] - self._last_close)
+        avg_gain = sum(d for d in deltas if d > 0) / self.period
+        avg_loss = -sum(d for d in deltas if d < 0) / self.period
+
+        if avg_loss == 0:
+            return 100
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+class ATRState:
+    """Simple average of the last `period` true ranges"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._ranges = deque(maxlen=period - 1)
+        self._last_close: Optional[float] = None
+
+    def commit(self, bar):
+        if self._last_close is not None:
+            self._ranges.append(true_range(bar[HIGH], bar[LOW], self._last_close))
+        self._last_close = bar[CLOSE]
+
+    def peek(self, bar) -> Optional[float]:
+        if self._last_close is None or len(self._ranges) < self.period - 1:
+            return None
+        total = sum(self._ranges) + true_range(bar[HIGH], bar[LOW], self._last_close)
+        return total / self.period
+
+
+class MACDState:
+    """MACD line, signal = mean of the last `signal_period` MACD values, histogram"""
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        self.slow_period = slow_period
+        self.signal_period = signal_period
+        self.fast = EMAState(fast_period)
+        self.slow = EMAState(slow_period)
+        self._macd = deque(maxlen=max(signal_period - 1, 1))
+        self.count = 0
+
+    def commit(self, bar):
+        self.fast.commit(bar[CLOSE])
+        self.slow.commit(bar[CLOSE])
+        if self.fast.value and self.slow.value:
+            self._macd.append(self.fast.value - self.slow.value)
+        self.count += 1
+
+    def peek(self, bar) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+        if self.count + 1 < self.slow_period + self.signal_period:
+            return None, None, None
+
+        ema_fast = self.fast.peek(bar[CLOSE])
+        ema_slow = self.slow.peek(bar[CLOSE])
+        if ema_fast is None or ema_slow is None:
+            return None, None, None
+
+        macd_line = ema_fast - ema_slow
+        values = [macd_line]
+        if self.signal_period > 1:
+            values += list(self._macd)[-(self.signal_period - 1):]
+        signal_line = sum(values) / len(values)
+        return macd_line, signal_line, macd_line - signal_line
+
+
+class StochasticState:
+    """%K over the last k_period bars, %D = mean of the last d_period valid %K"""
+
+    def __init__(self, k_period: int = 14, d_period: int = 3):
+        self.k_period = k_period
+        self.d_period = d_period
+        self._bars = deque(maxlen=k_period + d_period)  # (close, high, low)
+        self.count = 0
+
+    def commit(self, bar):
+        self._bars.append((bar[CLOSE], bar[HIGH], bar[LOW]))
+        self.count += 1
+
+    def peek(self, bar) -> Tuple[Optional[float], Optional[float]]:
+        n = self.count + 1
+        if n < self.k_period:
+            return None, None
+
+        bars = list(self._bars)
+        bars.append((bar[CLOSE], bar[HIGH], bar[LOW]))
+
+        def k_at(offset):
+            # %K for the window ending `offset` bars before the forming one
+            end = len(bars) - offset
+            window = bars[end - self.k_period:end]
+            high = max(b[1] for b in window)
+            low = min(b[2] for b in window)
+            return bars[end - 1][0], high, low
+
+        close, high, low = k_at(0)
+        k_value = 50 if high == low else ((close - low) / (high - low)) * 100
+
+        k_values = []
+        for i in range(self.d_period):
+            if n > self.k_period + i:
+                close_i, high_i, low_i = k_at(i)
+                if high_i != low_i:
+                    k_values.append(((close_i - low_i) / (high_i - low_i)) * 100)
+
+        d_value = sum(k_values) / len(k_values) if k_values else k_value
+        return k_value, d_value
+
+
+class SuperTrendState:
+    """HL/2 +- multiplier * ATR band test on the last two bars"""
+
+    def __init__(self, atr_period: int = 10, multiplier: float = 3):
+        self.multiplier = multiplier
+        self.atr = ATRState(atr_period)
+        self._prev = None  # Last committed bar
+
+    def commit(self, bar):
+        self.atr.commit(bar)
+        self._prev = bar
+
+    def peek(self, bar) -> Tuple[Optional[float], int]:
+        atr = self.atr.peek(bar)
+        if not atr:
+            return None, 0
+
+        hl2 = (bar[HIGH] + bar[LOW]) / 2
+        upper_band = hl2 + (self.multiplier * atr)
+        lower_band = hl2 - (self.multiplier * atr)
+        close = bar[CLOSE]
+
+        if close > upper_band:
+            return lower_band, 1
+        if close < lower_band:
+            return upper_band, -1
+
+        prev_hl2 = (self._prev[HIGH] + self._prev[LOW]) / 2
+        if self._prev[CLOSE] > prev_hl2:
+            return lower_band, 1
+        return upper_band, -1
+
+
+class ADXState:
+    """ADX with +DI/-DI and crossover signal, Wilder-smoothed from the series start"""
+
+    DEFAULT = (25, 50, 50, 'neutral')
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.tr = WilderState(period)
+        self.plus_dm = WilderState(period)
+        self.minus_dm = WilderState(period)
+        self.adx = WilderState(period)
+        self._prev = None
+        self._di = None  # (+DI, -DI) of the last committed bar
+
+    def _moves(self, bar):
+        prev = self._prev
+        tr = true_range(bar[HIGH], bar[LOW], prev[CLOSE])
+        high_diff = bar[HIGH] - prev[HIGH]
+        low_diff = prev[LOW] - bar[LOW]
+        plus_dm = high_diff if high_diff > low_diff and high_diff > 0 else 0
+        minus_dm = low_diff if low_diff > high_diff and low_diff > 0 else 0
+        return tr, plus_dm, minus_dm
+
+    @staticmethod
+    def _di_dx(s_tr, s_plus, s_minus):
+        if s_tr != 0:
+            plus_di = 100 * (s_plus / s_tr)
+            minus_di = 100 * (s_minus / s_tr)
+        else:
+            plus_di = minus_di = 0
+        di_sum = plus_di + minus_di
+        dx = 100 * abs(plus_di - minus_di) / di_sum if di_sum != 0 else 0
+        return plus_di, minus_di, dx
+
+    def commit(self, bar):
+        if self._prev is not None:
+            tr, plus_dm, minus_dm = self._moves(bar)
+            s_tr = self.tr.commit(tr)
+            s_plus = self.plus_dm.commit(plus_dm)
+            s_minus = self.minus_dm.commit(minus_dm)
+            if s_tr is not None:
+                plus_di, minus_di, dx = self._di_dx(s_tr, s_plus, s_minus)
+                self._di = (plus_di, minus_di)
+                self.adx.commit(dx)
+        self._prev = bar
+
+    def peek(self, bar) -> Tuple:
+        if self._prev is None:
+            return self.DEFAULT
+
+        tr, plus_dm, minus_dm = self._moves(bar)
+        s_tr = self.tr.peek(tr)
+        if s_tr is None:
+            return self.DEFAULT
+
+        plus_di, minus_di, dx = self._di_dx(s_tr, self.plus_dm.peek(plus_dm), self.minus_dm.peek(minus_dm))
+        adx_value = self.adx.peek(dx)
+        # main.calculate_adx needs `period` smoothed values (2 * period candles)
+        if adx_value is None or self.tr.count + 1 < 2 * self.period - 1:
+            return self.DEFAULT
+
+        di_cross_signal = 'neutral'
+        if self._di is not None:
+            prev_plus_di, prev_minus_di = self._di
+            if prev_plus_di <= prev_minus_di and plus_di > minus_di:
+                di_cross_signal = 'bullish_cross'
+            elif prev_minus_di <= prev_plus_di and minus_di > plus_di:
+                di_cross_signal = 'bearish_cross'
+            elif plus_di > minus_di:
+                di_cross_signal = 'bullish'
+            elif minus_di > plus_di:
+                di_cross_signal = 'bearish'
+
+        return round(adx_value, 2), round(plus_di, 2), round(minus_di, 2), di_cross_signal
+
+
+def synthetic_volume(bar, avg_range: Optional[float]) -> float:
+    """
+    Un-normalised synthetic volume of one bar (calculate_synthetic_volume before
+    dividing by the series mean); avg_range is the mean raw range of the
+    previous 14 bars, None while there are fewer
+    """
+    price_range = bar[HIGH] - bar[LOW]
+    if price_range == 0:
+        price_range = 0.00001
+    body_ratio = abs(bar[CLOSE] - bar[OPEN]) / price_range
+    if avg_range is None:
+        volatility_factor = 1.0
+    else:
+        volatility_factor = price_range / avg_range if avg_range > 0 else 1.0
+    return price_range * (1 + body_ratio) * volatility_factor
+
+
+class VolumeState:
+    """
+    Synthetic volume and rolling VWAP (typical price HLC/3) with running sums
+
+    Volumes stay un-normalised: the VWAP, its bands and the volume-trend
+    ratios are all invariant to the scale of volume, so the division by the
+    series mean in calculate_synthetic_volume can be skipped. VWAP sums are
+    kept around the first typical price so the squared term doesn't cancel,
+    and re-summed from the window once per window length to stop drift.
+    """
+
+    def __init__(self, lookback: int = 14, trend_period: int = 14, vwap_window: int = 100):
+        self.lookback = lookback
+        self.vwap_window = vwap_window
+        self._ranges = deque(maxlen=lookback)  # Raw high - low of the last committed bars
+        self._volumes = deque(maxlen=trend_period * 2 - 1)  # For analyze_volume_trend
+        self._window = deque(maxlen=vwap_window - 1)  # (centred typical price, volume)
+        self._ref: Optional[float] = None
+        self._v_sum = 0.0
+        self._pv_sum = 0.0
+        self._p2v_sum = 0.0
+        self.count = 0
+
+    def _volume(self, bar) -> float:
+        avg_range = sum(self._ranges) / self.lookback if len(self._ranges) == self.lookback else None
+        return synthetic_volume(bar, avg_range)
+
+    def _typical(self, bar) -> float:
+        return (bar[HIGH] + bar[LOW] + bar[CLOSE]) / 3
+
+    def commit(self, bar):
+        volume = self._volume(bar)
+        self._volumes.append(volume)
+        self._ranges.append(bar[HIGH] - bar[LOW])
+
+        typical = self._typical(bar)
+        if self._ref is None:
+            self._ref = typical
+        price = typical - self._ref
+
+        if len(self._window) == self._window.maxlen:
+            old_price, old_volume = self._window[0]
+            self._v_sum -= old_volume
+            self._pv_sum -= old_price * old_volume
+            self._p2v_sum -= old_price * old_price * old_volume
+        self._window.append((price, volume))
+        self._v_sum += volume
+        self._pv_sum += price * volume
+        self._p2v_sum += price * price * volume
+
+        self.count += 1
+        if self.count % self.vwap_window == 0:
+            self._v_sum = sum(v for _, v in self._window)
+            self._pv_sum = sum(p * v for p, v in self._window)
+            self._p2v_sum = sum(p * p * v for p, v in self._window)
+
+    def peek(self, bar) -> Tuple[list, Optional[float], float]:
+        """(recent volumes incl. the forming bar, VWAP, VWAP std)"""
+        volume = self._volume(bar)
+        volumes = list(self._volumes)
+        volumes.append(volume)
+
+        ref = self._typical(bar) if self._ref is None else self._ref
+        price = self._typical(bar) - ref
+        v_sum = self._v_sum + volume
+        if v_sum <= 0:
+            return volumes, None, 0.0
+
+        mean = (self._pv_sum + price * volume) / v_sum
+        variance = max((self._p2v_sum + price * price * volume) / v_sum - mean * mean, 0.0)
+        return volumes, mean + ref, variance ** 0.5
+
+
+class IndicatorEngine:
+    """
+    All incremental indicators for one candle series
+
+    snapshot() returns the values enhanced_strategy needs, including the
+    previous-bar EMAs (the committed values).
+    """
+
+    def __init__(self, fast_ema: int = 9, slow_ema: int = 21, rsi_period: int = 14, adx_period: int = 14):
+        self.params = (fast_ema, slow_ema, rsi_period, adx_period)
+        self.ema_fast = EMAState(fast_ema)
+        self.ema_slow = EMAState(slow_ema)
+        self.rsi = RSIState(rsi_period)
+        self.atr = ATRState(14)
+        self.macd = MACDState()
+        self.stochastic = StochasticState()
+        self.supertrend = SuperTrendState()
+        self.adx = ADXState(adx_period)
+        self.volume = VolumeState()
+        self._bar_states = (self.rsi, self.atr, self.macd, self.stochastic, self.supertrend, self.adx, self.volume)
+        self.committed = 0
+        # Candles needed before the slowest seeded series (Wilder ADX, EMAs) forgets its seed
+        self.settle = int(SETTLE_SPANS * max(adx_period, (slow_ema + 1) / 2, (self.macd.slow_period + 1) / 2))
+
+    def commit(self, bar):
+        close = bar[CLOSE]
+        self.ema_fast.commit(close)
+        self.ema_slow.commit(close)
+        for state in self._bar_states:
+            state.commit(bar)
+        self.committed += 1
+
+    def snapshot(self, bar) -> Dict:
+        close = bar[CLOSE]
+        return {
+            'ema_fast': self.ema_fast.peek(close),
+            'ema_slow': self.ema_slow.peek(close),
+            'ema_fast_prev': self.ema_fast.value,
+            'ema_slow_prev': self.ema_slow.value,
+            'rsi': self.rsi.peek(bar),
+            'atr': self.atr.peek(bar),
+            'macd': self.macd.peek(bar),
+            'stochastic': self.stochastic.peek(bar),
+            'supertrend': self.supertrend.peek(bar),
+            'adx': self.adx.peek(bar),
+            'volume': self.volume.peek(bar),  # (recent volumes, vwap, vwap std)
+        }
+
+
+class IndicatorRegistry:
+    """
+    One IndicatorEngine per (asset, period), kept in sync with its CandleBuffer
+
+    Closed candles are committed once; a buffer reload (new generation),
+    a parameter change or losing track of the last committed candle
+    triggers a rebuild from the buffer contents. So does a wrapped buffer
+    dropping its oldest candle before the engine has settled, so values
+    always match a recompute over buffer.view().
+    """
+
+    def __init__(self):
+        self._engines: Dict[Tuple[str, int], Dict] = {}
+        self.rebuilds = 0
+        self.commits = 0
+
+    def clear(self):
+        self._engines.clear()
+
+    def update(self, asset: str, period: int, buffer, fast_ema: int = 9, slow_ema: int = 21,
+               rsi_period: int = 14, adx_period: int = 14) -> Optional[Dict]:
+        """Sync the engine with the buffer and return the current snapshot"""
+        n = len(buffer)
+        if not n:
+            return None
+
+        key = (asset, period)
+        entry = self._engines.get(key)
+        params = (fast_ema, slow_ema, rsi_period, adx_period)
+        view = buffer.view()
+
+        if (entry is None or entry['generation'] != buffer.generation or entry['engine'].params != params
+                or (view[0, TS] != entry['first_ts'] and entry['engine'].committed < entry['engine'].settle)):
+            entry = self._rebuild(key, buffer, view, params)
+        else:
+            last_ts = entry['last_ts']
+            if last_ts is None:
+                start = 0
+            else:
+                ts = buffer.ts
+                pos = int(np.searchsorted(ts, last_ts))
+                if pos >= n or ts[pos] != last_ts:
+                    entry = self._rebuild(key, buffer, view, params)
+                    start = None
+                else:
+                    start = pos + 1
+            if start is not None:
+                self._commit_range(entry, view, start, n - 1)
+
+        return entry['engine'].snapshot(tuple(view[-1].tolist()))
+
+    def _rebuild(self, key, buffer, view, params) -> Dict:
+        entry = {
+            'engine': IndicatorEngine(*params),
+            'generation': buffer.generation,
+            'first_ts': float(view[0, TS]),
+            'last_ts': None,
+        }
+        self._engines[key] = entry
+        self.rebuilds += 1
+        self._commit_range(entry, view, 0, len(view) - 1)
+        return entry
+
+    def _commit_range(self, entry: Dict, view: np.ndarray, start: int, stop: int):
+        """Commit closed candles view[start:stop]"""
+        if start >= stop:
+            return
+        engine = entry['engine']
+        for bar in view[start:stop].tolist():
+            engine.commit(bar)
+        entry['last_ts'] = float(view[stop - 1, TS])
+        self.commits += stop - start
+
+    def get_stats(self) -> Dict:
+        return {'engines': len(self._engines), 'rebuilds': self.rebuilds, 'commits': self.commits}
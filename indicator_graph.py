@@ -0,0 +1,126 @@
+"""
+Indicator Graph - Compute only the indicators the active strategies use
+Dependency graph from strategy conditions to indicator computations
+
+Each node is one computation in enhanced_strategy and lists the
+strategy_indicators keys it produces. A strategy needs a node when one of
+its entry_conditions / condition_groups references an output (as the
+indicator or as a named threshold such as 'upper_bb'), when its
+regime_filter needs the market regime, or when it asks for timeframe
+alignment. Prerequisites are added transitively.
+
+BASE_NODES are always computed: the traditional fallback scoring reads them
+whenever no strategy fires.
+"""
+
+from typing import Dict, Iterable, Set
+
+# Computation node -> strategy_indicators keys it produces
+NODE_OUTPUTS = {
+    'ema': ('ema_cross', 'ema_fast', 'ema_slow'),
+    'rsi': ('rsi',),
+    'atr': ('atr',),
+    'macd': ('macd_line', 'macd_signal_line', 'macd_histogram'),
+    'stochastic': ('stochastic_k', 'stochastic_d'),
+    'supertrend': ('supertrend', 'supertrend_direction'),
+    'bollinger': ('bollinger_position', 'upper_bb', 'middle_bb', 'lower_bb'),
+    'support_resistance': ('support', 'resistance'),
+    'patterns': ('pattern_name', 'pattern_strength', 'pattern_direction'),
+    'heikin_ashi': ('heikin_ashi', 'heikin_ashi_consecutive', 'heikin_ashi_strength'),
+    'adx': ('adx', 'plus_di', 'minus_di', 'di_cross'),
+    'volume': ('volume_trend', 'volume_signal', 'volume_strength'),
+    'vwap': ('vwap_position', 'vwap_deviation', 'vwap_value'),
+    'mtf': (),  # 5m/15m candles resampled from the primary timeframe
+    'mtf_alignment': (),
+    'regime': ('regime',),
+}
+
+# Node -> nodes it needs first
+NODE_DEPENDENCIES = {
+    'vwap': ('volume',),
+    'mtf_alignment': ('mtf',),
+    'regime': ('mtf', 'ema', 'rsi', 'supertrend', 'adx'),
+}
+
+BASE_NODES = ('ema', 'rsi', 'atr', 'macd', 'stochastic', 'supertrend',
+              'bollinger', 'support_resistance', 'patterns')
+
+OUTPUT_NODES = {output: node for node, outputs in NODE_OUTPUTS.items() for output in outputs}
+
+
+def strategy_conditions(strategy: Dict) -> Iterable[Dict]:
+    """All conditions of a strategy, old-style and grouped"""
+    yield from strategy.get('entry_conditions', []) or []
+    for group in strategy.get('condition_groups', []) or []:
+        yield from group.get('conditions', []) or []
+
+
+def strategy_nodes(strategy: Dict) -> Set[str]:
+    """Nodes a strategy references directly (before prerequisites)"""
+    nodes = set()
+    for condition in strategy_conditions(strategy):
+        for name in (condition.get('indicator'), condition.get('value')):
+            if isinstance(name, str) and name in OUTPUT_NODES:
+                nodes.add(OUTPUT_NODES[name])
+
+    if strategy.get('regime_filter'):
+        nodes.add('regime')
+    if strategy.get('timeframe_alignment', False):
+        nodes.add('mtf_alignment')
+    return nodes
+
+
+def resolve(nodes: Iterable[str]) -> Set[str]:
+    """Nodes plus all of their prerequisites"""
+    resolved = set()
+    pending = list(nodes)
+    while pending:
+        node = pending.pop()
+        if node in resolved:
+            continue
+        resolved.add(node)
+        pending.extend(NODE_DEPENDENCIES.get(node, ()))
+    return resolved
+
+
+class IndicatorGraph:
+    """
+    Required indicator set for the active strategies
+
+    Usage:
+        graph.rebuild(builder.get_active_strategies())
+        if graph.needs('adx'): ...
+    """
+
+    def __init__(self):
+        self.required: Set[str] = resolve(BASE_NODES)
+        self.unknown: Set[str] = set()  # Referenced names no node produces
+        self.strategies = 0
+        self.rebuilds = 0
+
+    def rebuild(self, strategies: Dict[str, Dict]):
+        nodes = set(BASE_NODES)
+        unknown = set()
+        for strategy in strategies.values():
+            nodes |= strategy_nodes(strategy)
+            for condition in strategy_conditions(strategy):
+                name = condition.get('indicator')
+                if name and name not in OUTPUT_NODES:
+                    unknown.add(name)
+
+        self.required = resolve(nodes)
+        self.unknown = unknown
+        self.strategies = len(strategies)
+        self.rebuilds += 1
+
+    def needs(self, node: str) -> bool:
+        return node in self.required
+
+    def get_stats(self) -> Dict:
+        return {
+            'active_strategies': self.strategies,
+            'required': sorted(self.required),
+            'skipped': sorted(set(NODE_OUTPUTS) - self.required),
+            'unknown_indicators': sorted(self.unknown),
+            'rebuilds': self.rebuilds,
+        }
@@ -0,0 +1,416 @@
+"""
+Indicator Library - Vectorised technical indicators over whole OHLC arrays
+Shared NumPy compute core for main.py, backtesting_engine.py and reversal_catcher.py
+
+Every function takes NumPy columns (time on the last axis, so a 2-D
+(assets, bars) block works the same as a single series) and returns
+full-length float64 series. Bars where an indicator is not defined yet
+are NaN.
+
+Formulas follow the scalar versions in main.py so the last value of each
+series equals what those functions returned:
+    ema        - seeded with the SMA of the first `period` values
+    rsi        - 'simple' (mean gain/loss over the window) or 'wilder'
+    atr        - simple mean of the last `period` true ranges
+    macd       - signal = SMA of the MACD line ('sma') or its EMA ('ema')
+    stochastic - %D averages only windows with a non-zero range
+    adx        - Wilder smoothing seeded with an SMA, like calculate_adx
+
+Recursive filters (EMA, Wilder, Heikin Ashi open) are evaluated in chunks
+with a closed-form cumulative sum, short enough that the decay factor
+never underflows, so they stay accurate without a Python loop per bar.
+"""
+
+from typing import Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Smallest decay factor allowed inside one closed-form chunk
+_MIN_DECAY = 1e-8
+
+
+def _as_float(x) -> np.ndarray:
+    return np.asarray(x, dtype=np.float64)
+
+
+def _nan_like(x: np.ndarray) -> np.ndarray:
+    return np.full(x.shape, np.nan, dtype=np.float64)
+
+
+def linear_filter(x: np.ndarray, alpha: float, y0) -> np.ndarray:
+    """
+    y[t] = (1 - alpha) * y[t - 1] + alpha * x[t], with y[-1] = y0
+
+    Vectorised along the last axis. Within a chunk:
+        y[t] = b^(t+1) * (y0 + alpha * cumsum(x[k] / b^(k+1)))
+    where b = 1 - alpha.
+    """
+    x = _as_float(x)
+    beta = 1.0 - alpha
+    out = np.empty(x.shape, dtype=np.float64)
+    n = x.shape[-1]
+    if n == 0:
+        return out
+
+    y_prev = np.broadcast_to(_as_float(y0), x.shape[:-1]).copy()
+    if beta <= 0.0:
+        out[...] = x
+        return out
+    if beta >= 1.0:
+        out[...] = y_prev[..., None]
+        return out
+
+    chunk = max(1, int(np.log(_MIN_DECAY) / np.log(beta)))
+    for start in range(0, n, chunk):
+        seg = x[..., start:start + chunk]
+        powers = beta ** np.arange(1, seg.shape[-1] + 1)
+        y = powers * (y_prev[..., None] + alpha * np.cumsum(seg / powers, axis=-1))
+        out[..., start:start + chunk] = y
+        y_prev = y[..., -1]
+    return out
+
+
+def ema(x, period: int, seed: str = 'sma') -> np.ndarray:
+    """
+    Exponential moving average (multiplier 2 / (period + 1))
+
+    seed='sma':   first value is the SMA of the first `period` values (main.py)
+    seed='first': starts from x[0] with no warm-up (reversal_catcher)
+    """
+    x = _as_float(x)
+    alpha = 2 / (period + 1)
+    if seed == 'first':
+        if x.shape[-1] == 0:
+            return x.copy()
+        return linear_filter(x, alpha, x[..., 0])
+    return _seeded_filter(x, period, alpha)
+
+
+def wilder(x, period: int) -> np.ndarray:
+    """Wilder smoothing: SMA of the first `period` values, then (s * (p - 1) + x) / p"""
+    return _seeded_filter(_as_float(x), period, 1 / period)
+
+
+def _seeded_filter(x: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    """First output at index period - 1 is the SMA seed, recursion afterwards"""
+    out = _nan_like(x)
+    n = x.shape[-1]
+    if n < period:
+        return out
+
+    seed = x[..., :period].mean(axis=-1)
+    out[..., period - 1] = seed
+    if n > period:
+        out[..., period:] = linear_filter(x[..., period:], alpha, seed)
+    return out
+
+
+def sma(x, period: int) -> np.ndarray:
+    """Simple moving average over the last `period` values"""
+    x = _as_float(x)
+    out = _nan_like(x)
+    if x.shape[-1] < period:
+        return out
+    out[..., period - 1:] = sliding_window_view(x, period, axis=-1).mean(axis=-1)
+    return out
+
+
+def rolling_std(x, period: int) -> np.ndarray:
+    """Population standard deviation over the last `period` values"""
+    x = _as_float(x)
+    out = _nan_like(x)
+    if x.shape[-1] < period:
+        return out
+    out[..., period - 1:] = sliding_window_view(x, period, axis=-1).std(axis=-1)
+    return out
+
+
+def rolling_max(x, period: int) -> np.ndarray:
+    x = _as_float(x)
+    out = _nan_like(x)
+    if x.shape[-1] < period:
+        return out
+    out[..., period - 1:] = sliding_window_view(x, period, axis=-1).max(axis=-1)
+    return out
+
+
+def rolling_min(x, period: int) -> np.ndarray:
+    x = _as_float(x)
+    out = _nan_like(x)
+    if x.shape[-1] < period:
+        return out
+    out[..., period - 1:] = sliding_window_view(x, period, axis=-1).min(axis=-1)
+    return out
+
+
+def shift(x, periods: int = 1) -> np.ndarray:
+    """Shift right along the last axis, NaN-filled"""
+    x = _as_float(x)
+    out = _nan_like(x)
+    if periods < x.shape[-1]:
+        out[..., periods:] = x[..., :x.shape[-1] - periods]
+    return out
+
+
+def momentum(x, period: int = 10) -> np.ndarray:
+    """x[t] - x[t - period]"""
+    x = _as_float(x)
+    return x - shift(x, period)
+
+
+# ==================== OSCILLATORS ====================
+
+def rsi(close, period: int = 14, smoothing: str = 'wilder') -> np.ndarray:
+    """
+    Relative Strength Index
+
+    smoothing='wilder': Wilder-smoothed average gain/loss (standard RSI)
+    smoothing='simple': mean gain/loss over the last `period` moves (main.calculate_rsi)
+    Returns 100 where the average loss is zero.
+    """
+    close = _as_float(close)
+    out = _nan_like(close)
+    if close.shape[-1] < period + 1:
+        return out
+
+    deltas = np.diff(close, axis=-1)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+
+    if smoothing == 'simple':
+        avg_gain = sma(gains, period)
+        avg_loss = sma(losses, period)
+    else:
+        avg_gain = wilder(gains, period)
+        avg_loss = wilder(losses, period)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = 100 - (100 / (1 + avg_gain / avg_loss))
+    values = np.where(avg_loss == 0, 100.0, values)
+    out[..., 1:] = np.where(np.isnan(avg_gain), np.nan, values)
+    return out
+
+
+def stochastic(high, low, close, k_period: int = 14, d_period: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stochastic oscillator (%K, %D)
+
+    %K is 50 when the window has no range. %D averages the %K of the last
+    d_period windows that have a range, falling back to %K.
+    """
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    highest = rolling_max(high, k_period)
+    lowest = rolling_min(low, k_period)
+    spread = highest - lowest
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        raw_k = (close - lowest) / spread * 100
+    raw_k = np.where(spread == 0, np.nan, raw_k)
+    k = np.where(spread == 0, 50.0, raw_k)
+
+    # Same availability rule as main.calculate_stochastic: window i needs n > k_period + i
+    index = np.arange(close.shape[-1])
+    total = np.zeros(close.shape, dtype=np.float64)
+    count = np.zeros(close.shape, dtype=np.float64)
+    for i in range(d_period):
+        shifted = shift(raw_k, i)
+        valid = (index >= k_period + i) & ~np.isnan(shifted)
+        total += np.where(valid, shifted, 0.0)
+        count += valid
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d = np.where(count > 0, total / count, k)
+    return k, d
+
+
+def macd(close, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9,
+         signal_mode: str = 'sma', seed: str = 'sma') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    MACD line, signal line and histogram
+
+    signal_mode='sma': signal is the mean of the last signal_period MACD values (main.py)
+    signal_mode='ema': signal is an EMA of the MACD line (classic)
+    """
+    close = _as_float(close)
+    macd_line = ema(close, fast_period, seed) - ema(close, slow_period, seed)
+
+    if signal_mode == 'ema':
+        if seed == 'first':
+            signal_line = ema(macd_line, signal_period, 'first')
+        else:
+            signal_line = _nan_like(close)
+            start = slow_period - 1
+            if close.shape[-1] > start:
+                signal_line[..., start:] = ema(macd_line[..., start:], signal_period)
+    else:
+        signal_line = sma(macd_line, signal_period)
+        if seed == 'sma':
+            # main.py only reports MACD once slow + signal candles exist
+            signal_line[..., :slow_period + signal_period - 1] = np.nan
+    return macd_line, signal_line, macd_line - signal_line
+
+
+# ==================== VOLATILITY ====================
+
+def true_range(high, low, close) -> np.ndarray:
+    """max(H - L, |H - prev C|, |L - prev C|), NaN for the first bar"""
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    prev_close = shift(close, 1)
+    return np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def atr(high, low, close, period: int = 14, smoothing: str = 'simple') -> np.ndarray:
+    """Average true range - simple mean (main.py) or Wilder-smoothed"""
+    tr = true_range(high, low, close)
+    out = _nan_like(tr)
+    if tr.shape[-1] < period + 1:
+        return out
+    smoother = wilder if smoothing == 'wilder' else sma
+    out[..., 1:] = smoother(tr[..., 1:], period)
+    return out
+
+
+def bollinger(close, period: int = 20, std_dev: float = 2) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bollinger bands (upper, middle, lower) with population std"""
+    middle = sma(close, period)
+    width = std_dev * rolling_std(close, period)
+    return middle + width, middle, middle - width
+
+
+def supertrend(high, low, close, atr_period: int = 10, multiplier: float = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    SuperTrend value and direction (1 bullish, -1 bearish, 0 undefined)
+
+    Same single-bar band test as main.calculate_supertrend: close above the
+    upper band is bullish, below the lower band bearish, otherwise the
+    previous bar's close vs its HL/2 decides.
+    """
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    atr_values = atr(high, low, close, atr_period)
+    hl2 = (high + low) / 2
+    upper_band = hl2 + multiplier * atr_values
+    lower_band = hl2 - multiplier * atr_values
+
+    prev_bullish = shift(close, 1) > shift(hl2, 1)
+    bullish = (close > upper_band) | ((close >= lower_band) & prev_bullish)
+
+    valid = ~np.isnan(atr_values) & (atr_values != 0)
+    direction = np.where(valid, np.where(bullish, 1, -1), 0)
+    value = np.where(valid, np.where(bullish, lower_band, upper_band), np.nan)
+    return value, direction
+
+
+# ==================== TREND ====================
+
+def adx(high, low, close, period: int = 14) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    ADX, +DI and -DI series (unrounded)
+
+    Wilder smoothing of TR/+DM/-DM starts at the second bar, exactly like
+    main.calculate_adx; ADX itself needs 2 * period candles.
+    """
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    shape = close.shape
+    adx_out, plus_out, minus_out = _nan_like(close), _nan_like(close), _nan_like(close)
+    if shape[-1] < period * 2:
+        return adx_out, plus_out, minus_out
+
+    tr = true_range(high, low, close)[..., 1:]
+    high_diff = np.diff(high, axis=-1)
+    low_diff = -np.diff(low, axis=-1)
+    plus_dm = np.where((high_diff > low_diff) & (high_diff > 0), high_diff, 0.0)
+    minus_dm = np.where((low_diff > high_diff) & (low_diff > 0), low_diff, 0.0)
+
+    s_tr = wilder(tr, period)
+    s_plus = wilder(plus_dm, period)
+    s_minus = wilder(minus_dm, period)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = np.where(s_tr != 0, 100 * s_plus / s_tr, 0.0)
+        minus_di = np.where(s_tr != 0, 100 * s_minus / s_tr, 0.0)
+        di_sum = plus_di + minus_di
+        dx = np.where(di_sum != 0, 100 * np.abs(plus_di - minus_di) / di_sum, 0.0)
+
+    # Smoothed series start at TR index period - 1 (candle index period)
+    start = period - 1
+    adx_values = wilder(dx[..., start:], period)
+
+    plus_out[..., period:] = plus_di[..., start:]
+    minus_out[..., period:] = minus_di[..., start:]
+    adx_out[..., period:] = adx_values
+    return adx_out, plus_out, minus_out
+
+
+def heikin_ashi(open_, high, low, close) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Heikin Ashi (open, close, high, low); HA open = mean of previous HA open/close"""
+    open_, high, low, close = _as_float(open_), _as_float(high), _as_float(low), _as_float(close)
+    ha_close = (open_ + high + low + close) / 4
+    ha_open = np.empty(close.shape, dtype=np.float64)
+    if close.shape[-1]:
+        ha_open[..., 0] = (open_[..., 0] + close[..., 0]) / 2
+        ha_open[..., 1:] = linear_filter(ha_close[..., :-1], 0.5, ha_open[..., 0])
+    ha_high = np.maximum(high, np.maximum(ha_open, ha_close))
+    ha_low = np.minimum(low, np.minimum(ha_open, ha_close))
+    return ha_open, ha_close, ha_high, ha_low
+
+
+# ==================== VOLUME ====================
+
+def synthetic_volume(open_, high, low, close, lookback: int = 14) -> np.ndarray:
+    """
+    Synthetic volume (Pocket Option has no real volume), normalised to mean 1.0
+
+    range * (1 + body / range) * (range / mean range of the previous `lookback` bars)
+    Series shorter than 20 bars get a flat 1.0.
+    """
+    open_, high, low, close = _as_float(open_), _as_float(high), _as_float(low), _as_float(close)
+    if close.shape[-1] < 20:
+        return np.ones(close.shape, dtype=np.float64)
+
+    raw_range = high - low
+    price_range = np.where(raw_range == 0, 0.00001, raw_range)
+    body_ratio = np.abs(close - open_) / price_range
+
+    avg_range = shift(sma(raw_range, lookback), 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volatility = np.where(avg_range > 0, price_range / avg_range, 1.0)
+    volatility = np.where(np.isnan(avg_range), 1.0, volatility)
+
+    volumes = price_range * (1 + body_ratio) * volatility
+    mean = volumes.mean(axis=-1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(mean > 0, volumes / mean, volumes)
+
+
+def vwap(high, low, close, volume, window: int = 100) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rolling volume-weighted average of typical price (HLC/3) and its weighted std
+
+    Each bar uses the last min(window, bars so far) candles. Both outputs are
+    invariant to the scale of `volume`.
+    """
+    high, low, close, volume = _as_float(high), _as_float(low), _as_float(close), _as_float(volume)
+    typical = (high + low + close) / 3
+
+    # Centre prices so the squared sums don't cancel catastrophically
+    ref = typical[..., :1]
+    centred = typical - ref
+
+    def windowed(x):
+        c = np.cumsum(x, axis=-1)
+        out = c.copy()
+        if x.shape[-1] > window:
+            out[..., window:] = c[..., window:] - c[..., :-window]
+        return out
+
+    v_sum = windowed(volume)
+    pv_sum = windowed(centred * volume)
+    p2v_sum = windowed(centred * centred * volume)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = pv_sum / v_sum
+        variance = np.maximum(p2v_sum / v_sum - mean * mean, 0.0)
+    vwap_values = np.where(v_sum > 0, mean + ref, close)
+    std = np.where(v_sum > 0, np.sqrt(variance), 0.0)
+    return vwap_values, std
@@ -21,7 +21,6 @@ load_dotenv()  # Current directory
 load_dotenv('../.env')  # Parent directory
 # Now environment variables are available
 import asyncio
-import base64
 import json
 import operator
 import platform
@@ -29,6 +28,20 @@ import random
 from datetime import datetime, timedelta
 from threading import Thread
 
+import numpy as np
+
+from candle_store import CandleStore
+import ws_stream
+from frame_recorder import FrameRecorder, FrameReplayer
+from tick_aggregator import TickAggregator, CACHE_GAP
+from evaluation_scheduler import EvaluationScheduler
+from data_quality import DataQualityMonitor, buffer_quality
+from profiler import get_profiler
+from indicator_engine import IndicatorRegistry
+from indicator_cache import IndicatorCache
+from indicator_graph import IndicatorGraph
+import indicator_lib
+
 # More immediate output
 print("✅ Python is running")
 print("✅ Working directory:", os.getcwd())
@@ -81,6 +94,7 @@ try:
     from strategy_builder import get_builder
     from strategy_builder_advanced import get_advanced_builder
     from backtesting_engine import get_backtest_engine
+    from backtest_runner import resolve_targets, run_backtests
     from trade_journal import get_journal
     STRATEGY_SYSTEMS_AVAILABLE = True
     print("✅ Custom Strategy Systems loaded successfully!")
@@ -110,6 +124,17 @@ if STRATEGY_SYSTEMS_AVAILABLE:
     except Exception as e:
         print(f"⚠️ Strategy systems init error: {e}")
 
+
+def rebuild_indicator_graph():
+    """Re-derive the required indicators from the active strategies"""
+    builder = advanced_strategy_builder or strategy_builder
+    INDICATOR_GRAPH.rebuild(builder.get_active_strategies() if builder else {})
+
+
+def indicator_needed(node):
+    """Should enhanced_strategy compute this indicator node?"""
+    return not settings.get('lazy_indicators', True) or INDICATOR_GRAPH.needs(node)
+
 # ===================================================================
 # AI SYSTEM REMOVED - CUSTOM STRATEGIES ONLY
 # ===================================================================
@@ -120,7 +145,15 @@ print("✅ Custom Strategy Mode - AI systems disabled")
 
 # Global variables
 DRIVER = None
-CANDLES = {}
+CANDLES = CandleStore()  # {asset: {period: CandleBuffer}}
+CANDLE_CACHE_DIR = 'candle_cache'  # Memory-mapped candle files for warm restarts
+TICK_AGGREGATOR = TickAggregator(CANDLES)  # Rolls candles per tick, derives 5m/15m from 1m
+EVAL_SCHEDULER = EvaluationScheduler()  # Assets whose candles changed since their last analysis
+DATA_QUALITY = DataQualityMonitor()  # Stream gaps + flat-run detection per asset
+INDICATOR_ENGINES = IndicatorRegistry()  # Incremental indicator state per (asset, period)
+INDICATOR_CACHE = IndicatorCache()  # Per-bar indicator memoisation (LRU)
+INDICATOR_GRAPH = IndicatorGraph()  # Indicators the active strategies actually reference
+PROFILER = get_profiler()  # Stage and per-strategy timings (profiling_enabled setting)
 ACTIONS = {}
 CURRENT_ASSET = None
 FAVORITES_REANIMATED = False
@@ -146,6 +179,9 @@ LAST_TRADE_CONFIDENCE = 0  # Confidence level
 # 🚀 TRADE EXECUTION LOCK - Prevents signal spam during trade placement
 TRADE_IN_PROGRESS = False  # Set to True while placing trade, blocks new signals
 
+# 📼 Session recording (see frame_recorder.py)
+FRAME_RECORDER = None
+
 # Bot state
 bot_state = {
     'running': False,
@@ -157,6 +193,7 @@ bot_state = {
     'win_streak': 0,
     'current_asset': '-',
     'mode': 'CONNECTING...',
+    'ws_stream': None,  # ws_stream.get_status() of the driver: 'cdp', 'poll' or 'stalled'
     'trades': [],
     'logs': [],
     'chart_data': {
@@ -343,7 +380,19 @@ settings = {
     'trading_hours_timezone': 'UTC',  # Timezone for trading hours
     'trading_hours_ranges': [  # List of time ranges when trading is allowed
         {'start': '09:00', 'end': '17:00'}  # Default: 9 AM to 5 PM
-    ]
+    ],
+
+    # 📡 WebSocket Ingestion
+    'ws_ingest_mode': 'cdp',  # cdp (DevTools frame events) or poll (performance log)
+    'record_frames': False,  # Record every frame to recordings/ for offline replay
+    'candle_cache_enabled': True,  # Persist candles to disk and warm start from them
+    'evaluation_trigger': 'tick',  # tick (every price change) or candle_close - when an asset is re-analyzed
+    'gap_fill_policy': 'ffill',  # ffill (flat filler candles) or mark (flag the candle after a gap)
+    'min_data_quality': 0.8,  # Skip analysis when less than this share of the last 50 candles is real data
+
+    # ⚡ Indicator Evaluation
+    'lazy_indicators': True,  # Only compute ADX/Heikin Ashi/Volume/VWAP/MTF/regime when an active strategy uses them
+    'profiling_enabled': False,  # Time enhanced_strategy stages and each strategy evaluation (/api/profile)
 }
 
 # 💾 Load settings from file if it exists
@@ -450,7 +499,8 @@ def get_chrome_version():
 async def get_driver():
     """Initialize Chrome driver with undetected settings"""
     options = uc.ChromeOptions()
-    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    if ws_stream.needs_performance_log(settings.get('ws_ingest_mode', 'cdp')):
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
     options.add_argument('--ignore-ssl-errors')
     options.add_argument('--ignore-certificate-errors')
     options.add_argument('--ignore-certificate-errors-spki-list')
@@ -490,15 +540,7 @@ async def calculate_ema(candles, period):
     if len(candles) < period:
         return None
 
-    closes = [c[2] for c in candles]
-    multiplier = 2 / (period + 1)
-    sma = sum(closes[:period]) / period
-    ema = sma
-
-    for price in closes[period:]:
-        ema = (price - ema) * multiplier + ema
-
-    return ema
+    return float(indicator_lib.ema(candles[:, 2], period)[-1])
 
 
 async def calculate_rsi(candles, period=14):
@@ -506,19 +548,10 @@ async def calculate_rsi(candles, period=14):
     if len(candles) < period + 1:
         return None
 
-    closes = [c[2] for c in candles]
-    gains = []
-    losses = []
-
-    for i in range(1, period + 1):
-        delta = closes[i] - closes[i - 1]
-        if delta > 0:
-            gains.append(delta)
-        else:
-            losses.append(abs(delta))
+    deltas = np.diff(candles[-(period + 1):, 2])
 
-    avg_gain = sum(gains) / period if gains else 0
-    avg_loss = sum(losses) / period if losses else 0
+    avg_gain = float(deltas[deltas > 0].sum()) / period
+    avg_loss = float(-deltas[deltas < 0].sum()) / period
 
     if avg_loss == 0:
         return 100
@@ -534,11 +567,9 @@ async def calculate_bollinger_bands(candles, period=20, std_dev=2):
     if len(candles) < period:
         return None, None, None
 
-    closes = [c[2] for c in candles[-period:]]
-    sma = sum(closes) / period
-
-    variance = sum((x - sma) ** 2 for x in closes) / period
-    std = variance ** 0.5
+    closes = candles[-period:, 2]
+    sma = float(closes.mean())
+    std = float(closes.std())
 
     upper = sma + (std_dev * std)
     lower = sma - (std_dev * std)
@@ -551,20 +582,16 @@ async def calculate_atr(candles, period=14):
     if len(candles) < period + 1:
         return None
 
-    true_ranges = []
-    for i in range(-period, 0):
-        high = candles[i][3]
-        low = candles[i][4]
-        prev_close = candles[i-1][2]
+    highs = candles[-period:, 3]
+    lows = candles[-period:, 4]
+    prev_closes = candles[-period - 1:-1, 2]
 
-        tr = max(
-            high - low,
-            abs(high - prev_close),
-            abs(low - prev_close)
-        )
-        true_ranges.append(tr)
+    true_ranges = np.maximum(
+        highs - lows,
+        np.maximum(np.abs(highs - prev_closes), np.abs(lows - prev_closes))
+    )
 
-    return sum(true_ranges) / period
+    return float(true_ranges.mean())
 
 
 async def detect_support_resistance(candles, lookback=20):
@@ -573,11 +600,9 @@ async def detect_support_resistance(candles, lookback=20):
         return None, None
 
     recent = candles[-lookback:]
-    highs = [c[3] for c in recent]
-    lows = [c[4] for c in recent]
 
-    resistance = max(highs)
-    support = min(lows)
+    resistance = float(recent[:, 3].max())
+    support = float(recent[:, 4].min())
 
     return support, resistance
 
@@ -590,32 +615,9 @@ async def calculate_macd(candles, fast_period=12, slow_period=26, signal_period=
     if len(candles) < slow_period + signal_period:
         return None, None, None
 
-    # Calculate EMAs for MACD
-    ema_fast = await calculate_ema(candles, fast_period)
-    ema_slow = await calculate_ema(candles, slow_period)
-
-    if ema_fast is None or ema_slow is None:
-        return None, None, None
-
-    # MACD Line = Fast EMA - Slow EMA
-    macd_line = ema_fast - ema_slow
+    macd_line, signal_line, histogram = indicator_lib.macd(candles[:, 2], fast_period, slow_period, signal_period)
 
-    # Signal Line = EMA of MACD Line (simplified - using recent MACD values)
-    # For now, we'll use a simple moving average of MACD
-    macd_values = []
-    for i in range(max(signal_period, 1)):
-        if len(candles) > slow_period + i:
-            ema_f = await calculate_ema(candles[:-i] if i > 0 else candles, fast_period)
-            ema_s = await calculate_ema(candles[:-i] if i > 0 else candles, slow_period)
-            if ema_f and ema_s:
-                macd_values.append(ema_f - ema_s)
-
-    signal_line = sum(macd_values) / len(macd_values) if macd_values else macd_line
-
-    # Histogram = MACD - Signal
-    histogram = macd_line - signal_line
-
-    return macd_line, signal_line, histogram
+    return float(macd_line[-1]), float(signal_line[-1]), float(histogram[-1])
 
 
 async def calculate_stochastic(candles, k_period=14, d_period=3):
@@ -626,33 +628,9 @@ async def calculate_stochastic(candles, k_period=14, d_period=3):
     if len(candles) < k_period:
         return None, None
 
-    recent = candles[-k_period:]
-    current_close = candles[-1][2]
-
-    # Get highest high and lowest low
-    highest_high = max([c[3] for c in recent])
-    lowest_low = min([c[4] for c in recent])
+    k_values, d_values = indicator_lib.stochastic(candles[:, 3], candles[:, 4], candles[:, 2], k_period, d_period)
 
-    # Calculate %K
-    if highest_high == lowest_low:
-        k_value = 50
-    else:
-        k_value = ((current_close - lowest_low) / (highest_high - lowest_low)) * 100
-
-    # Calculate %D (SMA of %K) - simplified
-    k_values = []
-    for i in range(d_period):
-        if len(candles) > k_period + i:
-            recent_k = candles[-(k_period+i):-i] if i > 0 else candles[-k_period:]
-            close_k = candles[-(i+1)][2]
-            high_k = max([c[3] for c in recent_k])
-            low_k = min([c[4] for c in recent_k])
-            if high_k != low_k:
-                k_values.append(((close_k - low_k) / (high_k - low_k)) * 100)
-
-    d_value = sum(k_values) / len(k_values) if k_values else k_value
-
-    return k_value, d_value
+    return float(k_values[-1]), float(d_values[-1])
 
 
 async def calculate_supertrend(candles, atr_period=10, multiplier=3):
@@ -698,7 +676,14 @@ async def calculate_supertrend(candles, atr_period=10, multiplier=3):
     return supertrend, trend
 
 
-async def calculate_heikin_ashi(candles):
+def heikin_ashi_rows(candles, count=6):
+    """Last `count` Heikin Ashi candles as [open, close, high, low] rows (HA open depends on the whole series)"""
+    ha_open, ha_close, ha_high, ha_low = indicator_lib.heikin_ashi(
+        candles[:, 1], candles[:, 3], candles[:, 4], candles[:, 2])
+    return np.column_stack((ha_open, ha_close, ha_high, ha_low))[-count:]
+
+
+async def calculate_heikin_ashi(candles, closed_rows=None):
     """
     Calculate Heikin Ashi candles and detect trend signals
 
@@ -708,38 +693,23 @@ async def calculate_heikin_ashi(candles):
     - HA High = Max(High, HA Open, HA Close)
     - HA Low = Min(Low, HA Open, HA Close)
 
+    closed_rows: heikin_ashi_rows(candles[:-1]) when already known (e.g. cached)
+
     Returns: (trend, consecutive_count, signal_strength)
     """
     if len(candles) < 10:
         return 'neutral', 0, 0
 
-    ha_candles = []
-
-    # First HA candle - use real values
-    first = candles[0]
-    ha_open = (first[1] + first[2]) / 2  # (Open + Close) / 2
-    ha_close = (first[1] + first[3] + first[4] + first[2]) / 4  # (O+H+L+C)/4
-    ha_high = max(first[3], ha_open, ha_close)
-    ha_low = min(first[4], ha_open, ha_close)
-    ha_candles.append([ha_open, ha_close, ha_high, ha_low])
-
-    # Calculate rest of HA candles
-    for candle in candles[1:]:
-        prev_ha = ha_candles[-1]
-
-        # HA Open = (Prev HA Open + Prev HA Close) / 2
-        ha_open = (prev_ha[0] + prev_ha[1]) / 2
-
-        # HA Close = (O + H + L + C) / 4
-        ha_close = (candle[1] + candle[3] + candle[4] + candle[2]) / 4
-
-        # HA High = Max(H, HA Open, HA Close)
-        ha_high = max(candle[3], ha_open, ha_close)
-
-        # HA Low = Min(L, HA Open, HA Close)
-        ha_low = min(candle[4], ha_open, ha_close)
-
-        ha_candles.append([ha_open, ha_close, ha_high, ha_low])
+    if closed_rows is None:
+        ha_candles = heikin_ashi_rows(candles).tolist()
+    else:
+        # Closed HA candles are known - only the forming one is computed
+        prev_open, prev_close = closed_rows[-1][0], closed_rows[-1][1]
+        last = candles[-1]
+        ha_open = (prev_open + prev_close) / 2
+        ha_close = (last[1] + last[3] + last[4] + last[2]) / 4
+        ha_candles = [list(row) for row in closed_rows[-5:]]
+        ha_candles.append([ha_open, ha_close, max(last[3], ha_open, ha_close), min(last[4], ha_open, ha_close)])
 
     # Analyze last 5 HA candles for trend
     recent_ha = ha_candles[-5:]
@@ -802,116 +772,20 @@ async def calculate_adx(candles, period=14):
     if len(candles) < period * 2:
         return 25, 50, 50, 'neutral'
 
-    # Step 1: Calculate True Range (TR) and Directional Movement (+DM, -DM)
-    tr_list = []
-    plus_dm_list = []
-    minus_dm_list = []
-
-    for i in range(1, len(candles)):
-        prev_candle = candles[i-1]
-        curr_candle = candles[i]
-
-        # Extract OHLC
-        prev_high = prev_candle[3]
-        prev_low = prev_candle[4]
-        prev_close = prev_candle[2]
-        curr_high = curr_candle[3]
-        curr_low = curr_candle[4]
-
-        # True Range = max of:
-        # 1. Current High - Current Low
-        # 2. |Current High - Previous Close|
-        # 3. |Current Low - Previous Close|
-        tr = max(
-            curr_high - curr_low,
-            abs(curr_high - prev_close),
-            abs(curr_low - prev_close)
-        )
-        tr_list.append(tr)
-
-        # Directional Movement
-        high_diff = curr_high - prev_high
-        low_diff = prev_low - curr_low
-
-        # +DM: Positive if current high > previous high
-        plus_dm = high_diff if high_diff > low_diff and high_diff > 0 else 0
-
-        # -DM: Positive if previous low > current low
-        minus_dm = low_diff if low_diff > high_diff and low_diff > 0 else 0
-
-        plus_dm_list.append(plus_dm)
-        minus_dm_list.append(minus_dm)
-
-    # Step 2: Smooth TR, +DM, -DM using Wilder's smoothing
-    # First value = sum of first 'period' values
-    # Subsequent values = (previous_smooth * (period-1) + current_value) / period
-
-    def wilders_smoothing(values, period):
-        if len(values) < period:
-            return []
-
-        smoothed = []
-        # First smoothed value
-        first_smooth = sum(values[:period]) / period
-        smoothed.append(first_smooth)
-
-        # Subsequent smoothed values
-        for i in range(period, len(values)):
-            smooth = (smoothed[-1] * (period - 1) + values[i]) / period
-            smoothed.append(smooth)
-
-        return smoothed
-
-    smoothed_tr = wilders_smoothing(tr_list, period)
-    smoothed_plus_dm = wilders_smoothing(plus_dm_list, period)
-    smoothed_minus_dm = wilders_smoothing(minus_dm_list, period)
-
-    if not smoothed_tr or len(smoothed_tr) < period:
-        return 25, 50, 50, 'neutral'
-
-    # Step 3: Calculate +DI and -DI
-    plus_di_list = []
-    minus_di_list = []
-
-    for i in range(len(smoothed_tr)):
-        if smoothed_tr[i] != 0:
-            plus_di = 100 * (smoothed_plus_dm[i] / smoothed_tr[i])
-            minus_di = 100 * (smoothed_minus_dm[i] / smoothed_tr[i])
-        else:
-            plus_di = 0
-            minus_di = 0
-
-        plus_di_list.append(plus_di)
-        minus_di_list.append(minus_di)
-
-    # Step 4: Calculate DX (Directional Index)
-    dx_list = []
-
-    for i in range(len(plus_di_list)):
-        di_sum = plus_di_list[i] + minus_di_list[i]
-        if di_sum != 0:
-            dx = 100 * abs(plus_di_list[i] - minus_di_list[i]) / di_sum
-        else:
-            dx = 0
-        dx_list.append(dx)
-
-    # Step 5: Calculate ADX (smoothed DX)
-    adx_list = wilders_smoothing(dx_list, period)
-
-    if not adx_list:
-        return 25, 50, 50, 'neutral'
+    adx_values, plus_di_values, minus_di_values = indicator_lib.adx(
+        candles[:, 3], candles[:, 4], candles[:, 2], period)
 
     # Get latest values
-    adx_value = adx_list[-1]
-    plus_di = plus_di_list[-1]
-    minus_di = minus_di_list[-1]
+    adx_value = float(adx_values[-1])
+    plus_di = float(plus_di_values[-1])
+    minus_di = float(minus_di_values[-1])
 
-    # Step 6: Detect DI Crossover signals
+    # Detect DI Crossover signals
     di_cross_signal = 'neutral'
 
-    if len(plus_di_list) >= 2 and len(minus_di_list) >= 2:
-        prev_plus_di = plus_di_list[-2]
-        prev_minus_di = minus_di_list[-2]
+    if not np.isnan(plus_di_values[-2]):
+        prev_plus_di = float(plus_di_values[-2])
+        prev_minus_di = float(minus_di_values[-2])
 
         # Bullish crossover: +DI crosses above -DI
         if prev_plus_di <= prev_minus_di and plus_di > minus_di:
@@ -945,45 +819,9 @@ async def calculate_synthetic_volume(candles):
         # Return normalized volume of 1.0 for each candle if not enough data
         return [1.0] * len(candles)
 
-    volumes = []
-
-    for i in range(len(candles)):
-        candle = candles[i]
-        open_price = candle[1]
-        close_price = candle[2]
-        high = candle[3]
-        low = candle[4]
-
-        # 1. Range-based volume (price movement)
-        price_range = high - low
-        if price_range == 0:
-            price_range = 0.00001  # Avoid division by zero
-
-        # 2. Body strength (directional conviction)
-        body = abs(close_price - open_price)
-        body_ratio = body / price_range if price_range > 0 else 0.5
-
-        # 3. Volatility factor (compare to recent average range)
-        if i >= 14:
-            recent_candles = candles[i-14:i]
-            avg_range = sum([c[3] - c[4] for c in recent_candles]) / 14
-            volatility_factor = price_range / avg_range if avg_range > 0 else 1.0
-        else:
-            volatility_factor = 1.0
-
-        # Synthetic volume formula
-        # Higher volume when: larger range, stronger body, higher volatility
-        synthetic_vol = price_range * (1 + body_ratio) * volatility_factor
+    volumes = indicator_lib.synthetic_volume(candles[:, 1], candles[:, 3], candles[:, 4], candles[:, 2])
 
-        volumes.append(synthetic_vol)
-
-    # Normalize volumes to have a mean of 1.0
-    if len(volumes) > 0:
-        avg_vol = sum(volumes) / len(volumes)
-        if avg_vol > 0:
-            volumes = [v / avg_vol for v in volumes]
-
-    return volumes
+    return volumes.tolist()
 
 
 async def analyze_volume_trend(volumes, period=14):
@@ -1029,51 +867,12 @@ async def analyze_volume_trend(volumes, period=14):
     return trend, strength, signal
 
 
-async def calculate_vwap(candles, volumes):
+def vwap_bands(current_price, vwap, std_dev):
     """
-    Calculate VWAP (Volume Weighted Average Price) with standard deviation bands
-
-    VWAP = Sum(Typical Price * Volume) / Sum(Volume)
-    Typical Price = (High + Low + Close) / 3
+    VWAP bands and where the price sits relative to them
 
     Returns: (vwap, upper_band_1, lower_band_1, upper_band_2, lower_band_2, position, deviation)
     """
-    if len(candles) < 20 or len(volumes) < 20:
-        return None, None, None, None, None, 'At VWAP', 0
-
-    # Use last 100 candles for VWAP calculation (or all if less than 100)
-    period = min(100, len(candles))
-    recent_candles = candles[-period:]
-    recent_volumes = volumes[-period:]
-
-    # Calculate VWAP
-    typical_prices = []
-    pv_sum = 0  # Price * Volume sum
-    volume_sum = 0
-
-    for i in range(len(recent_candles)):
-        candle = recent_candles[i]
-        volume = recent_volumes[i]
-
-        # Typical price (HLC/3)
-        typical_price = (candle[3] + candle[4] + candle[2]) / 3
-        typical_prices.append(typical_price)
-
-        pv_sum += typical_price * volume
-        volume_sum += volume
-
-    vwap = pv_sum / volume_sum if volume_sum > 0 else recent_candles[-1][2]
-
-    # Calculate standard deviation for bands
-    squared_diff_sum = 0
-    for i in range(len(recent_candles)):
-        typical_price = typical_prices[i]
-        volume = recent_volumes[i]
-        squared_diff_sum += ((typical_price - vwap) ** 2) * volume
-
-    variance = squared_diff_sum / volume_sum if volume_sum > 0 else 0
-    std_dev = variance ** 0.5
-
     # VWAP bands (1 and 2 standard deviations)
     upper_band_1 = vwap + std_dev
     lower_band_1 = vwap - std_dev
@@ -1081,8 +880,6 @@ async def calculate_vwap(candles, volumes):
     lower_band_2 = vwap - (std_dev * 2)
 
     # Determine position relative to VWAP
-    current_price = candles[-1][2]
-
     if current_price > upper_band_2:
         position = 'Far Above VWAP'
         deviation = 2.0
@@ -1110,6 +907,32 @@ async def calculate_vwap(candles, volumes):
     )
 
 
+async def calculate_vwap(candles, volumes):
+    """
+    Calculate VWAP (Volume Weighted Average Price) with standard deviation bands
+
+    VWAP = Sum(Typical Price * Volume) / Sum(Volume)
+    Typical Price = (High + Low + Close) / 3
+
+    Returns: (vwap, upper_band_1, lower_band_1, upper_band_2, lower_band_2, position, deviation)
+    """
+    if len(candles) < 20 or len(volumes) < 20:
+        return None, None, None, None, None, 'At VWAP', 0
+
+    # Use last 100 candles for VWAP calculation (or all if less than 100)
+    period = min(100, len(candles))
+    recent_candles = candles[-period:]
+    recent_volumes = volumes[-period:]
+
+    # Rolling VWAP over exactly this window - its last value covers all of it
+    vwap_values, std_values = indicator_lib.vwap(
+        recent_candles[:, 3], recent_candles[:, 4], recent_candles[:, 2], np.asarray(recent_volumes), window=period)
+    vwap = float(vwap_values[-1])
+    std_dev = float(std_values[-1])
+
+    return vwap_bands(float(candles[-1][2]), vwap, std_dev)
+
+
 async def detect_candlestick_patterns(candles):
     """
     Detect powerful candlestick patterns
@@ -1353,7 +1176,28 @@ async def validate_trend_alignment(action: str, indicators: dict, multi_tf_data:
 
 # ==================== TRADING STRATEGY ====================
 
-async def enhanced_strategy(candles, all_timeframes=None, detected_expiry=None):
+async def cached_indicator(asset, period, candles, name, params, compute, closed=False):
+    """
+    Serve an indicator from INDICATOR_CACHE, calling compute() on a miss
+
+    closed=True: the value only depends on closed candles (candles[:-1]).
+    compute may return a value or a coroutine. asset=None bypasses the cache.
+    """
+    if asset is None:
+        value = compute()
+        return await value if asyncio.iscoroutine(value) else value
+
+    found, value = INDICATOR_CACHE.get(asset, period, candles, name, params, closed)
+    if not found:
+        value = compute()
+        if asyncio.iscoroutine(value):
+            value = await value
+        INDICATOR_CACHE.put(asset, period, candles, name, params, value, closed)
+    return value
+
+
+async def enhanced_strategy(candles, all_timeframes=None, detected_expiry=None, live_indicators=None,
+                            asset=None, period=None, decision_time=None):
     """
     🚀 FULLY AUTONOMOUS AI STRATEGY - Multi-Timeframe Analysis
 
@@ -1361,45 +1205,95 @@ async def enhanced_strategy(candles, all_timeframes=None, detected_expiry=None):
         candles: Primary timeframe candles (usually 1m)
         all_timeframes: Dict of all timeframes {60: candles_1m, 300: candles_5m, ...}
         detected_expiry: Expiry time detected from UI (seconds)
+        live_indicators: IndicatorEngine snapshot for these candles (skips recomputing
+            EMA/RSI/ATR/MACD/Stochastic/SuperTrend/ADX from scratch)
+        asset, period: identify the candles for INDICATOR_CACHE (None = no caching)
+        decision_time: candle timestamp to decide at (session replay) - strategy hour
+            filters use its hour and live risk counters are ignored (None = live, now)
     """
     global ACTIVE_STRATEGY_ID, ACTIVE_STRATEGY_NAME, LAST_TRADE_CONFIDENCE
 
     if len(candles) < 50:
         return None
 
-    current_price = candles[-1][2]
+    # Indicators read straight from the (n, 5) candle view; legacy modules get lists
+    candles = np.asarray(candles, dtype=np.float64)
+    current_price = float(candles[-1][2])
+    lap = PROFILER.laps('stages')  # ⏱️ No-op unless profiling_enabled
 
     # CALCULATE ALL INDICATORS FIRST (for both AI and traditional analysis)
-    ema_fast = await calculate_ema(candles, settings['fast_ema'])
-    ema_slow = await calculate_ema(candles, settings['slow_ema'])
-    ema_fast_prev = await calculate_ema(candles[:-1], settings['fast_ema'])
-    ema_slow_prev = await calculate_ema(candles[:-1], settings['slow_ema'])
-
-    rsi = await calculate_rsi(candles, settings['rsi_period'])
-    upper_bb, middle_bb, lower_bb = await calculate_bollinger_bands(candles, 20, 2)
-    atr = await calculate_atr(candles)
-    support, resistance = await detect_support_resistance(candles)
-
-    # ULTRA POWERFUL INDICATORS
-    macd_line, macd_signal, macd_histogram = await calculate_macd(candles)
-    stoch_k, stoch_d = await calculate_stochastic(candles)
-    supertrend_value, supertrend_direction = await calculate_supertrend(candles)
-    pattern_name, pattern_strength, pattern_direction = await detect_candlestick_patterns(candles)
+    if live_indicators:
+        # ⚡ Incremental engine already has them - O(1) per tick
+        ema_fast = live_indicators['ema_fast']
+        ema_slow = live_indicators['ema_slow']
+        ema_fast_prev = live_indicators['ema_fast_prev']
+        ema_slow_prev = live_indicators['ema_slow_prev']
+        rsi = live_indicators['rsi']
+        atr = live_indicators['atr']
+        macd_line, macd_signal, macd_histogram = live_indicators['macd']
+        stoch_k, stoch_d = live_indicators['stochastic']
+        supertrend_value, supertrend_direction = live_indicators['supertrend']
+    else:
+        fast_period, slow_period = settings['fast_ema'], settings['slow_ema']
+
+        # 💾 Previous-bar EMAs only change when a candle closes; the current ones are one step on top
+        ema_fast_prev = await cached_indicator(asset, period, candles, 'ema', (fast_period,),
+                                               lambda: calculate_ema(candles[:-1], fast_period), closed=True)
+        ema_slow_prev = await cached_indicator(asset, period, candles, 'ema', (slow_period,),
+                                               lambda: calculate_ema(candles[:-1], slow_period), closed=True)
+        if ema_fast_prev is not None:
+            ema_fast = ema_fast_prev + (current_price - ema_fast_prev) * (2 / (fast_period + 1))
+        else:
+            ema_fast = await calculate_ema(candles, fast_period)
+        if ema_slow_prev is not None:
+            ema_slow = ema_slow_prev + (current_price - ema_slow_prev) * (2 / (slow_period + 1))
+        else:
+            ema_slow = await calculate_ema(candles, slow_period)
+
+        rsi = await cached_indicator(asset, period, candles, 'rsi', (settings['rsi_period'],),
+                                     lambda: calculate_rsi(candles, settings['rsi_period']))
+        atr = await cached_indicator(asset, period, candles, 'atr', (14,), lambda: calculate_atr(candles))
+
+        # ULTRA POWERFUL INDICATORS
+        macd_line, macd_signal, macd_histogram = await cached_indicator(
+            asset, period, candles, 'macd', (12, 26, 9), lambda: calculate_macd(candles))
+        stoch_k, stoch_d = await cached_indicator(
+            asset, period, candles, 'stochastic', (14, 3), lambda: calculate_stochastic(candles))
+        supertrend_value, supertrend_direction = await cached_indicator(
+            asset, period, candles, 'supertrend', (10, 3), lambda: calculate_supertrend(candles))
+
+    upper_bb, middle_bb, lower_bb = await cached_indicator(
+        asset, period, candles, 'bollinger', (20, 2), lambda: calculate_bollinger_bands(candles, 20, 2))
+    support, resistance = await cached_indicator(
+        asset, period, candles, 'support_resistance', (20,), lambda: detect_support_resistance(candles))
+    pattern_name, pattern_strength, pattern_direction = await cached_indicator(
+        asset, period, candles, 'patterns', (), lambda: detect_candlestick_patterns(candles))
+    lap('indicators')
 
     # 🕯️ Heikin Ashi calculation
     heikin_ashi_trend = 'neutral'
     heikin_ashi_consecutive = 0
     heikin_ashi_strength = 0
-    if settings.get('heikin_ashi_enabled', True):
-        heikin_ashi_trend, heikin_ashi_consecutive, heikin_ashi_strength = await calculate_heikin_ashi(candles)
+    if settings.get('heikin_ashi_enabled', True) and indicator_needed('heikin_ashi'):
+        # Closed HA candles come from the cache, only the forming one is recomputed
+        closed_ha = await cached_indicator(asset, period, candles, 'heikin_ashi_rows', (5,),
+                                           lambda: heikin_ashi_rows(candles[:-1], 5), closed=True)
+        heikin_ashi_trend, heikin_ashi_consecutive, heikin_ashi_strength = await calculate_heikin_ashi(
+            candles, closed_ha)
+        lap('heikin_ashi')
 
     # 📊 ADX (Average Directional Index) calculation
     adx_value = 25
     plus_di = 50
     minus_di = 50
     di_cross_signal = 'neutral'
-    if settings.get('adx_enabled', True):
-        adx_value, plus_di, minus_di, di_cross_signal = await calculate_adx(candles, settings.get('adx_period', 14))
+    if settings.get('adx_enabled', True) and indicator_needed('adx'):
+        if live_indicators:
+            adx_value, plus_di, minus_di, di_cross_signal = live_indicators['adx']
+        else:
+            adx_period = settings.get('adx_period', 14)
+            adx_value, plus_di, minus_di, di_cross_signal = await cached_indicator(
+                asset, period, candles, 'adx', (adx_period,), lambda: calculate_adx(candles, adx_period))
 
         # Log ADX values for visibility
         adx_strength = "WEAK" if adx_value < 25 else "STRONG" if adx_value < 50 else "VERY STRONG" if adx_value < 75 else "EXTREMELY STRONG"
@@ -1413,6 +1307,7 @@ async def enhanced_strategy(candles, all_timeframes=None, detected_expiry=None):
             print(f"   └─ ✅ BULLISH CROSSOVER! +DI crossed above -DI - Strong BUY signal!")
         elif di_cross_signal == 'bearish_cross':
             print(f"   └─ ⚠️ BEARISH CROSSOVER! -DI crossed above +DI - Strong SELL signal!")
+        lap('adx')
 
     # 📊 VOLUME & VWAP calculation (Synthetic Volume for Binary Options)
     volumes = []
@@ -1427,15 +1322,28 @@ async def enhanced_strategy(candles, all_timeframes=None, detected_expiry=None):
     vwap_position = 'At VWAP'
     vwap_deviation = 0
 
-    if settings.get('vwap_enabled', True):
-        # Calculate synthetic volume
-        volumes = await calculate_synthetic_volume(candles)
+    if settings.get('vwap_enabled', True) and indicator_needed('volume'):
+        with_vwap = indicator_needed('vwap')
+
+        async def volume_analysis():
+            if live_indicators:
+                # ⚡ Rolling sums from the incremental engine - only the forming candle is new
+                volumes, live_vwap, live_std = live_indicators['volume']
+                vwap_result = vwap_bands(current_price, live_vwap, live_std) if with_vwap and live_vwap is not None else None
+                return volumes, await analyze_volume_trend(volumes), vwap_result
 
-        # Analyze volume trend
-        volume_trend, volume_strength, volume_signal = await analyze_volume_trend(volumes)
+            # Calculate synthetic volume
+            volumes = await calculate_synthetic_volume(candles)
 
-        # Calculate VWAP
-        vwap_value, vwap_upper_1, vwap_lower_1, vwap_upper_2, vwap_lower_2, vwap_position, vwap_deviation = await calculate_vwap(candles, volumes)
+            # Analyze volume trend (+ VWAP)
+            vwap_result = await calculate_vwap(candles, volumes) if with_vwap else None
+            return volumes, await analyze_volume_trend(volumes), vwap_result
+
+        volumes, volume_result, vwap_result = await cached_indicator(
+            asset, period, candles, 'volume_vwap', (14, 100, with_vwap, bool(live_indicators)), volume_analysis)
+        volume_trend, volume_strength, volume_signal = volume_result
+        if vwap_result:
+            vwap_value, vwap_upper_1, vwap_lower_1, vwap_upper_2, vwap_lower_2, vwap_position, vwap_deviation = vwap_result
 
         # Log Volume & VWAP for visibility
         print(f"📊 VOLUME: {volume_signal.upper()} (Trend: {volume_trend.upper()}, Strength: {volume_strength})")
@@ -1450,6 +1358,7 @@ async def enhanced_strategy(candles, all_timeframes=None, detected_expiry=None):
                 print(f"   └─ ✅ VWAP BOUNCE OPPORTUNITY! Price far below + high volume")
             elif vwap_position == 'Far Above VWAP' and volume_signal == 'high_volume':
                 print(f"   └─ ⚠️ VWAP REVERSAL RISK! Price far above + high volume")
+        lap('volume')
 
     if None in [ema_fast, ema_slow, rsi, upper_bb, lower_bb]:
         return None
@@ -1468,17 +1377,23 @@ async def enhanced_strategy(candles, all_timeframes=None, detected_expiry=None):
     candles_15m = []
     market_regime = 'unknown'
 
-    if mtf_analyzer:
+    use_mtf = mtf_analyzer and indicator_needed('mtf')
+    use_regime = regime_detector and indicator_needed('regime')
+    candle_rows = candles.tolist() if (use_mtf or use_regime) else []
+
+    if use_mtf:
         try:
-            mtf_data = mtf_analyzer.get_multi_timeframe_data(candles)
+            mtf_data = await cached_indicator(asset, period, candles, 'mtf_data', (),
+                                              lambda: mtf_analyzer.get_multi_timeframe_data(candle_rows))
             candles_5m = mtf_data.get('5m', [])
             candles_15m = mtf_data.get('15m', [])
             print(f"📊 Multi-Timeframe: 1m={len(candles)}, 5m={len(candles_5m)}, 15m={len(candles_15m)}")
         except Exception as e:
             print(f"⚠️ MTF Analysis error: {e}")
+        lap('mtf')
 
     # Detect market regime for custom strategies
-    if regime_detector:
+    if use_regime:
         try:
             regime_indicators = {
                 'rsi': rsi or 50,
@@ -1487,11 +1402,12 @@ async def enhanced_strategy(candles, all_timeframes=None, detected_expiry=None):
                 'adx': adx_value
             }
             market_regime, regime_confidence, regime_desc = await regime_detector.detect_regime(
-                candles, candles_5m, candles_15m, regime_indicators
+                candle_rows, candles_5m, candles_15m, regime_indicators
             )
             print(f"🎯 Market Regime: {market_regime.upper()} ({regime_confidence:.0f}%) - {regime_desc}")
         except Exception as e:
             print(f"⚠️ Regime Detection error: {e}")
+        lap('regime')
 
     # Build market data for strategies
     recent_trades_list = bot_state.get('trades', [])[-10:]
@@ -1565,20 +1481,26 @@ async def enhanced_strategy(candles, all_timeframes=None, detected_expiry=None):
         try:
             # Check if MTF alignment is needed for any strategy
             mtf_aligned = True
-            if mtf_analyzer:
+            if use_mtf and indicator_needed('mtf_alignment'):
                 try:
-                    alignment_data = mtf_analyzer.analyze_trend_alignment(candles, candles_5m, candles_15m)
+                    alignment_data = await cached_indicator(
+                        asset, period, candles, 'mtf_alignment', (),
+                        lambda: mtf_analyzer.analyze_trend_alignment(candle_rows, candles_5m, candles_15m))
                     mtf_aligned = alignment_data.get('aligned', False)
                 except:
                     pass
 
             # Evaluate multiple strategies with advanced aggregation
+            lap('strategy_inputs')
             signals = advanced_strategy_builder.evaluate_multiple_strategies(
                 market_data,
                 strategy_indicators,
                 market_regime,
-                mtf_aligned
+                mtf_aligned,
+                hour=datetime.fromtimestamp(decision_time).hour if decision_time is not None else None,
+                risk_limits=decision_time is None
             )
+            lap('strategies')
 
             if signals:
                 exec_mode = advanced_strategy_builder.execution_mode
@@ -1620,27 +1542,36 @@ async def enhanced_strategy(candles, all_timeframes=None, detected_expiry=None):
             active_strategies = strategy_builder.get_active_strategies()
             print(f"📋 Found {len(active_strategies)} active custom strategies")
 
+            # ⚡ Each distinct condition once, shared by every strategy below
+            lap('strategy_inputs')
+            strategy_atoms = strategy_builder.evaluate_atoms(strategy_indicators)
+
             # Evaluate each active strategy
             for strategy_id, strategy in active_strategies.items():
                 # Check if timeframe alignment is required
                 mtf_aligned = True
-                if mtf_analyzer and strategy.get('timeframe_alignment', False):
+                if use_mtf and strategy.get('timeframe_alignment', False):
                     try:
-                        alignment_data = mtf_analyzer.analyze_trend_alignment(candles, candles_5m, candles_15m)
+                        alignment_data = await cached_indicator(
+                            asset, period, candles, 'mtf_alignment', (),
+                            lambda: mtf_analyzer.analyze_trend_alignment(candle_rows, candles_5m, candles_15m))
                         mtf_aligned = alignment_data.get('aligned', False)
                     except:
                         pass
 
                 # Evaluate strategy
                 try:
+                    started = PROFILER.clock()
                     strategy_action, strategy_confidence, strategy_reason = strategy_builder.evaluate_strategy(
                         strategy_id,
                         market_data,
                         strategy_indicators,
                         market_regime,
                         mtf_aligned,
-                        ai_decision=('hold', 0, 'No AI')
+                        ai_decision=('hold', 0, 'No AI'),
+                        atoms=strategy_atoms
                     )
+                    PROFILER.record_since('strategies', strategy_id, started)
 
                     if strategy_action and strategy_action != 'hold':
                         custom_strategy_signals.append({
@@ -1653,6 +1584,7 @@ async def enhanced_strategy(candles, all_timeframes=None, detected_expiry=None):
                         print(f"📋 Strategy '{strategy['name']}': {strategy_action.upper()} @ {strategy_confidence:.0f}% - {strategy_reason}")
                 except Exception as e:
                     print(f"⚠️ Error evaluating strategy '{strategy.get('name', strategy_id)}': {e}")
+            lap('strategies')
 
             # Return best strategy or fall through to traditional indicators
             if custom_strategy_signals:
@@ -1744,7 +1676,7 @@ async def enhanced_strategy(candles, all_timeframes=None, detected_expiry=None):
 
     # 6. Volatility Filter (ATR)
     if atr:
-        avg_price = sum([c[2] for c in candles[-20:]]) / 20
+        avg_price = float(candles[-20:, 2].mean())
         volatility_percent = (atr / avg_price) * 100
 
         # Skip trading in extremely volatile conditions
@@ -1954,75 +1886,72 @@ async def enhanced_strategy(candles, all_timeframes=None, detected_expiry=None):
 
 # ==================== POCKET OPTION INTEGRATION ====================
 
-async def websocket_log(driver):
-    """🚀 MULTI-TIMEFRAME WebSocket - Captures ALL timeframes (1m, 5m, 15m) simultaneously"""
-    global CANDLES, PERIOD, CURRENT_ASSET, FAVORITES_REANIMATED
+def ingest_payload(payload_str):
+    """🚀 MULTI-TIMEFRAME candle building from one decoded WebSocket payload (1m, 5m, 15m...)"""
+    global PERIOD, CURRENT_ASSET, FAVORITES_REANIMATED
+
+    # ⚡ Prefix classifier - ticks skip json.loads, unused message types are never parsed
+    kind, data = ws_stream.decode(payload_str)
+
+    if kind == ws_stream.TICK:
+        asset, tstamp, current_value = data
+        tstamp = int(tstamp)
+
+        # Update ALL timeframes for this asset - closes candles when a period rolls over
+        if TICK_AGGREGATOR.on_tick(asset, tstamp, current_value):
+            EVAL_SCHEDULER.on_tick(asset)
+
+    elif kind == ws_stream.HISTORY:
+        asset = data['asset']
+        period = data['period']  # 60=1min, 300=5min, 900=15min, etc.
+
+        if not CURRENT_ASSET:
+            CURRENT_ASSET = asset
+
+        # Track primary period (for UI display)
+        if PERIOD != period:
+            PERIOD = period
+            FAVORITES_REANIMATED = False
+
+        # 🚀 MULTI-TIMEFRAME: Store each timeframe separately
+        # One fixed-capacity ring buffer per (asset, period)
+        candles = CANDLES.buffer(asset, period)
+        if candles.pending:
+            # 💾 Warm start: join cached candles to the live snapshot unless there is a gap
+            candles.pending = False
+            if not candles.merge_history(reversed(data['candles']), period):
+                add_log(f"💾 {asset} {period}s: cache gap detected - using live history only")
+        else:
+            candles.load(reversed(data['candles']))
 
-    for wsData in driver.get_log('performance'):
-        message = json.loads(wsData['message'])['message']
-        response = message.get('params', {}).get('response', {})
-        if response.get('opcode', 0) == 2:
-            payload_str = base64.b64decode(response['payloadData']).decode('utf-8')
-            data = json.loads(payload_str)
+        # Candles are time-ordered, so "not seen yet" is just "newer than last"
+        for tstamp, value in data['history']:
+            tstamp = int(float(tstamp))
+            if tstamp % period == 0 and tstamp > (candles.last_ts or 0):
+                candles.append(tstamp, value, value, value, value)
 
-            if 'history' in data:
-                asset = data['asset']
-                period = data['period']  # 60=1min, 300=5min, 900=15min, etc.
+        # Reset the open-candle boundary and re-derive higher periods
+        TICK_AGGREGATOR.on_history(asset, period)
 
-                if not CURRENT_ASSET:
-                    CURRENT_ASSET = asset
 
-                # Track primary period (for UI display)
-                if PERIOD != period:
-                    PERIOD = period
-                    FAVORITES_REANIMATED = False
-
-                # 🚀 MULTI-TIMEFRAME: Store each timeframe separately
-                # Initialize asset dictionary if needed
-                if asset not in CANDLES:
-                    CANDLES[asset] = {}
-
-                # Initialize this timeframe if needed
-                if period not in CANDLES[asset]:
-                    CANDLES[asset][period] = []
-
-                candles = list(reversed(data['candles']))
-                for tstamp, value in data['history']:
-                    tstamp = int(float(tstamp))
-                    candle = [tstamp, value, value, value, value]
-                    candle[2] = value  # close
-                    if value > candle[3]:  # high
-                        candle[3] = value
-                    if value < candle[4]:  # low
-                        candle[4] = value
-                    if tstamp % period == 0:
-                        if tstamp not in [c[0] for c in candles]:
-                            candles.append([tstamp, value, value, value, value])
-
-                # Store candles for THIS specific timeframe
-                CANDLES[asset][period] = candles
+def on_candle_event(event):
+    """Candle events from the tick aggregator"""
+    if event['type'] == CACHE_GAP:
+        add_log(f"💾 {event['asset']} {event['period']}s: cache gap detected - waiting for fresh history")
 
-            try:
-                asset = data[0][0]
-                current_value = data[0][2]
-                tstamp = int(float(data[0][1]))
-
-                # Update ALL timeframes for this asset with current price
-                if asset in CANDLES:
-                    for period, candles in CANDLES[asset].items():
-                        if len(candles) > 0:
-                            candles[-1][2] = current_value  # close
-                            if current_value > candles[-1][3]:  # high
-                                candles[-1][3] = current_value
-                            if current_value < candles[-1][4]:  # low
-                                candles[-1][4] = current_value
-
-                            # Add new candle if period rolled over
-                            if tstamp % period == 0:
-                                if tstamp not in [c[0] for c in candles]:
-                                    candles.append([tstamp, current_value, current_value, current_value, current_value])
-            except:
-                pass
+
+TICK_AGGREGATOR.subscribe(on_candle_event)
+TICK_AGGREGATOR.subscribe(EVAL_SCHEDULER.on_candle_event)
+TICK_AGGREGATOR.subscribe(DATA_QUALITY.on_candle_event)
+TICK_AGGREGATOR.subscribe(INDICATOR_CACHE.on_candle_event)
+
+
+async def websocket_log(driver):
+    """🚀 MULTI-TIMEFRAME WebSocket - Captures ALL timeframes (1m, 5m, 15m) simultaneously"""
+    for payload_str in ws_stream.read_payloads(driver):
+        if FRAME_RECORDER:
+            FRAME_RECORDER.record(payload_str)
+        ingest_payload(payload_str)
 
     if not FAVORITES_REANIMATED:
         try:
@@ -3277,8 +3206,34 @@ async def wait_for_login(driver):
     return False
 
 
-async def check_indicators(driver):
-    """Main trading logic loop"""
+def analysis_timeframes(asset):
+    """
+    (timeframes, primary_period) for an asset, or (None, None) if it can't be analyzed
+
+    Cached candles nobody has confirmed live yet are left out; the primary
+    timeframe is the smallest period (most data), usually 60.
+    """
+    timeframes = CANDLES.get(asset)
+    if not isinstance(timeframes, dict):
+        # Old format (single timeframe) - skip for now
+        return None, None
+
+    # 💾 Cached candles nobody has confirmed live yet are never traded on
+    if any(buffer.pending for buffer in timeframes.values()):
+        timeframes = {p: buffer for p, buffer in timeframes.items() if not buffer.pending}
+
+    if not timeframes:
+        return None, None
+    return timeframes, min(timeframes.keys())
+
+
+async def check_indicators(driver, signals=None):
+    """
+    Main trading logic loop
+
+    With driver=None (session replay) nothing touches the browser: signals are
+    appended to `signals` as (candle_ts, asset, action, reason) instead of traded.
+    """
     global CANDLES, TRADE_IN_PROGRESS
 
     # 🚀 FAST ENTRY FIX: Skip analysis if trade is currently being placed
@@ -3286,25 +3241,24 @@ async def check_indicators(driver):
     if TRADE_IN_PROGRESS:
         return
 
-    # Check if we have any candle data
-    if not CANDLES:
+    # ⚡ Only assets whose candles changed since their last analysis
+    EVAL_SCHEDULER.mode = settings.get('evaluation_trigger', 'tick')
+    PROFILER.enabled = settings.get('profiling_enabled', False)
+    if not CANDLES or not len(EVAL_SCHEDULER):
         return
 
     # 🔍 DETECT CURRENT EXPIRY from UI (what user has set)
-    detected_expiry = await detect_current_expiry(driver)
-
-    # Check each asset
-    for asset, timeframes in CANDLES.items():
-        # 🚀 MULTI-TIMEFRAME: Get all available timeframes for this asset
-        # timeframes is now a dict: {60: [...candles...], 300: [...candles...], etc.}
+    detected_expiry = await detect_current_expiry(driver) if driver else None
 
-        if not isinstance(timeframes, dict):
-            # Old format (single timeframe) - skip for now
-            continue
+    # Check each changed asset
+    dirty_assets = EVAL_SCHEDULER.take_dirty()
+    indicator_params = (settings['fast_ema'], settings['slow_ema'], settings['rsi_period'],
+                        settings.get('adx_period', 14))
 
-        # Get the primary timeframe (smallest period = most data)
-        # Usually 60 (1min), but could be 300 (5min) or 900 (15min)
-        primary_period = min(timeframes.keys()) if timeframes else None
+    for index, asset in enumerate(dirty_assets):
+        # 🚀 MULTI-TIMEFRAME: all usable timeframes for this asset
+        # timeframes is a dict of ring buffers: {60: CandleBuffer, 300: CandleBuffer, etc.}
+        timeframes, primary_period = analysis_timeframes(asset)
         if not primary_period:
             continue
 
@@ -3316,8 +3270,25 @@ async def check_indicators(driver):
                 add_log(f"📊 {asset}: Collecting data ({len(primary_candles)}/50 candles)")
             continue
 
+        # 🧹 Don't analyze windows dominated by gap fillers / frozen flat runs
+        min_quality = settings.get('min_data_quality', 0.8)
+        if min_quality > 0:
+            quality = buffer_quality(primary_candles, primary_period, window=50)['quality']
+            if quality < min_quality:
+                continue
+
+        # ⚡ Fold newly closed candles into the incremental indicators, peek at the forming one
+        started = PROFILER.clock()
+        live_indicators = INDICATOR_ENGINES.update(asset, primary_period, primary_candles, *indicator_params)
+        PROFILER.record_since('stages', 'live_indicators', started)
+
         # Pass ALL timeframes to enhanced_strategy for multi-timeframe analysis
-        result = await enhanced_strategy(primary_candles, all_timeframes=timeframes, detected_expiry=detected_expiry)
+        started = PROFILER.clock()
+        result = await enhanced_strategy(primary_candles.view(), all_timeframes=timeframes,
+                                         detected_expiry=detected_expiry, live_indicators=live_indicators,
+                                         asset=asset, period=primary_period,
+                                         decision_time=None if driver else primary_candles.last_ts)
+        PROFILER.record_since('stages', 'analysis', started)
 
         if not result:
             continue
@@ -3330,6 +3301,12 @@ async def check_indicators(driver):
             action, reason = result
             expiry = settings.get('ai_expiry_default', 60)
 
+        # 📼 Replay: record the decision, never trade
+        if driver is None:
+            if signals is not None:
+                signals.append((primary_candles.last_ts, asset, action, reason))
+            continue
+
         # ⏰ Check trading hours before placing trade
         in_trading_window, window_message = is_in_trading_window()
         if not in_trading_window:
@@ -3355,6 +3332,8 @@ async def check_indicators(driver):
             order_created = await create_order(driver, action, asset, reason, expiry)
 
             if order_created:
+                # Assets we didn't get to are analyzed on the next pass
+                EVAL_SCHEDULER.mark_many(dirty_assets[index + 1:])
                 await asyncio.sleep(1)
                 return
         finally:
@@ -3363,11 +3342,49 @@ async def check_indicators(driver):
             print(f"🔓 Trade lock released - resuming analysis")
 
 
+async def replay_session(path, speed=0.0):
+    """
+    📼 Replay a recorded session through ingest_payload + check_indicators
+
+    No browser, no trades - returns throughput stats and the signals the
+    strategy produced. speed: 1.0 = real time, N = N x faster, 0 = max.
+    """
+    global CURRENT_ASSET, PERIOD, TRADE_IN_PROGRESS
+
+    CANDLES.disable_cache()
+    CANDLES.clear()
+    TICK_AGGREGATOR.reset()
+    TICK_AGGREGATOR.gap_policy = settings.get('gap_fill_policy', 'ffill')
+    EVAL_SCHEDULER.clear()
+    DATA_QUALITY.reset()
+    INDICATOR_ENGINES.clear()
+    INDICATOR_CACHE.clear()
+    rebuild_indicator_graph()
+    CURRENT_ASSET = None
+    PERIOD = 1
+    TRADE_IN_PROGRESS = False
+
+    signals = []
+    replayer = FrameReplayer(path, speed=speed)
+    stats = await replayer.run(ingest_payload, lambda: check_indicators(None, signals))
+    stats['signals'] = signals
+    return stats
+
+
 async def trading_loop():
     """Main trading loop - runs in background"""
-    global DRIVER, TRADING_ALLOWED, bot_state
+    global DRIVER, TRADING_ALLOWED, FRAME_RECORDER, bot_state
 
     try:
+        TICK_AGGREGATOR.gap_policy = settings.get('gap_fill_policy', 'ffill')
+        rebuild_indicator_graph()
+
+        # 💾 Warm start from the on-disk candle cache
+        if settings.get('candle_cache_enabled', True):
+            restored = CANDLES.enable_cache(CANDLE_CACHE_DIR)
+            if restored:
+                add_log(f"💾 Restored {len(restored)} cached candle series - resuming on first live tick")
+
         add_log("🚀 Initializing Chrome driver...")
         DRIVER = await get_driver()
 
@@ -3383,20 +3400,40 @@ async def trading_loop():
             bot_state['running'] = False
             return
 
+        # 📡 Subscribe to WebSocket frames (falls back to log polling)
+        if not ws_stream.needs_performance_log(settings.get('ws_ingest_mode', 'cdp')):
+            if await ws_stream.attach(DRIVER, page_hint='pocket'):
+                add_log("📡 Live WebSocket stream connected (CDP)")
+            else:
+                add_log("⚠️ CDP stream unavailable - retrying (or set ws_ingest_mode to 'poll' and restart)")
+
+        # 📼 Record raw frames for offline replay
+        if settings.get('record_frames', False):
+            record_path = os.path.join('recordings', f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pof.gz")
+            FRAME_RECORDER = FrameRecorder(record_path)
+            add_log(f"📼 Recording frames to {record_path}")
+
         add_log("=" * 40)
         add_log("🤖 BOT STARTED - LIVE TRADING")
         add_log("=" * 40)
         add_log("Analyzing markets...")
         add_log("")
 
-        # Main loop
+        # Main loop - wakes as soon as frames arrive, page checks stay on a 0.5s cadence
+        last_page_check = 0.0
         while bot_state['running'] and TRADING_ALLOWED:
             try:
                 await websocket_log(DRIVER)
+                stream_message = ws_stream.status_message(DRIVER)
+                if stream_message:
+                    add_log(stream_message)
+                bot_state['ws_stream'] = ws_stream.get_status(DRIVER)
                 await check_indicators(DRIVER)
-                await check_deposit(DRIVER)
-                await check_recent_trades(DRIVER)
-                await asyncio.sleep(0.5)
+                if time.time() - last_page_check >= 0.5:
+                    await check_deposit(DRIVER)
+                    await check_recent_trades(DRIVER)
+                    last_page_check = time.time()
+                await ws_stream.wait_for_frames(DRIVER, 0.5)
             except Exception as e:
                 add_log(f"⚠️ Error in loop: {e}")
                 await asyncio.sleep(2)
@@ -3407,7 +3444,12 @@ async def trading_loop():
         add_log(f"❌ Error: {e}")
         bot_state['running'] = False
     finally:
+        CANDLES.flush()
+        if FRAME_RECORDER:
+            FRAME_RECORDER.close()
+            FRAME_RECORDER = None
         if DRIVER:
+            await ws_stream.detach(DRIVER)
             try:
                 DRIVER.quit()
             except:
@@ -3468,6 +3510,7 @@ def get_status():
         'win_streak': bot_state['win_streak'],
         'current_asset': bot_state['current_asset'],
         'mode': bot_state['mode'],
+        'ws_stream': bot_state['ws_stream'],
         'trades': bot_state['trades'],
         'pattern_data': bot_state.get('pattern_data', {
             'pattern_type': None,
@@ -3749,6 +3792,7 @@ def create_strategy():
         if success:
             if advanced_strategy_builder:
                 advanced_strategy_builder.reload_strategies()
+            rebuild_indicator_graph()
 
         return jsonify({'success': success, 'message': message})
     except Exception as e:
@@ -3772,6 +3816,8 @@ def toggle_strategy(strategy_id):
             if advanced_strategy_builder:
                 advanced_strategy_builder.reload_strategies()
                 print(f"✅ Builders synced after toggle")
+            # ⚡ Recompute which indicators the active strategies need
+            rebuild_indicator_graph()
 
         return jsonify({'success': success, 'message': message}), 200
     except Exception as e:
@@ -3832,6 +3878,7 @@ def delete_strategy(strategy_id):
             if advanced_strategy_builder:
                 advanced_strategy_builder.reload_strategies()
                 print(f"🔄 Advanced builder reloaded")
+            rebuild_indicator_graph()
 
             return jsonify({'success': True, 'message': message}), 200
         else:
@@ -3932,6 +3979,7 @@ def import_strategies():
             if advanced_strategy_builder:
                 advanced_strategy_builder.strategies[strategy_id] = strategy_data
                 advanced_strategy_builder._save_strategies()
+            rebuild_indicator_graph()
 
             return jsonify({'success': True, 'message': f"Strategy '{strategy_data['name']}' imported successfully", 'imported': 1})
 
@@ -3963,6 +4011,7 @@ def import_strategies():
             strategy_builder._save_strategies()
             if advanced_strategy_builder:
                 advanced_strategy_builder._save_strategies()
+            rebuild_indicator_graph()
 
             message = f"Imported {imported_count} strategy/strategies"
             if errors:
@@ -3999,6 +4048,7 @@ def import_strategies():
             if advanced_strategy_builder:
                 advanced_strategy_builder.strategies[strategy_id] = data
                 advanced_strategy_builder._save_strategies()
+            rebuild_indicator_graph()
 
             return jsonify({'success': True, 'message': f"Strategy '{data['name']}' imported as '{strategy_id}'", 'imported': 1, 'strategy_id': strategy_id})
 
@@ -4168,18 +4218,42 @@ def run_backtest():
     try:
         strategy_config = request.json
 
-        # Load historical data
-        historical_candles = backtest_engine.load_historical_data(limit=1000)
+        # 📊 Many assets / files: ?assets=all or ?assets=EURUSD_otc,AUDCAD&files=data_5m/x.csv,...
+        assets = request.args.get('assets')
+        files = [path for path in request.args.get('files', '').split(',') if path]
+        if assets or files:
+            timeframe = request.args.get('timeframe', type=int)
+            targets = resolve_targets(assets, files, [timeframe] if timeframe else None)
+            if not targets:
+                return jsonify({'error': 'No historical data for the requested assets/files'})
+            return jsonify(run_backtests(
+                strategy_config,
+                targets,
+                workers=request.args.get('workers', 0, type=int),
+                start=request.args.get('start'),
+                end=request.args.get('end'),
+                limit=request.args.get('limit', type=int)
+            ))
+
+        # Load historical data (?asset=EURUSD_otc&timeframe=300&start=2024-02-05&end=...&limit=1000)
+        historical_candles = backtest_engine.load_historical_data(
+            asset=request.args.get('asset') or None,
+            limit=request.args.get('limit', 1000, type=int),
+            period=request.args.get('timeframe', 60, type=int),
+            start=request.args.get('start'),
+            end=request.args.get('end')
+        )
 
         if not historical_candles:
-            return jsonify({'error': 'No historical data available. Need data in data_1m/ folder'})
+            return jsonify({'error': 'No historical data available. Need CSV data in data_1m/ or data_5m/ folder'})
 
         # Run backtest
         results = backtest_engine.backtest_strategy(
             strategy_config,
             historical_candles,
             initial_balance=100.0,
-            payout_percent=85.0
+            payout_percent=85.0,
+            period=request.args.get('timeframe', 60, type=int)
         )
 
         return jsonify(results)
@@ -4188,6 +4262,86 @@ def run_backtest():
         return jsonify({'error': str(e)})
 
 
+@app.route('/api/ws/stats', methods=['GET'])
+def get_ws_stats():
+    """WebSocket ingestion counters per message type (frames, bytes, decode time)"""
+    stats = ws_stream.get_decode_stats().summary()
+    stats['mode'] = 'poll'
+    if DRIVER:
+        subscriber = ws_stream.get_subscriber(DRIVER)
+        if subscriber:
+            stats['cdp'] = {
+                'connected': subscriber.connected,
+                'frames_received': subscriber.frames_received,
+                'frames_dropped': subscriber.frames_dropped,
+                'queued': subscriber.queue.qsize(),
+            }
+        stats['stream'] = ws_stream.get_status(DRIVER)
+        stats['mode'] = stats['stream']['mode']
+    return jsonify(stats)
+
+
+@app.route('/api/data-quality', methods=['GET'])
+def get_data_quality():
+    """Per asset/period data quality: missing, filled and flat-run candles"""
+    try:
+        return jsonify(DATA_QUALITY.report(CANDLES))
+    except Exception as e:
+        return jsonify({'error': str(e)})
+
+
+@app.route('/api/scheduler/stats', methods=['GET'])
+def get_scheduler_stats():
+    """Evaluation scheduler counters (assets marked dirty vs. analyzed)"""
+    return jsonify(EVAL_SCHEDULER.get_stats())
+
+
+@app.route('/api/indicator-graph', methods=['GET'])
+def get_indicator_graph():
+    """Indicators computed for the active strategies (and the ones skipped)"""
+    stats = INDICATOR_GRAPH.get_stats()
+    stats['lazy'] = settings.get('lazy_indicators', True)
+    return jsonify(stats)
+
+
+@app.route('/api/indicator-cache/stats', methods=['GET'])
+def get_indicator_cache_stats():
+    """Indicator cache hit/miss counters"""
+    return jsonify(INDICATOR_CACHE.get_stats())
+
+
+@app.route('/api/profile', methods=['GET'])
+def get_profile():
+    """Per-stage and per-strategy analysis timings (calls, total, p50, p99)"""
+    stats = PROFILER.get_stats()
+    stats['enabled'] = settings.get('profiling_enabled', False)
+    builder = advanced_strategy_builder or strategy_builder
+    names = builder.strategies if builder else {}
+    for strategy_id, timing in stats['strategies'].items():
+        timing['name'] = names.get(strategy_id, {}).get('name', strategy_id)
+    return jsonify(stats)
+
+
+@app.route('/api/profile', methods=['POST'])
+def update_profile():
+    """Turn profiling on/off ({"enabled": bool}) and/or clear the timings ({"reset": true})"""
+    data = request.json or {}
+    if 'enabled' in data:
+        settings['profiling_enabled'] = bool(data['enabled'])
+        PROFILER.enabled = settings['profiling_enabled']
+        add_log(f"⏱️ Profiling {'enabled' if PROFILER.enabled else 'disabled'}")
+    if data.get('reset'):
+        PROFILER.reset()
+    return jsonify({'success': True, 'enabled': settings.get('profiling_enabled', False)})
+
+
+@app.route('/api/ws/stats/reset', methods=['POST'])
+def reset_ws_stats():
+    """Reset WebSocket ingestion counters"""
+    ws_stream.get_decode_stats().reset()
+    return jsonify({'success': True})
+
+
 @app.route('/api/performance/stats', methods=['GET'])
 def get_performance_stats():
     """Get performance statistics"""
@@ -3,7 +3,6 @@ Pocket Option Trading Bot - FREE Enhanced Version
 No licensing, no payments, improved strategies
 """
 import asyncio
-import base64
 import json
 import operator
 import os
@@ -17,6 +16,8 @@ from selenium.common.exceptions import ElementNotInteractableException, NoSuchEl
 from selenium.webdriver.common.by import By
 import undetected_chromedriver as uc
 
+import ws_stream
+
 ops = {
     '>': operator.gt,
     '<': operator.lt,
@@ -70,7 +71,8 @@ def log(*args):
 async def get_driver():
     """Initialize Chrome driver with undetected settings"""
     options = uc.ChromeOptions()
-    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    if ws_stream.needs_performance_log():
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
     options.add_argument('--ignore-ssl-errors')
     options.add_argument('--ignore-certificate-errors')
     options.add_argument('--ignore-certificate-errors-spki-list')
@@ -98,50 +100,46 @@ async def websocket_log(driver):
     """Process WebSocket data and update candles"""
     global CANDLES, PERIOD, CURRENT_ASSET, FAVORITES_REANIMATED
 
-    for wsData in driver.get_log('performance'):
-        message = json.loads(wsData['message'])['message']
-        response = message.get('params', {}).get('response', {})
-        if response.get('opcode', 0) == 2:
-            payload_str = base64.b64decode(response['payloadData']).decode('utf-8')
-            data = json.loads(payload_str)
-
-            if 'history' in data:
-                if not CURRENT_ASSET:
-                    CURRENT_ASSET = data['asset']
-                if PERIOD != data['period']:
-                    PERIOD = data['period']
-                    CANDLES = {}
-                    FAVORITES_REANIMATED = False
-
-                candles = list(reversed(data['candles']))
-                for tstamp, value in data['history']:
-                    tstamp = int(float(tstamp))
-                    candle = [tstamp, value, value, value, value]
-                    candle[2] = value  # close
-                    if value > candle[3]:  # high
-                        candle[3] = value
-                    if value < candle[4]:  # low
-                        candle[4] = value
-                    if tstamp % PERIOD == 0:
-                        if tstamp not in [c[0] for c in candles]:
-                            candles.append([tstamp, value, value, value, value])
-                CANDLES[data['asset']] = candles
-
-            try:
-                asset = data[0][0]
-                candles = CANDLES[asset]
-                current_value = data[0][2]
-                candles[-1][2] = current_value  # close
-                if current_value > candles[-1][3]:  # high
-                    candles[-1][3] = current_value
-                if current_value < candles[-1][4]:  # low
-                    candles[-1][4] = current_value
-                tstamp = int(float(data[0][1]))
+    for payload_str in ws_stream.read_payloads(driver):
+        data = json.loads(payload_str)
+
+        if 'history' in data:
+            if not CURRENT_ASSET:
+                CURRENT_ASSET = data['asset']
+            if PERIOD != data['period']:
+                PERIOD = data['period']
+                CANDLES = {}
+                FAVORITES_REANIMATED = False
+
+            candles = list(reversed(data['candles']))
+            for tstamp, value in data['history']:
+                tstamp = int(float(tstamp))
+                candle = [tstamp, value, value, value, value]
+                candle[2] = value  # close
+                if value > candle[3]:  # high
+                    candle[3] = value
+                if value < candle[4]:  # low
+                    candle[4] = value
                 if tstamp % PERIOD == 0:
                     if tstamp not in [c[0] for c in candles]:
-                        candles.append([tstamp, current_value, current_value, current_value, current_value])
-            except:
-                pass
+                        candles.append([tstamp, value, value, value, value])
+            CANDLES[data['asset']] = candles
+
+        try:
+            asset = data[0][0]
+            candles = CANDLES[asset]
+            current_value = data[0][2]
+            candles[-1][2] = current_value  # close
+            if current_value > candles[-1][3]:  # high
+                candles[-1][3] = current_value
+            if current_value < candles[-1][4]:  # low
+                candles[-1][4] = current_value
+            tstamp = int(float(data[0][1]))
+            if tstamp % PERIOD == 0:
+                if tstamp not in [c[0] for c in candles]:
+                    candles.append([tstamp, current_value, current_value, current_value, current_value])
+        except:
+            pass
 
     if not FAVORITES_REANIMATED:
         try:
@@ -872,6 +870,9 @@ async def main():
     # Check account setup
     await check_account_setup(driver)
 
+    if await ws_stream.attach(driver, page_hint='pocket'):
+        log("Live WebSocket stream connected (CDP)")
+
     log("=" * 60)
     log("BOT STARTED - LIVE TRADING")
     log("=" * 60)
@@ -885,9 +886,12 @@ async def main():
             continue
 
         await websocket_log(driver)
+        stream_message = ws_stream.status_message(driver)
+        if stream_message:
+            log(stream_message)
         await check_indicators(driver)
         await check_deposit(driver)
-        await asyncio.sleep(0.5)
+        await ws_stream.wait_for_frames(driver, 0.5)
 
 
 # ==================== SETTINGS MANAGEMENT ====================
@@ -1,5 +1,4 @@
 import asyncio
-import base64
 import json
 import operator
 import os
@@ -15,6 +14,8 @@ from selenium.common.exceptions import ElementNotInteractableException, NoSuchEl
 from selenium.webdriver.common.by import By
 import undetected_chromedriver as uc
 
+import ws_stream
+
 ops = {
     '>': operator.gt,
     '<': operator.lt,
@@ -85,7 +86,8 @@ async def set_remote_debugging_allowed():
 
 async def get_driver():
     options = uc.ChromeOptions()
-    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    if ws_stream.needs_performance_log():
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
     options.add_argument('--ignore-ssl-errors')
     options.add_argument('--ignore-certificate-errors')
     options.add_argument('--ignore-certificate-errors-spki-list')
@@ -124,55 +126,51 @@ async def websocket_log(driver):
     global ASSETS, PERIOD, CANDLES, ACTIONS, LICENSE_VALID, TRADES, CURRENT_ASSET, FAVORITES_REANIMATED, \
         TRADING_ALLOWED, SERVER_STRATEGIES
 
-    for wsData in driver.get_log('performance'):
-        message = json.loads(wsData['message'])['message']
-        response = message.get('params', {}).get('response', {})
-        if response.get('opcode', 0) == 2:
-            payload_str = base64.b64decode(response['payloadData']).decode('utf-8')
-            data = json.loads(payload_str)
-            if 'history' in data:
-                if not CURRENT_ASSET:
-                    CURRENT_ASSET = data['asset']
-                    # print('Current asset:', CURRENT_ASSET)
-                if PERIOD != data['period']:
-                    # time is changed, refresh
-                    PERIOD = data['period']
-                    CANDLES = {}
-                    ACTIONS = {}
-                    FAVORITES_REANIMATED = False
-                candles = list(reversed(data['candles']))  # timestamp open close high low
-                # put history data to the candles
-                for tstamp, value in data['history']:
-                    tstamp = int(float(tstamp))
-                    candle = [tstamp, value, value, value, value]
-                    candle[2] = value  # set close all the time
-                    if value > candle[3]:  # set high
-                        candle[3] = value
-                    if value < candle[4]:  # set low
-                        candle[4] = value
-                    if tstamp % PERIOD == 0:
-                        if tstamp not in [c[0] for c in candles]:
-                            candles.append([tstamp, value, value, value, value])
-                CANDLES[data['asset']] = candles
-                # log('Got', len(candles), 'candles for', data['asset'])
-
-            try:
-                asset = data[0][0]
-                candles = CANDLES[asset]
-                current_value = data[0][2]
-                candles[-1][2] = current_value  # set close all the time
-                if current_value > candles[-1][3]:  # set high
-                    candles[-1][3] = current_value
-                if current_value < candles[-1][4]:  # set low
-                    candles[-1][4] = current_value
-                tstamp = int(float(data[0][1]))
+    for payload_str in ws_stream.read_payloads(driver):
+        data = json.loads(payload_str)
+        if 'history' in data:
+            if not CURRENT_ASSET:
+                CURRENT_ASSET = data['asset']
+                # print('Current asset:', CURRENT_ASSET)
+            if PERIOD != data['period']:
+                # time is changed, refresh
+                PERIOD = data['period']
+                CANDLES = {}
+                ACTIONS = {}
+                FAVORITES_REANIMATED = False
+            candles = list(reversed(data['candles']))  # timestamp open close high low
+            # put history data to the candles
+            for tstamp, value in data['history']:
+                tstamp = int(float(tstamp))
+                candle = [tstamp, value, value, value, value]
+                candle[2] = value  # set close all the time
+                if value > candle[3]:  # set high
+                    candle[3] = value
+                if value < candle[4]:  # set low
+                    candle[4] = value
                 if tstamp % PERIOD == 0:
                     if tstamp not in [c[0] for c in candles]:
-                        # execute condition here
-                        candles.append([tstamp, current_value, current_value, current_value, current_value])
-                        # print('Candle appended for asset', asset, 'Len candles:', len(CANDLES[asset]))
-            except:
-                pass
+                        candles.append([tstamp, value, value, value, value])
+            CANDLES[data['asset']] = candles
+            # log('Got', len(candles), 'candles for', data['asset'])
+
+        try:
+            asset = data[0][0]
+            candles = CANDLES[asset]
+            current_value = data[0][2]
+            candles[-1][2] = current_value  # set close all the time
+            if current_value > candles[-1][3]:  # set high
+                candles[-1][3] = current_value
+            if current_value < candles[-1][4]:  # set low
+                candles[-1][4] = current_value
+            tstamp = int(float(data[0][1]))
+            if tstamp % PERIOD == 0:
+                if tstamp not in [c[0] for c in candles]:
+                    # execute condition here
+                    candles.append([tstamp, current_value, current_value, current_value, current_value])
+                    # print('Candle appended for asset', asset, 'Len candles:', len(CANDLES[asset]))
+        except:
+            pass
 
     if not FAVORITES_REANIMATED:
         try:
@@ -715,12 +713,18 @@ async def main():
     await set_remote_debugging_allowed()
     driver = await get_driver()
     driver.get(URL)
+    await ws_stream.attach(driver, page_hint='pocket')
     while True:
         if not TRADING_ALLOWED:
             continue
         await websocket_log(driver)
+        stream_message = ws_stream.status_message(driver)
+        if stream_message:
+            log(stream_message)
         await check_indicators(driver)
         await check_deposit(driver)
+        # Also re-attaches a dropped CDP stream; 0 keeps the poll loop's old pace
+        await ws_stream.wait_for_frames(driver, 0.5 if ws_stream.get_status(driver)['mode'] == 'cdp' else 0)
 
 
 def cleanup_martingale_list(value):
@@ -0,0 +1,121 @@
+"""
+Profiler - Call counts and p50/p99 durations of analysis stages and strategies
+Near-zero cost when disabled: clock() returns None and every record call returns at once
+
+Timings are grouped by category ('stages' for enhanced_strategy steps,
+'strategies' for individual strategy evaluations) and name. Each keeps a
+call count, a running total and the last SAMPLES durations for percentiles.
+
+    started = PROFILER.clock()
+    ...
+    PROFILER.record_since('strategies', strategy_id, started)
+
+    laps = PROFILER.laps('stages')   # consecutive stages of one pass
+    ...
+    laps('indicators')               # time since the previous lap (or laps())
+
+record() runs on the trading thread while get_stats() serves the web UI, so
+both hold the profiler's lock.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+SAMPLES = 1024  # Durations kept per timing for p50/p99
+
+
+class Timing:
+    """Count, total and recent durations of one stage / strategy"""
+
+    __slots__ = ('count', 'total', 'samples')
+
+    def __init__(self, samples: int = SAMPLES):
+        self.count = 0
+        self.total = 0.0
+        self.samples: Deque[float] = deque(maxlen=samples)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def get_stats(self) -> Dict:
+        """Durations in milliseconds"""
+        return {
+            'calls': self.count,
+            'total_ms': round(self.total * 1000, 3),
+            'mean_ms': round(self.total * 1000 / self.count, 4) if self.count else 0.0,
+            'p50_ms': round(self.percentile(0.50) * 1000, 4),
+            'p99_ms': round(self.percentile(0.99) * 1000, 4),
+        }
+
+
+def _no_lap(name: str):
+    pass
+
+
+class Profiler:
+    def __init__(self, samples: int = SAMPLES):
+        self.enabled = False
+        self.samples = samples
+        self._timings: Dict[Tuple[str, str], Timing] = {}
+        self._lock = threading.Lock()
+
+    def clock(self) -> Optional[float]:
+        """Start time for record_since(), None while disabled"""
+        return time.perf_counter() if self.enabled else None
+
+    def record_since(self, category: str, name: str, started: Optional[float]):
+        if started is not None:
+            self.record(category, name, time.perf_counter() - started)
+
+    def record(self, category: str, name: str, seconds: float):
+        with self._lock:
+            timing = self._timings.get((category, name))
+            if timing is None:
+                timing = self._timings[(category, name)] = Timing(self.samples)
+            timing.add(seconds)
+
+    def laps(self, category: str):
+        """lap(name) callable timing consecutive stages (a no-op while disabled)"""
+        if not self.enabled:
+            return _no_lap
+
+        mark = [time.perf_counter()]
+
+        def lap(name: str):
+            now = time.perf_counter()
+            self.record(category, name, now - mark[0])
+            mark[0] = now
+        return lap
+
+    def reset(self):
+        with self._lock:
+            self._timings.clear()
+
+    def get_stats(self) -> Dict:
+        stats = {'enabled': self.enabled, 'stages': {}, 'strategies': {}}
+        with self._lock:
+            for (category, name), timing in self._timings.items():
+                stats.setdefault(category, {})[name] = timing.get_stats()
+        return stats
+
+
+# Global instance
+_profiler_instance = None
+
+
+def get_profiler() -> Profiler:
+    """Get or create global profiler instance"""
+    global _profiler_instance
+    if _profiler_instance is None:
+        _profiler_instance = Profiler()
+    return _profiler_instance
@@ -23,6 +23,8 @@ from datetime import datetime, timedelta
 import logging
 from typing import Dict, List, Tuple, Optional
 
+import indicator_lib
+
 logger = logging.getLogger(__name__)
 
 # Try to import talib, fallback to numpy if not available
@@ -710,19 +712,9 @@ class UltimateReversalCatcher:
             if TALIB_AVAILABLE:
                 return ta.RSI(prices, timeperiod=period)
             else:
-                # Numpy fallback
-                deltas = np.diff(prices)
-                gains = np.where(deltas > 0, deltas, 0)
-                losses = np.where(deltas < 0, -deltas, 0)
-
-                avg_gain = np.convolve(gains, np.ones(period)/period, mode='valid')
-                avg_loss = np.convolve(losses, np.ones(period)/period, mode='valid')
-
-                rs = avg_gain / (avg_loss + 1e-10)
-                rsi = 100 - (100 / (1 + rs))
-
-                # Pad with 50s at the beginning
-                return np.concatenate([np.full(len(prices) - len(rsi), 50), rsi])
+                # Numpy fallback - Wilder smoothing like ta.RSI, 50 during warm-up
+                rsi = indicator_lib.rsi(prices, period, smoothing='wilder')
+                return np.where(np.isnan(rsi), 50.0, rsi)
         except Exception as e:
             logger.error(f"Error calculating RSI: {e}")
             return np.full(len(prices), 50)
@@ -734,12 +726,7 @@ class UltimateReversalCatcher:
                 return ta.MACD(prices, fastperiod=fast, slowperiod=slow, signalperiod=signal)
             else:
                 # Numpy fallback - exponential moving averages
-                ema_fast = self._ema(prices, fast)
-                ema_slow = self._ema(prices, slow)
-                macd_line = ema_fast - ema_slow
-                signal_line = self._ema(macd_line, signal)
-                histogram = macd_line - signal_line
-                return macd_line, signal_line, histogram
+                return indicator_lib.macd(prices, fast, slow, signal, signal_mode='ema', seed='first')
         except Exception as e:
             logger.error(f"Error calculating MACD: {e}")
             return np.zeros(len(prices)), np.zeros(len(prices)), np.zeros(len(prices))
@@ -751,10 +738,7 @@ class UltimateReversalCatcher:
                 return ta.MOM(prices, timeperiod=period)
             else:
                 # Numpy fallback
-                momentum = np.zeros(len(prices))
-                for i in range(period, len(prices)):
-                    momentum[i] = prices[i] - prices[i - period]
-                return momentum
+                return np.nan_to_num(indicator_lib.momentum(prices, period))
         except Exception as e:
             logger.error(f"Error calculating momentum: {e}")
             return np.zeros(len(prices))
@@ -762,14 +746,7 @@ class UltimateReversalCatcher:
     def _ema(self, data: np.ndarray, period: int) -> np.ndarray:
         """Calculate exponential moving average"""
         try:
-            ema = np.zeros(len(data))
-            ema[0] = data[0]
-            multiplier = 2 / (period + 1)
-
-            for i in range(1, len(data)):
-                ema[i] = (data[i] * multiplier) + (ema[i-1] * (1 - multiplier))
-
-            return ema
+            return indicator_lib.ema(data, period, seed='first')
         except Exception as e:
             logger.error(f"Error calculating EMA: {e}")
             return np.zeros(len(data))
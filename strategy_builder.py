@@ -8,6 +8,8 @@ import os
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
 
+from strategy_compiler import AtomState, AtomTable, CompiledStrategy, compile_strategies
+
 
 class StrategyBuilder:
     """
@@ -47,6 +49,7 @@ class StrategyBuilder:
     def __init__(self, strategies_file: str = "custom_strategies.json"):
         self.strategies_file = strategies_file
         self.strategies = self._load_strategies()
+        self._compile()
 
     def _load_strategies(self) -> Dict[str, Dict]:
         """Load strategies from file"""
@@ -231,7 +234,8 @@ class StrategyBuilder:
         }
 
     def _save_strategies(self):
-        """Save strategies to file"""
+        """Save strategies to file (and recompile them - every edit goes through here)"""
+        self._compile()
         try:
             with open(self.strategies_file, 'w') as f:
                 json.dump(self.strategies, f, indent=2)
@@ -328,6 +332,23 @@ class StrategyBuilder:
     def reload_strategies(self):
         """Reload strategies from file (useful for syncing after external changes)"""
         self.strategies = self._load_strategies()
+        self._compile()
+
+    def _compile(self):
+        """Intern the active strategies' conditions into one atom table"""
+        self.atoms, self.compiled = compile_strategies(self.strategies)
+
+    def get_compiled(self, strategy_id: str) -> Optional[CompiledStrategy]:
+        """Compiled predicates of a strategy (recompiles if it was activated without a save)"""
+        if strategy_id not in self.compiled and strategy_id in self.strategies:
+            self._compile()
+            if strategy_id not in self.compiled:  # Inactive - compile on its own
+                return CompiledStrategy(self.strategies[strategy_id], AtomTable())
+        return self.compiled.get(strategy_id)
+
+    def evaluate_atoms(self, indicators: Dict) -> AtomState:
+        """Every distinct condition of the active strategies, once - pass to evaluate_strategy(atoms=...)"""
+        return self.atoms.evaluate(indicators)
 
     def get_strategy(self, strategy_id: str) -> Optional[Dict]:
         """Get a specific strategy"""
@@ -351,11 +372,14 @@ class StrategyBuilder:
         indicators: Dict,
         regime: str,
         mtf_aligned: bool,
-        ai_decision: Optional[Tuple[str, float, str]] = None
+        ai_decision: Optional[Tuple[str, float, str]] = None,
+        atoms: Optional[AtomState] = None
     ) -> Tuple[Optional[str], float, str]:
         """
         Evaluate if strategy conditions are met
 
+        atoms: evaluate_atoms(indicators), shared by all strategies of this bar
+
         Returns:
             (action, confidence, reason) or (None, 0, reason) if no signal
         """
@@ -375,10 +399,10 @@ class StrategyBuilder:
                 return (None, 0.0, "Higher timeframes not aligned - skipping")
 
         # Evaluate entry conditions
-        conditions_met, action, confidence, reasons = self._evaluate_conditions(
-            strategy['entry_conditions'],
-            indicators
-        )
+        compiled = self.get_compiled(strategy_id)
+        if atoms is None or atoms.table is not compiled.table:
+            atoms = self.evaluate_atoms(indicators)
+        conditions_met, action, confidence, reasons = self._evaluate_conditions(compiled, atoms)
 
         if not conditions_met:
             return (None, 0.0, "Entry conditions not met")
@@ -415,92 +439,31 @@ class StrategyBuilder:
 
     def _evaluate_conditions(
         self,
-        conditions: List[Dict],
-        indicators: Dict
+        compiled: CompiledStrategy,
+        atoms: AtomState
     ) -> Tuple[bool, Optional[str], float, List[str]]:
         """
-        Evaluate a list of conditions
+        Evaluate a strategy's entry conditions against this bar's atoms
 
         Returns:
-            (all_met, action, confidence, reasons)
+            (all_met, action, confidence, reasons) - action/confidence/reasons
+            are only worked out when all conditions are met
         """
+        conditions = compiled.entry_conditions
         if not conditions:
             return (False, None, 0.0, ["No conditions defined"])
 
-        met_count = 0
-        total_count = len(conditions)
-        reasons = []
-        actions = []
-
-        for condition in conditions:
-            indicator_name = condition.get('indicator')
-            operator = condition.get('operator')
-            threshold = condition.get('value')
-            action = condition.get('action', 'call')  # Default to call
-
-            # Get indicator value
-            indicator_value = indicators.get(indicator_name)
-
-            if indicator_value is None:
-                continue  # Skip if indicator not available
-
-            # Handle special values (like 'upper_bb', 'lower_bb')
-            if isinstance(threshold, str) and threshold in indicators:
-                threshold = indicators[threshold]
-
-            # Evaluate condition
-            met = self._evaluate_single_condition(indicator_value, operator, threshold)
-
-            if met:
-                met_count += 1
-                reasons.append(f"{indicator_name} {operator} {threshold}")
-                actions.append(action)
-
         # All conditions must be met
-        all_met = (met_count == total_count)
+        if not compiled.entry_met(atoms):
+            return (False, None, 0.0, [])
 
-        # Determine action (majority vote if multiple actions)
-        if actions:
-            action = max(set(actions), key=actions.count)  # Most common action
-        else:
-            action = None
+        reasons = [atoms.reason(condition.atom) for condition in conditions]
+        actions = [condition.action for condition in conditions]
 
-        # Confidence based on how many conditions met
-        confidence = (met_count / total_count) * 100 if total_count > 0 else 0
-
-        return (all_met, action, confidence, reasons)
+        # Determine action (majority vote if multiple actions)
+        action = max(set(actions), key=actions.count)  # Most common action
 
-    def _evaluate_single_condition(
-        self,
-        indicator_value: Any,
-        operator: str,
-        threshold: Any
-    ) -> bool:
-        """Evaluate a single condition"""
-        try:
-            if operator == '>':
-                return float(indicator_value) > float(threshold)
-            elif operator == '<':
-                return float(indicator_value) < float(threshold)
-            elif operator == '>=':
-                return float(indicator_value) >= float(threshold)
-            elif operator == '<=':
-                return float(indicator_value) <= float(threshold)
-            elif operator == '==':
-                return str(indicator_value).lower() == str(threshold).lower()
-            elif operator == '!=':
-                return str(indicator_value).lower() != str(threshold).lower()
-            elif operator == 'contains':
-                # For pattern matching (e.g., indicator_value='bullish_engulfing', threshold='engulfing')
-                return str(threshold).lower() in str(indicator_value).lower()
-            elif operator == 'is_pattern':
-                # Special operator for pattern detection
-                # indicator_value is the pattern name, threshold is the expected pattern
-                return str(indicator_value).lower() == str(threshold).lower()
-            else:
-                return False
-        except:
-            return False
+        return (True, action, 100.0, reasons)
 
     def record_strategy_result(
         self,
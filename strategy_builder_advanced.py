@@ -19,6 +19,11 @@ from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, time as dt_time
 from collections import defaultdict
 
+from profiler import get_profiler
+from strategy_compiler import ADVANCED_OPERATORS, AtomState, AtomTable, CompiledStrategy, compile_strategies
+from strategy_index import EligibilityIndex, asset_allowed, hour_allowed, within_risk_limits
+from strategy_masks import empty_result, series_length, strategy_series
+
 
 class AdvancedStrategyBuilder:
     """
@@ -84,6 +89,7 @@ class AdvancedStrategyBuilder:
     def __init__(self, strategies_file: str = "custom_strategies.json"):
         self.strategies_file = strategies_file
         self.strategies = self._load_strategies()
+        self._compile()
         self.execution_mode = 'priority'  # 'priority', 'all', 'voting', 'weighted'
 
     def _load_strategies(self) -> Dict[str, Dict]:
@@ -97,13 +103,27 @@ class AdvancedStrategyBuilder:
         return {}
 
     def _save_strategies(self):
-        """Save strategies to file"""
+        """Save strategies to file (and recompile them - every edit goes through here)"""
+        self._compile()
         try:
             with open(self.strategies_file, 'w') as f:
                 json.dump(self.strategies, f, indent=2)
         except Exception as e:
             print(f"Error saving strategies: {e}")
 
+    def _compile(self):
+        """Intern the active strategies' conditions into one atom table, re-index their eligibility"""
+        self.atoms, self.compiled = compile_strategies(self.strategies, ADVANCED_OPERATORS)
+        self.index = EligibilityIndex(self.strategies)
+
+    def get_compiled(self, strategy_id: str) -> Optional[CompiledStrategy]:
+        """Compiled predicates of a strategy (recompiles if it was activated without a save)"""
+        if strategy_id not in self.compiled and strategy_id in self.strategies:
+            self._compile()
+            if strategy_id not in self.compiled:  # Inactive - compile on its own
+                return CompiledStrategy(self.strategies[strategy_id], AtomTable(ADVANCED_OPERATORS))
+        return self.compiled.get(strategy_id)
+
     def set_execution_mode(self, mode: str):
         """
         Set multi-strategy execution mode
@@ -122,48 +142,49 @@ class AdvancedStrategyBuilder:
         market_data: Dict,
         indicators: Dict,
         regime: str,
-        mtf_aligned: bool
+        mtf_aligned: bool,
+        hour: Optional[int] = None,
+        risk_limits: bool = True
     ) -> List[Dict]:
         """
         Evaluate all active strategies and return signals based on execution mode
 
+        Args:
+            hour: hour the time filters are checked against (None = now); replay
+                passes the candle's hour
+            risk_limits: False ignores the live trade counters in performance
+
         Returns:
             List of strategy signals with actions and confidence
         """
         signals = []
+        atoms = None
+        profiler = get_profiler()
 
-        # Get all active strategies
-        active_strategies = self.get_active_strategies()
-
-        # Sort by priority (highest first)
-        sorted_strategies = sorted(
-            active_strategies.items(),
-            key=lambda x: x[1].get('priority', 5),
-            reverse=True
-        )
+        # Active strategies allowed at this hour, for this asset and regime and within
+        # risk limits - highest priority first (index rebuilt on every save/reload)
+        current_asset = market_data.get('asset', 'Unknown')
+        if hour is None:
+            hour = datetime.now().hour
+        eligible = self.index.eligible(current_asset, hour, regime, risk_limits)
 
         # Evaluate each strategy
-        for strategy_id, strategy in sorted_strategies:
-            # Check time filter
-            if not self._check_time_filter(strategy):
-                continue
-
-            # Check asset filter
-            current_asset = market_data.get('asset', 'Unknown')
-            if not self._check_asset_filter(strategy, current_asset):
-                continue
-
-            # Check risk limits
-            if not self._check_risk_limits(strategy):
-                continue
+        for strategy_id, strategy in eligible:
+            # Every distinct condition once for all strategies
+            if atoms is None:
+                atoms = self.atoms.evaluate(indicators)
 
             # Evaluate strategy conditions
+            started = profiler.clock()
             result = self._evaluate_strategy_conditions(
                 strategy,
                 indicators,
                 regime,
-                mtf_aligned
+                mtf_aligned,
+                self.compiled[strategy_id],
+                atoms
             )
+            profiler.record_since('strategies', strategy_id, started)
 
             if result['signal']:
                 signals.append({
@@ -187,11 +208,16 @@ class AdvancedStrategyBuilder:
         strategy: Dict,
         indicators: Dict,
         regime: str,
-        mtf_aligned: bool
+        mtf_aligned: bool,
+        compiled: Optional[CompiledStrategy] = None,
+        atoms: Optional[AtomState] = None
     ) -> Dict:
         """
         Evaluate strategy with AND/OR condition groups
 
+        compiled/atoms: the strategy's compiled form and this bar's atom
+        results (both worked out here when not given)
+
         Returns:
             {'signal': bool, 'action': str, 'confidence': float, 'reason': str}
         """
@@ -207,62 +233,41 @@ class AdvancedStrategyBuilder:
                 return {'signal': False, 'action': None, 'confidence': 0.0,
                        'reason': "Higher timeframes not aligned"}
 
+        if compiled is None:
+            compiled = CompiledStrategy(strategy, AtomTable(ADVANCED_OPERATORS))
+        if atoms is None or atoms.table is not compiled.table:
+            atoms = compiled.table.evaluate(indicators)
+
         # Evaluate condition groups
-        condition_groups = strategy.get('condition_groups', [])
-        if not condition_groups:
+        if not compiled.condition_groups:
             # Fallback to old-style entry_conditions
-            return self._evaluate_legacy_conditions(strategy, indicators)
+            return self._evaluate_legacy_conditions(compiled, atoms)
 
         group_results = []
         all_reasons = []
 
-        for group in condition_groups:
-            group_logic = group.get('logic', 'AND')
-            conditions = group.get('conditions', [])
+        for group in compiled.condition_groups:
+            # AND: every condition bit set, OR: any
+            if not group.passes(atoms):
+                continue
 
             met_conditions = 0
-            total_weight = 0.0
             met_weight = 0.0
             group_reasons = []
-
-            for condition in conditions:
-                indicator_name = condition.get('indicator')
-                operator = condition.get('operator')
-                threshold = condition.get('value')
-                weight = condition.get('weight', 1.0)
-
-                total_weight += weight
-
-                # Get indicator value
-                indicator_value = indicators.get(indicator_name)
-                if indicator_value is None:
-                    continue
-
-                # Handle special values
-                if isinstance(threshold, str) and threshold in indicators:
-                    threshold = indicators[threshold]
-
-                # Evaluate condition
-                if self._evaluate_single_condition(indicator_value, operator, threshold):
+            for condition in group.conditions:
+                if atoms.is_met(condition.atom):
                     met_conditions += 1
-                    met_weight += weight
-                    group_reasons.append(f"{indicator_name} {operator} {threshold}")
+                    met_weight += condition.weight
+                    group_reasons.append(atoms.reason(condition.atom))
 
-            # Check if group passes
-            if group_logic == 'AND':
-                group_passes = (met_conditions == len(conditions))
-            else:  # OR
-                group_passes = (met_conditions > 0)
-
-            if group_passes:
-                # Calculate group confidence
-                if strategy.get('signal_strength', {}).get('condition_weights', False):
-                    group_confidence = (met_weight / total_weight * 100) if total_weight > 0 else 0
-                else:
-                    group_confidence = (met_conditions / len(conditions) * 100) if conditions else 0
+            # Calculate group confidence
+            if strategy.get('signal_strength', {}).get('condition_weights', False):
+                group_confidence = (met_weight / group.total_weight * 100) if group.total_weight > 0 else 0
+            else:
+                group_confidence = (met_conditions / len(group.conditions) * 100) if group.conditions else 0
 
-                group_results.append(group_confidence)
-                all_reasons.extend(group_reasons)
+            group_results.append(group_confidence)
+            all_reasons.extend(group_reasons)
 
         # Check if any groups passed
         if not group_results:
@@ -291,129 +296,67 @@ class AdvancedStrategyBuilder:
             'reason': ' + '.join(all_reasons)
         }
 
-    def _evaluate_legacy_conditions(self, strategy: Dict, indicators: Dict) -> Dict:
-        """Evaluate old-style entry_conditions for backward compatibility"""
-        conditions = strategy.get('entry_conditions', [])
-        if not conditions:
-            return {'signal': False, 'action': None, 'confidence': 0.0,
-                   'reason': "No conditions defined"}
+    def evaluate_strategy_series(
+        self,
+        strategy_id: str,
+        indicators: Dict,
+        regime: Any = None,
+        mtf_aligned: Any = None,
+        asset: Optional[str] = None,
+        hours: Any = None
+    ) -> Dict:
+        """
+        _evaluate_strategy_conditions for every bar of full-length indicator series at once
 
-        met_count = 0
-        reasons = []
-        actions = []
+        Args:
+            indicators: {name: series (one value per bar) or scalar}
+            regime, mtf_aligned: per-bar series or scalars (None = filter not applied)
+            asset, hours: apply the asset / time filter (hours = per-bar hour series)
 
-        for condition in conditions:
-            indicator_name = condition.get('indicator')
-            operator = condition.get('operator')
-            threshold = condition.get('value')
-            action = condition.get('action', 'call')
+        Risk limits depend on live trade counters and are not applied.
 
-            indicator_value = indicators.get(indicator_name)
-            if indicator_value is None:
-                continue
+        Returns:
+            {'entry': bool array, 'confidence': float array, 'action': object array}
+        """
+        n = series_length(indicators)
+        strategy = self.strategies.get(strategy_id)
+        if not strategy or not strategy.get('active', False):
+            return empty_result(n)
+        if asset is not None and not asset_allowed(strategy, asset):
+            return empty_result(n)
 
-            if isinstance(threshold, str) and threshold in indicators:
-                threshold = indicators[threshold]
+        return strategy_series(strategy, self.get_compiled(strategy_id), indicators, n, regime, mtf_aligned, hours)
 
-            if self._evaluate_single_condition(indicator_value, operator, threshold):
-                met_count += 1
-                reasons.append(f"{indicator_name} {operator} {threshold}")
-                actions.append(action)
+    def _evaluate_legacy_conditions(self, compiled: CompiledStrategy, atoms: AtomState) -> Dict:
+        """Evaluate old-style entry_conditions for backward compatibility"""
+        conditions = compiled.entry_conditions
+        if not conditions:
+            return {'signal': False, 'action': None, 'confidence': 0.0,
+                   'reason': "No conditions defined"}
 
-        all_met = (met_count == len(conditions))
-        confidence = (met_count / len(conditions) * 100) if conditions else 0
-        action = max(set(actions), key=actions.count) if actions else None
+        if not compiled.entry_met(atoms):
+            return {'signal': False, 'action': None, 'confidence': 0.0,
+                   'reason': "Conditions not met"}
 
+        actions = [condition.action for condition in conditions]
         return {
-            'signal': all_met,
-            'action': action,
-            'confidence': confidence,
-            'reason': ' + '.join(reasons) if reasons else "Conditions not met"
+            'signal': True,
+            'action': max(set(actions), key=actions.count),
+            'confidence': 100.0,
+            'reason': ' + '.join(atoms.reason(condition.atom) for condition in conditions)
         }
 
-    def _evaluate_single_condition(self, indicator_value: Any, operator: str, threshold: Any) -> bool:
-        """Evaluate a single condition"""
-        try:
-            if operator == '>':
-                return float(indicator_value) > float(threshold)
-            elif operator == '<':
-                return float(indicator_value) < float(threshold)
-            elif operator == '>=':
-                return float(indicator_value) >= float(threshold)
-            elif operator == '<=':
-                return float(indicator_value) <= float(threshold)
-            elif operator == '==':
-                return str(indicator_value).lower() == str(threshold).lower()
-            elif operator == '!=':
-                return str(indicator_value).lower() != str(threshold).lower()
-            elif operator == 'contains':
-                return str(threshold).lower() in str(indicator_value).lower()
-            else:
-                return False
-        except:
-            return False
-
-    def _check_time_filter(self, strategy: Dict) -> bool:
-        """Check if current time is within allowed trading hours"""
-        time_filter = strategy.get('time_filter', {})
-        if not time_filter.get('enabled', False):
-            return True
-
-        allowed_hours = time_filter.get('allowed_hours', [])
-        if not allowed_hours:
-            return True
-
-        current_hour = datetime.now().hour
-
-        for hour_range in allowed_hours:
-            if len(hour_range) == 2:
-                start, end = hour_range
-                if start <= current_hour < end:
-                    return True
-
-        return False
+    def _check_time_filter(self, strategy: Dict, hour: Optional[int] = None) -> bool:
+        """Check if current time (or the given hour) is within allowed trading hours"""
+        return hour_allowed(strategy, datetime.now().hour if hour is None else hour)
 
     def _check_asset_filter(self, strategy: Dict, asset: str) -> bool:
         """Check if asset is allowed for this strategy"""
-        asset_filter = strategy.get('asset_filter', {})
-        if not asset_filter.get('enabled', False):
-            return True
-
-        whitelist = asset_filter.get('whitelist', [])
-        blacklist = asset_filter.get('blacklist', [])
-
-        if whitelist and asset not in whitelist:
-            return False
-
-        if blacklist and asset in blacklist:
-            return False
-
-        return True
+        return asset_allowed(strategy, asset)
 
     def _check_risk_limits(self, strategy: Dict) -> bool:
         """Check if strategy is within risk limits"""
-        risk_mgmt = strategy.get('risk_management', {})
-        perf = strategy.get('performance', {})
-
-        # Check trades today
-        max_trades_day = risk_mgmt.get('max_trades_per_day', 999)
-        trades_today = perf.get('trades_today', 0)
-        if trades_today >= max_trades_day:
-            return False
-
-        # Check trades this hour
-        max_trades_hour = risk_mgmt.get('max_trades_per_hour', 999)
-        trades_hour = perf.get('trades_this_hour', 0)
-        if trades_hour >= max_trades_hour:
-            return False
-
-        # Check consecutive losses
-        max_consecutive_losses = risk_mgmt.get('max_consecutive_losses', 999)
-        consecutive_losses = perf.get('consecutive_losses', 0)
-        if consecutive_losses >= max_consecutive_losses:
-            return False
-
-        return True
+        return within_risk_limits(strategy)
 
     def _aggregate_signals(self, signals: List[Dict]) -> List[Dict]:
         """
@@ -509,6 +452,7 @@ class AdvancedStrategyBuilder:
     def reload_strategies(self):
         """Reload strategies from file (useful for syncing after external changes)"""
         self.strategies = self._load_strategies()
+        self._compile()
 
     def record_strategy_result(self, strategy_id: str, result: str, profit: float):
         """Record trade result for strategy"""
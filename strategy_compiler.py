@@ -0,0 +1,249 @@
+"""
+Strategy Compiler - Strategy conditions compiled into shared predicate atoms
+Operators are bound and literal thresholds converted once, when strategies are loaded or saved
+
+An atom is one distinct (indicator, operator, threshold) test. Strategies
+repeat the same atoms ('rsi > 70', 'supertrend == SELL'), so the AtomTable
+interns them: every active strategy's conditions point at atom indices and
+each atom is evaluated once per bar into a bitmask (AtomState.met). AND/OR
+groups then resolve with mask tests, and the per-condition walk (counts,
+weights, reasons) only runs for groups that pass.
+
+An atom is called with the indicators dict and returns None when the
+indicator is unavailable (the condition is skipped), otherwise (met,
+threshold) with the threshold it compared against. Numeric thresholds are
+converted with float() at compile time, text thresholds are lowered at
+compile time. A string threshold naming an indicator ('upper_bb') is still
+resolved per call, since its value changes every tick.
+
+Semantics match the builders' old _evaluate_single_condition: a value or
+threshold float() rejects never matches, unknown operators never match.
+"""
+
+import operator as op
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+_MISSING = object()
+
+
+def _never(value) -> bool:
+    return False
+
+
+def _numeric(compare: Callable[[float, float], bool]):
+    def bind(threshold) -> Callable[[Any], bool]:
+        try:
+            limit = float(threshold)
+        except Exception:
+            return _never
+
+        def test(value) -> bool:
+            try:
+                return compare(float(value), limit)
+            except Exception:
+                return False
+        return test
+    return bind
+
+
+def _text(compare: Callable[[str, str], bool]):
+    def bind(threshold) -> Callable[[Any], bool]:
+        expected = str(threshold).lower()
+
+        def test(value) -> bool:
+            return compare(str(value).lower(), expected)
+        return test
+    return bind
+
+
+# Operator -> bind(threshold) -> test(value)
+OPERATORS = {
+    '>': _numeric(op.gt),
+    '<': _numeric(op.lt),
+    '>=': _numeric(op.ge),
+    '<=': _numeric(op.le),
+    '==': _text(op.eq),
+    '!=': _text(op.ne),
+    'contains': _text(lambda value, expected: expected in value),  # 'bullish_engulfing' contains 'engulfing'
+    'is_pattern': _text(op.eq),
+}
+
+# AdvancedStrategyBuilder never supported 'is_pattern'
+ADVANCED_OPERATORS = {name: bind for name, bind in OPERATORS.items() if name != 'is_pattern'}
+
+
+def _unknown(threshold) -> Callable[[Any], bool]:
+    return _never
+
+
+def _compile_check(name, bind, threshold) -> Callable[[Dict], Optional[Tuple[bool, Any]]]:
+    test = bind(threshold)
+
+    if not isinstance(threshold, str):
+        def check(indicators):
+            value = indicators.get(name)
+            if value is None:
+                return None
+            return test(value), threshold
+        return check
+
+    def check_reference(indicators):
+        value = indicators.get(name)
+        if value is None:
+            return None
+        # Special values (like 'upper_bb', 'lower_bb') compare against another indicator
+        reference = indicators.get(threshold, _MISSING)
+        if reference is _MISSING:
+            return test(value), threshold
+        return bind(reference)(value), reference
+    return check_reference
+
+
+def atom_key(condition: Dict) -> Hashable:
+    """
+    Identity of a condition's test
+
+    The threshold's type is part of the key: 30 and 30.0 test the same but
+    print differently in signal reasons.
+    """
+    threshold = condition.get('value')
+    try:
+        hash(threshold)
+    except TypeError:
+        threshold = repr(threshold)
+    return condition.get('indicator'), condition.get('operator'), type(threshold).__name__, threshold
+
+
+class Atom:
+    """One distinct (indicator, operator, threshold) test"""
+
+    __slots__ = ('indicator', 'operator', 'threshold', 'known', 'check')
+
+    def __init__(self, condition: Dict, operators: Dict = OPERATORS):
+        self.indicator = condition.get('indicator')
+        self.operator = condition.get('operator')
+        self.threshold = condition.get('value')
+        self.known = self.operator in operators  # Unknown operators never match
+        self.check = _compile_check(self.indicator, operators.get(self.operator, _unknown), self.threshold)
+
+    def reason(self, threshold) -> str:
+        return f"{self.indicator} {self.operator} {threshold}"
+
+
+class AtomState:
+    """Atom results for one indicators dict: met bitmask + the thresholds met atoms compared against"""
+
+    __slots__ = ('met', 'thresholds', 'table')
+
+    def __init__(self, met: int, thresholds: Dict[int, Any], table: 'AtomTable'):
+        self.met = met
+        self.thresholds = thresholds
+        self.table = table  # Masks are only meaningful for strategies compiled against this table
+
+    def is_met(self, atom: int) -> bool:
+        return bool(self.met >> atom & 1)
+
+    def reason(self, atom: int) -> str:
+        return self.table.atoms[atom].reason(self.thresholds[atom])
+
+
+class AtomTable:
+    """Deduplicated atoms of a strategy set"""
+
+    def __init__(self, operators: Dict = OPERATORS):
+        self.operators = operators
+        self.atoms: List[Atom] = []
+        self._index: Dict[Hashable, int] = {}
+        self.conditions = 0  # Conditions interned (with repeats)
+
+    def intern(self, condition: Dict) -> int:
+        self.conditions += 1
+        key = atom_key(condition)
+        index = self._index.get(key)
+        if index is None:
+            index = self._index[key] = len(self.atoms)
+            self.atoms.append(Atom(condition, self.operators))
+        return index
+
+    def evaluate(self, indicators: Dict) -> AtomState:
+        """Every atom once"""
+        met = 0
+        thresholds = {}
+        for index, atom in enumerate(self.atoms):
+            outcome = atom.check(indicators)
+            if outcome is not None and outcome[0]:
+                met |= 1 << index
+                thresholds[index] = outcome[1]
+        return AtomState(met, thresholds, self)
+
+    def __len__(self) -> int:
+        return len(self.atoms)
+
+    def get_stats(self) -> Dict:
+        return {'conditions': self.conditions, 'unique_atoms': len(self.atoms)}
+
+
+class CompiledCondition:
+    """A strategy's use of an atom"""
+
+    __slots__ = ('atom', 'action', 'weight')
+
+    def __init__(self, condition: Dict, table: AtomTable):
+        self.atom = table.intern(condition)
+        self.action = condition.get('action', 'call')
+        self.weight = condition.get('weight', 1.0)
+
+
+class CompiledGroup:
+    """One AND/OR condition group"""
+
+    __slots__ = ('logic', 'conditions', 'mask', 'total_weight')
+
+    def __init__(self, group: Dict, table: AtomTable):
+        self.logic = group.get('logic', 'AND')
+        self.conditions = compile_conditions(group.get('conditions', []), table)
+        self.mask = condition_mask(self.conditions)
+        self.total_weight = 0.0
+        for condition in self.conditions:
+            self.total_weight += condition.weight
+
+    def passes(self, state: AtomState) -> bool:
+        if self.logic == 'AND':
+            return not self.mask & ~state.met
+        return bool(self.mask & state.met)  # OR
+
+
+class CompiledStrategy:
+    """entry_conditions and condition_groups of one strategy, compiled against an AtomTable"""
+
+    __slots__ = ('table', 'entry_conditions', 'entry_mask', 'condition_groups')
+
+    def __init__(self, strategy: Dict, table: AtomTable):
+        self.table = table
+        self.entry_conditions = compile_conditions(strategy.get('entry_conditions', []) or [], table)
+        self.entry_mask = condition_mask(self.entry_conditions)
+        self.condition_groups = [CompiledGroup(group, table) for group in strategy.get('condition_groups', []) or []]
+
+    def entry_met(self, state: AtomState) -> bool:
+        """All entry_conditions met"""
+        return bool(self.entry_conditions) and not self.entry_mask & ~state.met
+
+
+def compile_conditions(conditions: List[Dict], table: AtomTable) -> List[CompiledCondition]:
+    return [CompiledCondition(condition, table) for condition in conditions]
+
+
+def condition_mask(conditions: List[CompiledCondition]) -> int:
+    mask = 0
+    for condition in conditions:
+        mask |= 1 << condition.atom
+    return mask
+
+
+def compile_strategies(strategies: Dict[str, Dict],
+                       operators: Dict = OPERATORS) -> Tuple[AtomTable, Dict[str, CompiledStrategy]]:
+    """(shared atom table, {strategy_id: CompiledStrategy}) for the active strategies"""
+    table = AtomTable(operators)
+    compiled = {sid: CompiledStrategy(strategy, table)
+                for sid, strategy in strategies.items() if strategy.get('active', False)}
+    return table, compiled
@@ -0,0 +1,140 @@
+"""
+Strategy Index - Active strategies pre-bucketed by hour, asset, regime and risk state
+Priority order and eligibility bitmasks are built once per strategy save/reload
+
+Bit i of every mask is the i-th strategy in priority order (highest first,
+ties in file order, as the old per-call sort). A tick ANDs the masks for
+the current hour, asset and regime with the risk mask and walks only the
+bits left, so strategies that cannot fire are never touched.
+
+Hour masks are precomputed for all 24 hours. Asset and regime masks are
+worked out the first time an asset / regime is seen and memoised - the
+filters are applied exactly as written, whatever shape the lists have.
+"""
+
+from typing import Dict, Iterator, List, Tuple
+
+
+def hour_allowed(strategy: Dict, hour: int) -> bool:
+    """time_filter: any [start, end) range containing the hour"""
+    time_filter = strategy.get('time_filter', {})
+    if not time_filter.get('enabled', False):
+        return True
+
+    allowed_hours = time_filter.get('allowed_hours', [])
+    if not allowed_hours:
+        return True
+
+    for hour_range in allowed_hours:
+        if len(hour_range) == 2:
+            start, end = hour_range
+            if start <= hour < end:
+                return True
+
+    return False
+
+
+def asset_allowed(strategy: Dict, asset: str) -> bool:
+    """asset_filter: in the whitelist (if any) and not in the blacklist"""
+    asset_filter = strategy.get('asset_filter', {})
+    if not asset_filter.get('enabled', False):
+        return True
+
+    whitelist = asset_filter.get('whitelist', [])
+    blacklist = asset_filter.get('blacklist', [])
+
+    if whitelist and asset not in whitelist:
+        return False
+
+    if blacklist and asset in blacklist:
+        return False
+
+    return True
+
+
+def regime_allowed(strategy: Dict, regime: str) -> bool:
+    regime_filter = strategy.get('regime_filter')
+    return not regime_filter or regime in regime_filter
+
+
+def within_risk_limits(strategy: Dict) -> bool:
+    """Trades today / this hour and consecutive losses under the strategy's limits"""
+    risk_mgmt = strategy.get('risk_management', {})
+    perf = strategy.get('performance', {})
+
+    if perf.get('trades_today', 0) >= risk_mgmt.get('max_trades_per_day', 999):
+        return False
+    if perf.get('trades_this_hour', 0) >= risk_mgmt.get('max_trades_per_hour', 999):
+        return False
+    if perf.get('consecutive_losses', 0) >= risk_mgmt.get('max_consecutive_losses', 999):
+        return False
+
+    return True
+
+
+def _mask(strategies: List[Tuple[str, Dict]], allowed) -> int:
+    mask = 0
+    for rank, (_, strategy) in enumerate(strategies):
+        if allowed(strategy):
+            mask |= 1 << rank
+    return mask
+
+
+class EligibilityIndex:
+    """
+    Usage:
+        index = EligibilityIndex(builder.strategies)
+        for strategy_id, strategy in index.eligible(asset, hour, regime): ...
+
+    Rebuild it whenever strategies are saved or reloaded.
+    """
+
+    def __init__(self, strategies: Dict[str, Dict]):
+        active = [(sid, strategy) for sid, strategy in strategies.items() if strategy.get('active', False)]
+        self.ordered: List[Tuple[str, Dict]] = sorted(active, key=lambda item: item[1].get('priority', 5),
+                                                      reverse=True)
+        self.hours = [_mask(self.ordered, lambda s, hour=hour: hour_allowed(s, hour)) for hour in range(24)]
+        self.risk = _mask(self.ordered, within_risk_limits)
+        self._assets: Dict[str, int] = {}
+        self._regimes: Dict[str, int] = {}
+        self.lookups = 0
+        self.visited = 0
+
+    def asset_mask(self, asset: str) -> int:
+        mask = self._assets.get(asset)
+        if mask is None:
+            mask = self._assets[asset] = _mask(self.ordered, lambda s: asset_allowed(s, asset))
+        return mask
+
+    def regime_mask(self, regime: str) -> int:
+        mask = self._regimes.get(regime)
+        if mask is None:
+            mask = self._regimes[regime] = _mask(self.ordered, lambda s: regime_allowed(s, regime))
+        return mask
+
+    def eligible(self, asset: str, hour: int, regime: str,
+                 risk_limits: bool = True) -> Iterator[Tuple[str, Dict]]:
+        """
+        (strategy_id, strategy) that pass every filter, in priority order
+
+        risk_limits=False skips the live trade counters (session replay)
+        """
+        mask = self.hours[hour] & self.asset_mask(asset) & self.regime_mask(regime)
+        if risk_limits:
+            mask &= self.risk
+        self.lookups += 1
+        while mask:
+            low = mask & -mask
+            mask ^= low
+            self.visited += 1
+            yield self.ordered[low.bit_length() - 1]
+
+    def __len__(self) -> int:
+        return len(self.ordered)
+
+    def get_stats(self) -> Dict:
+        return {
+            'active': len(self.ordered),
+            'lookups': self.lookups,
+            'avg_eligible': round(self.visited / self.lookups, 2) if self.lookups else 0.0,
+        }
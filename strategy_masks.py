@@ -0,0 +1,253 @@
+"""
+Strategy Masks - Custom strategy conditions over whole indicator series
+Entry mask, confidence and action for every bar at once, with the builders' live semantics
+
+indicators maps an indicator name to a series (list / array, one value per
+bar) or to a scalar that holds for every bar. Bar i gets the same answer
+the builder would give for {name: series[i]}:
+
+    - None values skip the condition (it counts as not met)
+    - numeric operators compare float() of both sides; values float()
+      rejects never match
+    - text operators compare str().lower() of both sides
+    - a string threshold naming another indicator compares bar by bar
+      against that series
+
+Each distinct atom of a strategy's AtomTable is evaluated once into a
+boolean array; groups and entry conditions combine those arrays.
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from strategy_compiler import Atom, AtomTable, CompiledStrategy
+from strategy_index import hour_allowed
+
+_NUMERIC = {
+    '>': np.greater,
+    '<': np.less,
+    '>=': np.greater_equal,
+    '<=': np.less_equal,
+}
+
+
+def series_length(indicators: Dict[str, Any]) -> int:
+    """Bars covered by the indicator series (scalars don't count)"""
+    lengths = [len(values) for values in indicators.values()
+               if not isinstance(values, (str, bytes)) and hasattr(values, '__len__')]
+    return max(lengths) if lengths else 1
+
+
+def column(values, n: int) -> np.ndarray:
+    """One value per bar: series as an array, scalars repeated"""
+    if isinstance(values, (str, bytes)) or not hasattr(values, '__len__'):
+        out = np.empty(n, dtype=object)
+        out[:] = [values] * n
+        return out
+    return np.asarray(values)
+
+
+def _present(values: np.ndarray) -> np.ndarray:
+    if values.dtype == object:
+        return np.fromiter((value is not None for value in values), dtype=bool, count=len(values))
+    return np.ones(len(values), dtype=bool)
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except Exception:
+        return np.nan
+
+
+def _as_float(values: np.ndarray) -> np.ndarray:
+    """float() per bar, NaN where it fails (NaN never compares true)"""
+    if values.dtype.kind in 'fiub':
+        return values.astype(np.float64)
+    if values.dtype.kind == 'U':
+        try:
+            return values.astype(np.float64)
+        except ValueError:
+            pass
+    return np.fromiter((_to_float(value) for value in values), dtype=np.float64, count=len(values))
+
+
+def _as_text(values: np.ndarray) -> np.ndarray:
+    """str().lower() per bar"""
+    if values.dtype.kind == 'U':
+        return np.char.lower(values)
+    if values.dtype.kind in 'fiub':
+        return np.char.lower(values.astype(str))
+    return np.array([str(value).lower() for value in values], dtype=str)
+
+
+def atom_mask(atom: Atom, indicators: Dict[str, Any], n: int) -> np.ndarray:
+    """Bars where the atom is met"""
+    values = indicators.get(atom.indicator)
+    if values is None or not atom.known:
+        return np.zeros(n, dtype=bool)
+
+    values = column(values, n)
+    threshold = atom.threshold
+    reference = isinstance(threshold, str) and threshold in indicators
+    if reference:
+        threshold = column(indicators[threshold], n)
+
+    if atom.operator in _NUMERIC:
+        if reference:
+            limit = _as_float(threshold)
+        else:
+            limit = _to_float(threshold)  # NaN if float() rejects it - then nothing matches
+        met = _NUMERIC[atom.operator](_as_float(values), limit)
+    else:
+        text = _as_text(values)
+        expected = _as_text(threshold) if reference else str(threshold).lower()
+        if atom.operator == '!=':
+            met = text != expected
+        elif atom.operator == 'contains':
+            met = np.char.find(text, expected) >= 0
+        else:  # '==' / 'is_pattern'
+            met = text == expected
+
+    return _present(values) & np.asarray(met, dtype=bool)
+
+
+class AtomMasks:
+    """Lazily evaluated atom masks of one AtomTable over one indicators dict"""
+
+    def __init__(self, table: AtomTable, indicators: Dict[str, Any], n: Optional[int] = None):
+        self.table = table
+        self.indicators = indicators
+        self.n = series_length(indicators) if n is None else n
+        self._masks: Dict[int, np.ndarray] = {}
+
+    def __getitem__(self, atom: int) -> np.ndarray:
+        mask = self._masks.get(atom)
+        if mask is None:
+            mask = self._masks[atom] = atom_mask(self.table.atoms[atom], self.indicators, self.n)
+        return mask
+
+    def all_met(self, conditions) -> np.ndarray:
+        """Bars where every condition is met (True everywhere for no conditions)"""
+        mask = np.ones(self.n, dtype=bool)
+        for condition in conditions:
+            mask &= self[condition.atom]
+        return mask
+
+    def any_met(self, conditions) -> np.ndarray:
+        mask = np.zeros(self.n, dtype=bool)
+        for condition in conditions:
+            mask |= self[condition.atom]
+        return mask
+
+
+def filter_mask(allowed, values, n: int) -> np.ndarray:
+    """allowed(value) per bar for a series or scalar, evaluated once per distinct value"""
+    values = column(values, n)
+    results = {}
+    out = np.empty(n, dtype=bool)
+    for i, value in enumerate(values.tolist()):
+        result = results.get(value)
+        if result is None:
+            result = results[value] = bool(allowed(value))
+        out[i] = result
+    return out
+
+
+def regime_mask(strategy: Dict, regime, n: int) -> np.ndarray:
+    """regime_filter per bar (no regime series = filter not applied)"""
+    if regime is None or not strategy.get('regime_filter'):
+        return np.ones(n, dtype=bool)
+    return filter_mask(lambda value: value in strategy['regime_filter'], regime, n)
+
+
+def alignment_mask(strategy: Dict, mtf_aligned, n: int) -> np.ndarray:
+    """timeframe_alignment per bar (no alignment series = filter not applied)"""
+    if mtf_aligned is None or not strategy.get('timeframe_alignment', False):
+        return np.ones(n, dtype=bool)
+    return filter_mask(bool, mtf_aligned, n)
+
+
+def empty_result(n: int) -> Dict[str, np.ndarray]:
+    return {
+        'entry': np.zeros(n, dtype=bool),
+        'confidence': np.zeros(n, dtype=np.float64),
+        'action': np.full(n, None, dtype=object),
+    }
+
+
+def majority_action(conditions) -> Optional[str]:
+    """Most common condition action - the builders' tie-break, since all conditions are met"""
+    actions = [condition.action for condition in conditions]
+    return max(set(actions), key=actions.count) if actions else None
+
+
+
+def strategy_series(strategy: Dict, compiled: CompiledStrategy, indicators: Dict[str, Any],
+                    n: Optional[int] = None, regime=None, mtf_aligned=None, hours=None) -> Dict[str, np.ndarray]:
+    """
+    AdvancedStrategyBuilder._evaluate_strategy_conditions for every bar at once
+
+    regime, mtf_aligned: per-bar series or scalars (None = filter not applied)
+    hours: per-bar hour series for the time filter (None = not applied)
+
+    Returns:
+        {'entry': bool array, 'confidence': float array, 'action': object array}
+    """
+    n = series_length(indicators) if n is None else n
+    result = empty_result(n)
+
+    masks = AtomMasks(compiled.table, indicators, n)
+    eligible = regime_mask(strategy, regime, n) & alignment_mask(strategy, mtf_aligned, n)
+    if hours is not None:
+        eligible &= filter_mask(lambda hour: hour_allowed(strategy, hour), hours, n)
+
+    # Old-style entry_conditions: all met, 100% confidence
+    if not compiled.condition_groups:
+        if not compiled.entry_conditions:
+            return result
+        entry = eligible & masks.all_met(compiled.entry_conditions)
+        result['entry'] = entry
+        result['confidence'][entry] = 100.0
+        result['action'][entry] = majority_action(compiled.entry_conditions)
+        return result
+
+    # Condition groups: average confidence of the groups that pass
+    weighted = strategy.get('signal_strength', {}).get('condition_weights', False)
+    confidence_sum = np.zeros(n)
+    groups_passed = np.zeros(n, dtype=np.int64)
+    for group in compiled.condition_groups:
+        if group.logic == 'AND':
+            passes = masks.all_met(group.conditions)
+        else:  # OR
+            passes = masks.any_met(group.conditions)
+
+        if weighted:
+            met_weight = np.zeros(n)
+            for condition in group.conditions:
+                met_weight += np.where(masks[condition.atom], condition.weight, 0.0)
+            group_confidence = met_weight / group.total_weight * 100 if group.total_weight > 0 else np.zeros(n)
+        else:
+            met_conditions = np.zeros(n, dtype=np.int64)
+            for condition in group.conditions:
+                met_conditions += masks[condition.atom]
+            group_confidence = met_conditions / len(group.conditions) * 100 if group.conditions else np.zeros(n)
+
+        confidence_sum += np.where(passes, group_confidence, 0.0)
+        groups_passed += passes
+
+    overall_confidence = confidence_sum / np.maximum(groups_passed, 1)
+    min_conf = strategy.get('signal_strength', {}).get('min_confidence', 70)
+    entry = eligible & (groups_passed > 0) & (overall_confidence >= min_conf)
+
+    result['entry'] = entry
+    result['confidence'][entry] = overall_confidence[entry]
+    result['action'][entry] = strategy_action(strategy)
+    return result
+
+
+def strategy_action(strategy: Dict) -> str:
+    """A condition-group strategy's action ('auto' is not implemented and means 'call')"""
+    action = strategy.get('action', 'auto')
+    return 'call' if action == 'auto' else action
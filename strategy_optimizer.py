@@ -0,0 +1,346 @@
+"""
+Strategy Optimizer - Grid search over a custom strategy's thresholds and indicator periods
+Every combination is backtested on the historical dataset, ranked by a metric, and the best can be saved
+
+ranges name what to vary (values as a list, {'start', 'stop', 'step'} or
+'start:stop:step' / 'a,b,c' strings; stop is inclusive):
+
+    'rsi': '60:80:2'              threshold of every condition on rsi (entry_conditions
+                                  and condition_groups)
+    'entry_conditions.4': [15, 20, 25, 30]
+                                  threshold of one entry condition, by position
+    'condition_groups.0.2': [55, 60]
+                                  threshold of condition 2 of group 0
+    'rsi_period', 'fast_period', 'slow_period', 'adx_period'
+                                  indicator periods (backtesting_engine.INDICATOR_PARAMS),
+                                  fast/slow combinations with fast >= slow are skipped
+
+Combinations are grouped by their indicator periods and handed to worker
+processes in chunks. Each worker keeps every target's candles and an
+{(indicator, period): series} memo, so a series is computed once per
+distinct period per worker and shared by all combinations that only vary
+thresholds (and by other period sets using the same period).
+
+Strategies must only read indicators the backtest computes
+(backtesting_engine.INDICATORS) - anything else could never trade, so the
+grid refuses them. Only thresholds are saved: backtests honour optimised
+indicator periods, but the live bot keeps using the global fast_ema /
+slow_ema / rsi_period / adx_period settings, so a best combination with
+other periods is not saved. Neither is one below min_trades.
+
+CLI:
+    python strategy_optimizer.py --strategy zero_lag_trend___bullish_call \\
+        --range rsi=30:50:2 --range adx=15:30:5 --range fast_period=5,9 --range slow_period=13,21
+"""
+
+import copy
+import itertools
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from backtest_runner import (Target, load_strategy, load_target, merge_results, process_pool, resolve_targets,
+                             run_target, target_error, worker_count)
+from backtesting_engine import INDICATOR_PARAMS, get_backtest_engine, unknown_indicators
+from indicator_graph import strategy_conditions
+
+# Metric -> True if higher is better
+METRICS = {
+    'profit_factor': True,
+    'total_profit': True,
+    'profit_percent': True,
+    'win_rate': True,
+    'total_trades': True,
+    'max_drawdown': False,
+}
+
+CONDITION_PREFIX = 'entry_conditions.'
+GROUP_PREFIX = 'condition_groups.'
+
+# Worker side: per-target candles and indicator memos, kept across tasks
+_CANDLES: Dict[str, object] = {}
+_MEMOS: Dict[str, Dict] = {}
+
+
+def expand_range(spec) -> List:
+    """Values of one range spec (list, {'start', 'stop', 'step'}, 'start:stop:step' or 'a,b,c')"""
+    if isinstance(spec, str):
+        if ':' in spec:
+            spec = dict(zip(('start', 'stop', 'step'), (_number(part) for part in spec.split(':'))))
+        else:
+            return [_number(part) for part in spec.split(',') if part.strip()]
+    if isinstance(spec, dict):
+        start, stop, step = spec['start'], spec['stop'], spec.get('step', 1)
+        if step <= 0:
+            raise ValueError(f"Range step must be positive: {spec}")
+        count = int(round((stop - start) / step)) + 1
+        return [round(start + i * step, 10) for i in range(max(0, count))]
+    if isinstance(spec, (list, tuple)):
+        return list(spec)
+    return [spec]
+
+
+def _number(text: str):
+    value = float(text)
+    return int(value) if value.is_integer() and '.' not in text else value
+
+
+def _conditions(strategy: Dict, key: str) -> List[Dict]:
+    """Conditions of the strategy a threshold key refers to"""
+    if key.startswith(CONDITION_PREFIX):
+        conditions = strategy.get('entry_conditions') or []
+        index = int(key[len(CONDITION_PREFIX):])
+        if not 0 <= index < len(conditions):
+            raise ValueError(f"Strategy has no entry condition #{index}")
+        return [conditions[index]]
+
+    if key.startswith(GROUP_PREFIX):
+        groups = strategy.get('condition_groups') or []
+        group, _, index = key[len(GROUP_PREFIX):].partition('.')
+        group, index = int(group), int(index)
+        conditions = (groups[group].get('conditions') or []) if 0 <= group < len(groups) else []
+        if not 0 <= index < len(conditions):
+            raise ValueError(f"Strategy has no condition #{index} in condition group #{group}")
+        return [conditions[index]]
+
+    conditions = [condition for condition in strategy_conditions(strategy) if condition.get('indicator') == key]
+    if not conditions:
+        raise ValueError(f"Strategy has no condition on '{key}'")
+    return conditions
+
+
+def apply_params(strategy: Dict, params: Dict) -> Dict:
+    """Copy of the strategy with thresholds / indicator periods set"""
+    strategy = copy.deepcopy(strategy)
+    for key, value in params.items():
+        if key in INDICATOR_PARAMS:
+            strategy.setdefault('indicator_params', {})[key] = value
+        else:
+            for condition in _conditions(strategy, key):
+                condition['value'] = value
+    return strategy
+
+
+def build_grid(strategy: Dict, ranges: Dict) -> List[Tuple[Dict, List[Dict]]]:
+    """[(indicator periods, [threshold combinations])] - combinations grouped by their periods"""
+    unknown = unknown_indicators(strategy)
+    if unknown:
+        raise ValueError(f"The backtest does not compute {', '.join(map(str, unknown))} - "
+                         f"the strategy could never trade")
+
+    values = {key: expand_range(spec) for key, spec in ranges.items()}
+    for key in values:
+        if key not in INDICATOR_PARAMS:
+            _conditions(strategy, key)  # Fail early on unknown thresholds
+
+    period_keys = [key for key in values if key in INDICATOR_PARAMS]
+    threshold_keys = [key for key in values if key not in INDICATOR_PARAMS]
+    base = {**INDICATOR_PARAMS, **strategy.get('indicator_params', {})}
+
+    thresholds = [dict(zip(threshold_keys, combo)) for combo in itertools.product(*(values[k] for k in threshold_keys))]
+    grid = []
+    for combo in itertools.product(*(values[key] for key in period_keys)):
+        periods = dict(zip(period_keys, combo))
+        effective = {**base, **periods}
+        if effective['fast_period'] >= effective['slow_period']:
+            continue
+        grid.append((periods, thresholds))
+    return grid
+
+
+def evaluate(config: Dict, series: List[Tuple[Target, object, Dict]], options: Dict) -> Tuple[Dict, List]:
+    """
+    Backtest one configuration on (target, candles, indicator memo) series
+
+    Returns (portfolio summary, [(label, result)]).
+    """
+    results = []
+    for target, candles, memo in series:
+        try:
+            results.append((target[0], run_target(config, target, options, candles, memo)))
+        except Exception as e:
+            results.append((target[0], target_error(e)))
+    return merge_results(results, options.get('initial_balance', 100.0)), results
+
+
+def _evaluate_chunk(strategy: Dict, periods: Dict, thresholds: List[Dict],
+                    targets: List[Target], options: Dict) -> List[Tuple[Dict, Dict]]:
+    """Backtest each combination on every target (runs in a worker process)"""
+    for target in targets:
+        if target[0] not in _CANDLES:
+            _CANDLES[target[0]] = load_target(target, options)
+            _MEMOS[target[0]] = {}
+    series = [(target, _CANDLES[target[0]], _MEMOS[target[0]]) for target in targets]
+
+    evaluated = []
+    for combo in thresholds:
+        params = {**periods, **combo}
+        evaluated.append((params, evaluate(apply_params(strategy, params), series, options)[0]))
+    return evaluated
+
+
+def rank(evaluated: List[Tuple[Dict, Dict]], metric: str, min_trades: int) -> List[Tuple[Dict, Dict]]:
+    """Best first; combinations with fewer than min_trades trades rank last"""
+    higher_better = METRICS[metric]
+
+    def key(item):
+        summary = item[1]
+        value = summary[metric] if higher_better else -summary[metric]
+        return summary['total_trades'] >= min_trades, value
+
+    return sorted(evaluated, key=key, reverse=True)
+
+
+def optimize(strategy, ranges: Dict, assets='all', files: Optional[List[str]] = None,
+             timeframes: Optional[List[int]] = None, metric: str = 'profit_factor', min_trades: int = 10,
+             workers: int = 0, top: int = 20, start=None, end=None,
+             initial_balance: float = 100.0, payout_percent: float = 85.0,
+             min_data_quality: float = 0.8) -> Dict:
+    """
+    Grid search a strategy (config dict, or id / name / JSON file) over ranges
+
+    Returns the top combinations with their portfolio summaries; 'best' also
+    carries the per-asset breakdown.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}' (one of {', '.join(METRICS)})")
+
+    started = time.perf_counter()
+    strategy_config = load_strategy(strategy) if isinstance(strategy, str) else strategy
+    grid = build_grid(strategy_config, ranges)
+    combinations = sum(len(thresholds) for _, thresholds in grid)
+
+    targets = resolve_targets(assets, files, timeframes)
+    if not targets:
+        raise ValueError('No historical data for the requested assets/files')
+    options = {
+        'start': start, 'end': end, 'limit': None,
+        'initial_balance': initial_balance, 'payout_percent': payout_percent,
+        'min_data_quality': min_data_quality,
+    }
+    get_backtest_engine().dataset.load()  # Build the dataset cache before the workers map it
+
+    workers = worker_count(workers, combinations, combinations * len(targets))
+    if workers == 1:
+        evaluated = []
+        for periods, thresholds in grid:
+            evaluated.extend(_evaluate_chunk(strategy_config, periods, thresholds, targets, options))
+        _CANDLES.clear()
+        _MEMOS.clear()
+    else:
+        # A few chunks per worker keeps them busy; each chunk shares one period set
+        chunk_size = max(1, combinations // (workers * 4))
+        with process_pool(workers) as executor:
+            futures = [executor.submit(_evaluate_chunk, strategy_config, periods, thresholds[i:i + chunk_size],
+                                       targets, options)
+                       for periods, thresholds in grid for i in range(0, len(thresholds), chunk_size)]
+            evaluated = [item for future in futures for item in future.result()]
+
+    ranked = rank(evaluated, metric, min_trades)
+    # rank() puts combinations below min_trades last: if the best is one, none qualified
+    qualified = bool(ranked) and ranked[0][1]['total_trades'] >= min_trades
+    results = []
+    for place, (params, summary) in enumerate(ranked[:top]):
+        per_asset = summary.pop('per_asset')
+        result = {'params': params, **summary}
+        if place == 0:
+            result['per_asset'] = per_asset
+        results.append(result)
+
+    return {
+        'strategy': strategy_config.get('name', strategy if isinstance(strategy, str) else None),
+        'metric': metric,
+        'min_trades': min_trades,
+        'combinations': combinations,
+        'targets': len(targets),
+        'workers': workers,
+        'elapsed_sec': round(time.perf_counter() - started, 3),
+        'qualified': qualified,
+        'best': results[0] if results else None,
+        'results': results,
+    }
+
+
+def save_best(strategy_id: str, report: Dict, builder=None) -> Tuple[bool, str]:
+    """Write an optimize() report's best thresholds back through the StrategyBuilder (id or name)"""
+    best = report.get('best')
+    if not best:
+        return False, "No combination to save"
+    if not report.get('qualified'):
+        return False, (f"Best combination has {best['total_trades']} trades, "
+                       f"below min_trades {report['min_trades']} - not saved")
+
+    if builder is None:
+        from strategy_builder import get_builder
+        builder = get_builder()
+
+    if builder.get_strategy(strategy_id) is None:
+        strategy_id = next((sid for sid, strategy in builder.get_all_strategies().items()
+                            if strategy.get('name') == strategy_id), strategy_id)
+    strategy = builder.get_strategy(strategy_id)
+    if strategy is None:
+        return False, f"Strategy '{strategy_id}' not found"
+
+    # The live bot reads the global indicator settings, not indicator_params
+    current = {**INDICATOR_PARAMS, **strategy.get('indicator_params', {})}
+    periods = {key: value for key, value in best['params'].items() if key in INDICATOR_PARAMS and value != current[key]}
+    if periods:
+        changed = ', '.join(f"{key}={value}" for key, value in periods.items())
+        return False, f"Best combination changes indicator periods ({changed}), which the live bot ignores - not saved"
+
+    updated = apply_params(strategy, {key: value for key, value in best['params'].items()
+                                      if key not in INDICATOR_PARAMS})
+    updates = {key: updated[key] for key in ('entry_conditions', 'condition_groups') if key in updated}
+    return builder.update_strategy(strategy_id, updates)
+
+
+def parse_ranges(items: List[str]) -> Dict[str, str]:
+    """CLI 'KEY=SPEC' items -> ranges"""
+    ranges = {}
+    for item in items:
+        key, _, spec = item.partition('=')
+        ranges[key.strip()] = spec.strip()
+    return ranges
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Grid-search a custom strategy on the historical dataset')
+    parser.add_argument('--strategy', required=True, help='Strategy id / name in custom_strategies.json, or JSON file')
+    parser.add_argument('--range', action='append', default=[], metavar='KEY=SPEC',
+                        help="e.g. rsi=60:80:2, entry_conditions.4=15,20,25, condition_groups.0.2=55,60, fast_period=5,9")
+    parser.add_argument('--metric', default='profit_factor', choices=sorted(METRICS))
+    parser.add_argument('--min-trades', type=int, default=10, help='Rank combinations with fewer trades last')
+    parser.add_argument('--assets', default='all', help="Comma-separated assets, or 'all'")
+    parser.add_argument('--files', nargs='*', default=[], help='CSV files instead of dataset assets')
+    parser.add_argument('--timeframe', type=int, action='append', help='60 and/or 300 (default: all)')
+    parser.add_argument('--workers', type=int, default=0, help='Processes (0 = one per CPU core)')
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--save', action='store_true', help='Save the best combination to the strategy')
+    args = parser.parse_args(argv)
+
+    ranges = parse_ranges(args.range)
+    if not ranges:
+        parser.error('at least one --range is required')
+
+    report = optimize(args.strategy, ranges, assets=None if args.files else args.assets, files=args.files,
+                      timeframes=args.timeframe, metric=args.metric, min_trades=args.min_trades,
+                      workers=args.workers, top=args.top)
+
+    print(f"\n🔬 {report['strategy']}: {report['combinations']} combinations x {report['targets']} series, "
+          f"{report['workers']} workers, {report['elapsed_sec']}s (ranked by {report['metric']})")
+    for place, result in enumerate(report['results'], 1):
+        print(f"   {place:>2}. {result['params']} -> trades {result['total_trades']}, win {result['win_rate']}%, "
+              f"PF {result['profit_factor']}, profit {result['total_profit']}, DD {result['max_drawdown']}%")
+
+    if not report['qualified']:
+        print(f"\n⚠️ No combination reached {report['min_trades']} trades")
+
+    if args.save:
+        success, message = save_best(args.strategy, report)
+        print(f"\n{'✅' if success else '❌'} {message}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
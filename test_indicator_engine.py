@@ -0,0 +1,89 @@
+"""
+Check the incremental indicator engine against main.py's scalar indicators
+A bundled data_1m session is fed tick by tick into a small CandleBuffer that wraps;
+after every tick the IndicatorRegistry snapshot must equal calculate_* over buffer.view()
+
+Run: python test_indicator_engine.py (or with pytest)
+"""
+
+import asyncio
+import contextlib
+import csv
+import io
+import math
+
+from candle_store import CandleBuffer
+from indicator_engine import IndicatorRegistry
+
+with contextlib.redirect_stdout(io.StringIO()):  # main.py prints its startup banner
+    import main
+
+SESSION = 'data_1m/EURUSD_2024_2_5_11.csv'
+PARAMS = (9, 21, 14, 14)  # fast EMA, slow EMA, RSI, ADX
+
+
+def _rows(path: str = SESSION) -> list:
+    with open(path) as f:
+        return [[float(value) for value in row[1:6]] for row in list(csv.reader(f))[1:]]
+
+
+def _same(value, expected) -> bool:
+    if isinstance(expected, (tuple, list)):
+        return len(value) == len(expected) and all(_same(v, e) for v, e in zip(value, expected))
+    if value is None or expected is None or isinstance(expected, str):
+        return value == expected
+    return math.isclose(value, expected, rel_tol=1e-9, abs_tol=1e-9)
+
+
+async def _expected(candles) -> dict:
+    fast, slow, rsi_period, adx_period = PARAMS
+    return {
+        'ema_fast': await main.calculate_ema(candles, fast),
+        'ema_slow': await main.calculate_ema(candles, slow),
+        'ema_fast_prev': await main.calculate_ema(candles[:-1], fast),
+        'ema_slow_prev': await main.calculate_ema(candles[:-1], slow),
+        'rsi': await main.calculate_rsi(candles, rsi_period),
+        'atr': await main.calculate_atr(candles),
+        'macd': await main.calculate_macd(candles),
+        'stochastic': await main.calculate_stochastic(candles),
+        'supertrend': await main.calculate_supertrend(candles),
+        'adx': await main.calculate_adx(candles, adx_period),
+    }
+
+
+async def _replay(capacity: int) -> int:
+    registry = IndicatorRegistry()
+    buffer = CandleBuffer(capacity)
+    checks = 0
+
+    for tstamp, open_price, close, high, low in _rows():
+        buffer.append(tstamp, open_price, open_price, open_price, open_price)
+        for price in (high, low, close):  # Ticks forming the candle
+            buffer.update_last(price)
+            snapshot = registry.update('EURUSD', 60, buffer, *PARAMS)
+            for name, expected in (await _expected(buffer.view())).items():
+                assert _same(snapshot[name], expected), (capacity, len(buffer), name, snapshot[name], expected)
+                checks += 1
+    return checks
+
+
+def check_wrapped_buffer(capacity: int = 60):
+    assert len(_rows()) > 2 * capacity  # The ring buffer must wrap
+    return asyncio.run(_replay(capacity))
+
+
+def check_unwrapped_buffer(capacity: int = 1000):
+    return asyncio.run(_replay(capacity))
+
+
+def test_engine_matches_scalar_indicators_on_wrapped_buffer():
+    check_wrapped_buffer()
+
+
+def test_engine_matches_scalar_indicators():
+    check_unwrapped_buffer()
+
+
+if __name__ == '__main__':
+    print(f"✅ wrapped buffer: {check_wrapped_buffer()} values match main.py")
+    print(f"✅ unwrapped buffer: {check_unwrapped_buffer()} values match main.py")
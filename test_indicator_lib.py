@@ -0,0 +1,234 @@
+"""
+Check the vectorised indicator library against the loops it replaced
+main.py's calculate_* wrappers (last value of an indicator_lib series) must return what the
+original per-candle loops returned, and the backtest's precomputed indicator columns must
+equal the original _calculate_simple_indicators over each bar's 50-candle window
+
+Run: python test_indicator_lib.py (or with pytest)
+"""
+
+import asyncio
+import contextlib
+import csv
+import io
+import math
+
+import numpy as np
+
+import indicator_lib
+from backtesting_engine import BacktestEngine
+
+with contextlib.redirect_stdout(io.StringIO()):  # main.py prints its startup banner
+    import main
+
+SESSIONS = ['data_1m/EURUSD_2024_2_5_11.csv', 'data_5m/GBPUSD_2024_2_6_6.csv']
+WARMUP = 50  # Smallest window the bot analyses / the backtest's first bar
+
+
+def _candles(path: str) -> np.ndarray:
+    with open(path) as f:
+        return np.array([[float(value) for value in row[1:6]] for row in list(csv.reader(f))[1:]])
+
+
+def _same(value, expected) -> bool:
+    if isinstance(expected, (tuple, list)):
+        return len(value) == len(expected) and all(_same(v, e) for v, e in zip(value, expected))
+    if value is None or expected is None or isinstance(expected, str):
+        return value == expected
+    return math.isclose(value, expected, rel_tol=1e-9, abs_tol=1e-9)
+
+
+# Original loops (before indicator_lib), kept verbatim in behaviour
+
+def _ema(candles, period):
+    if len(candles) < period:
+        return None
+    closes = candles[:, 2]
+    multiplier = 2 / (period + 1)
+    ema = float(closes[:period].mean())
+    for price in closes[period:].tolist():
+        ema = (price - ema) * multiplier + ema
+    return ema
+
+
+def _macd(candles, fast_period=12, slow_period=26, signal_period=9):
+    if len(candles) < slow_period + signal_period:
+        return None, None, None
+    macd_line = _ema(candles, fast_period) - _ema(candles, slow_period)
+    macd_values = []
+    for i in range(max(signal_period, 1)):
+        if len(candles) > slow_period + i:
+            window = candles[:-i] if i > 0 else candles
+            ema_f, ema_s = _ema(window, fast_period), _ema(window, slow_period)
+            if ema_f and ema_s:
+                macd_values.append(ema_f - ema_s)
+    signal_line = sum(macd_values) / len(macd_values) if macd_values else macd_line
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def _stochastic(candles, k_period=14, d_period=3):
+    if len(candles) < k_period:
+        return None, None
+    recent = candles[-k_period:]
+    highest_high, lowest_low = float(recent[:, 3].max()), float(recent[:, 4].min())
+    if highest_high == lowest_low:
+        k_value = 50
+    else:
+        k_value = ((float(candles[-1][2]) - lowest_low) / (highest_high - lowest_low)) * 100
+    k_values = []
+    for i in range(d_period):
+        if len(candles) > k_period + i:
+            recent_k = candles[-(k_period + i):-i] if i > 0 else candles[-k_period:]
+            high_k, low_k = float(recent_k[:, 3].max()), float(recent_k[:, 4].min())
+            if high_k != low_k:
+                k_values.append(((float(candles[-(i + 1)][2]) - low_k) / (high_k - low_k)) * 100)
+    return k_value, sum(k_values) / len(k_values) if k_values else k_value
+
+
+def _heikin_ashi(candles):
+    first = candles[0]
+    ha_open = (first[1] + first[2]) / 2
+    ha_close = (first[1] + first[3] + first[4] + first[2]) / 4
+    ha_candles = [[ha_open, ha_close, max(first[3], ha_open, ha_close), min(first[4], ha_open, ha_close)]]
+    for candle in candles[1:]:
+        ha_open = (ha_candles[-1][0] + ha_candles[-1][1]) / 2
+        ha_close = (candle[1] + candle[3] + candle[4] + candle[2]) / 4
+        ha_candles.append([ha_open, ha_close, max(candle[3], ha_open, ha_close), min(candle[4], ha_open, ha_close)])
+    return ha_candles
+
+
+def _adx(candles, period=14):
+    tr_list, plus_dm_list, minus_dm_list = [], [], []
+    for i in range(1, len(candles)):
+        prev, curr = candles[i - 1], candles[i]
+        tr_list.append(max(curr[3] - curr[4], abs(curr[3] - prev[2]), abs(curr[4] - prev[2])))
+        high_diff, low_diff = curr[3] - prev[3], prev[4] - curr[4]
+        plus_dm_list.append(high_diff if high_diff > low_diff and high_diff > 0 else 0)
+        minus_dm_list.append(low_diff if low_diff > high_diff and low_diff > 0 else 0)
+
+    def wilders_smoothing(values):
+        smoothed = [sum(values[:period]) / period]
+        for value in values[period:]:
+            smoothed.append((smoothed[-1] * (period - 1) + value) / period)
+        return smoothed
+
+    smoothed_tr = wilders_smoothing(tr_list)
+    smoothed_plus = wilders_smoothing(plus_dm_list)
+    smoothed_minus = wilders_smoothing(minus_dm_list)
+    plus_di = [100 * p / t if t != 0 else 0 for p, t in zip(smoothed_plus, smoothed_tr)]
+    minus_di = [100 * m / t if t != 0 else 0 for m, t in zip(smoothed_minus, smoothed_tr)]
+    dx = [100 * abs(p - m) / (p + m) if p + m != 0 else 0 for p, m in zip(plus_di, minus_di)]
+
+    (prev_plus, plus), (prev_minus, minus) = plus_di[-2:], minus_di[-2:]
+    if prev_plus <= prev_minus and plus > minus:
+        cross = 'bullish_cross'
+    elif prev_minus <= prev_plus and minus > plus:
+        cross = 'bearish_cross'
+    else:
+        cross = 'bullish' if plus > minus else 'bearish' if minus > plus else 'neutral'
+    return round(wilders_smoothing(dx)[-1], 2), round(plus, 2), round(minus, 2), cross
+
+
+def _synthetic_volume(candles):
+    volumes = []
+    for i, candle in enumerate(candles):
+        price_range = candle[3] - candle[4] or 0.00001
+        body_ratio = abs(candle[2] - candle[1]) / price_range
+        if i >= 14:
+            avg_range = sum(c[3] - c[4] for c in candles[i - 14:i]) / 14
+            volatility_factor = price_range / avg_range if avg_range > 0 else 1.0
+        else:
+            volatility_factor = 1.0
+        volumes.append(price_range * (1 + body_ratio) * volatility_factor)
+    avg_vol = sum(volumes) / len(volumes)
+    return [v / avg_vol for v in volumes] if avg_vol > 0 else volumes
+
+
+def _vwap(candles, volumes):
+    typical = [(c[3] + c[4] + c[2]) / 3 for c in candles]
+    volume_sum = sum(volumes)
+    vwap = sum(t * v for t, v in zip(typical, volumes)) / volume_sum
+    std_dev = (sum((t - vwap) ** 2 * v for t, v in zip(typical, volumes)) / volume_sum) ** 0.5
+    return vwap, std_dev
+
+
+def _simple_indicators(candles):
+    """The backtest's original per-window indicators"""
+    closes = [c[2] for c in candles]
+    current_price = closes[-1]
+
+    changes = np.diff(closes)
+    gains, losses = np.where(changes > 0, changes, 0), np.where(changes > 0, 0, -changes)
+    avg_gain, avg_loss = sum(gains[-14:]) / 14, sum(losses[-14:]) / 14
+    rsi = 100.0 if avg_loss == 0 else 100 - (100 / (1 + avg_gain / avg_loss))
+
+    sma_fast = sum(closes[-10:]) / 10
+    sma_slow = sum(closes[-20:]) / 20
+    macd_line = sum(closes[-12:]) / 12 - sum(closes[-26:]) / 26
+    std_dev = (sum((c - sma_slow) ** 2 for c in closes[-20:]) / 20) ** 0.5
+    upper_bb, lower_bb = sma_slow + 2 * std_dev, sma_slow - 2 * std_dev
+    return {
+        'rsi': rsi, 'price': current_price, 'sma_fast': sma_fast, 'sma_slow': sma_slow,
+        'ema_cross': 'Bullish' if sma_fast > sma_slow else 'Bearish',
+        'macd_line': macd_line, 'macd_histogram': macd_line,
+        'upper_bb': upper_bb, 'lower_bb': lower_bb, 'middle_bb': sma_slow,
+        'bollinger_position': 'Above' if current_price > upper_bb else 'Below' if current_price < lower_bb else 'Middle',
+    }
+
+
+async def _wrapper_checks(candles: np.ndarray) -> int:
+    checks = 0
+    for n in range(WARMUP, len(candles) + 1):
+        window = candles[:n]
+        volumes = await main.calculate_synthetic_volume(window)
+        vwap = await main.calculate_vwap(window, volumes)
+        expected_volumes = _synthetic_volume(window)
+        period = min(100, n)
+        expected_vwap = _vwap(window[-period:], expected_volumes[-period:])
+
+        pairs = [
+            (await main.calculate_ema(window, 9), _ema(window, 9)),
+            (await main.calculate_ema(window, 21), _ema(window, 21)),
+            (await main.calculate_macd(window), _macd(window)),
+            (await main.calculate_stochastic(window), _stochastic(window)),
+            (await main.calculate_adx(window), _adx(window)),
+            (volumes, expected_volumes),
+            (vwap, main.vwap_bands(float(window[-1][2]), *expected_vwap)),
+            (np.column_stack(indicator_lib.heikin_ashi(window[:, 1], window[:, 3], window[:, 4], window[:, 2])
+                             )[-6:].tolist(), _heikin_ashi(window)[-6:]),  # The candles calculate_heikin_ashi reads
+        ]
+        for value, expected in pairs:
+            assert _same(value, expected), (n, value, expected)
+            checks += 1
+    return checks
+
+
+def check_main_wrappers():
+    return sum(asyncio.run(_wrapper_checks(_candles(path))) for path in SESSIONS)
+
+
+def check_backtest_columns():
+    engine = BacktestEngine()
+    checks = 0
+    for path in SESSIONS:
+        candles = _candles(path)
+        columns = engine._indicator_columns(engine._calculate_indicator_series(candles, with_adx=False))
+        for i in range(WARMUP - 1, len(candles)):
+            for name, expected in _simple_indicators(candles[i - WARMUP + 1:i + 1]).items():
+                value = columns[name][i]
+                assert _same(value if isinstance(value, str) else float(value), expected), (path, i, name)
+                checks += 1
+    return checks
+
+
+def test_main_wrappers_match_original_loops():
+    check_main_wrappers()
+
+
+def test_backtest_columns_match_window_indicators():
+    check_backtest_columns()
+
+
+if __name__ == '__main__':
+    print(f"✅ main.py wrappers: {check_main_wrappers()} values match the original loops")
+    print(f"✅ backtest columns: {check_backtest_columns()} values match the 50-candle window")
@@ -0,0 +1,149 @@
+"""
+Check the backtest's whole-series strategy evaluation against the live builder
+strategy_masks.strategy_series / BacktestEngine._entry_signals must give every bar the
+same answer as AdvancedStrategyBuilder._evaluate_strategy_conditions on that bar's values
+
+Run: python test_strategy_series.py (or with pytest)
+"""
+
+import random
+
+import numpy as np
+
+from backtesting_engine import BacktestEngine
+from strategy_builder_advanced import AdvancedStrategyBuilder
+from strategy_compiler import ADVANCED_OPERATORS, AtomTable, CompiledStrategy
+from strategy_masks import strategy_series
+
+BARS = 600
+REGIMES = ['trending_up', 'trending_down', 'ranging']
+
+NUMERIC = {
+    'rsi': (20, 80),
+    'macd_histogram': (-0.002, 0.002),
+    'adx': (15, 40),
+    'plus_di': (15, 40),
+}
+TEXT = {
+    'ema_cross': ['Bullish', 'Bearish'],
+    'bollinger_position': ['Above', 'Below', 'Middle'],
+    'di_cross': ['bullish', 'bearish', 'neutral'],
+}
+
+
+def _candles(seed: int = 7) -> np.ndarray:
+    """Random-walk [timestamp, open, close, high, low] candles"""
+    rng = np.random.default_rng(seed)
+    closes = 1.1 + np.cumsum(rng.normal(0, 0.0005, BARS))
+    opens = np.concatenate(([closes[0]], closes[:-1]))
+    spread = np.abs(rng.normal(0, 0.0003, BARS))
+    timestamps = 1700000000 + 60 * np.arange(BARS)
+    return np.column_stack((timestamps, opens, closes,
+                            np.maximum(opens, closes) + spread, np.minimum(opens, closes) - spread))
+
+
+def _columns(engine: BacktestEngine, candles: np.ndarray) -> dict:
+    series = engine._calculate_indicator_series(candles, with_adx=True)
+    return engine._indicator_columns(series)
+
+
+def _condition(rnd: random.Random) -> dict:
+    if rnd.random() < 0.6:
+        indicator = rnd.choice(list(NUMERIC))
+        low, high = NUMERIC[indicator]
+        condition = {'indicator': indicator, 'operator': rnd.choice(['>', '<', '>=', '<=']),
+                     'value': round(rnd.uniform(low, high), 4)}
+    elif rnd.random() < 0.8:
+        indicator = rnd.choice(list(TEXT))
+        condition = {'indicator': indicator, 'operator': rnd.choice(['==', '!=', 'contains']),
+                     'value': rnd.choice(TEXT[indicator])}
+    else:
+        condition = {'indicator': 'price', 'operator': rnd.choice(['>', '<']), 'value': 'sma_fast'}
+    condition['weight'] = rnd.choice([0.5, 1.0, 1.5, 2.0])
+    condition['action'] = rnd.choice(['call', 'put'])
+    return condition
+
+
+def _strategy(rnd: random.Random) -> dict:
+    if rnd.random() < 0.2:
+        return {'entry_conditions': [_condition(rnd) for _ in range(rnd.randint(1, 3))], 'active': True}
+    return {
+        'condition_groups': [{'logic': rnd.choice(['AND', 'OR']),
+                              'conditions': [_condition(rnd) for _ in range(rnd.randint(1, 4))]}
+                             for _ in range(rnd.randint(1, 3))],
+        'action': rnd.choice(['call', 'put', 'auto']),
+        'signal_strength': {'min_confidence': rnd.choice([0, 50, 70, 100]),
+                            'condition_weights': rnd.random() < 0.5},
+        'regime_filter': rnd.choice([[], ['trending_up', 'ranging']]),
+        'timeframe_alignment': rnd.random() < 0.3,
+        'active': True,
+    }
+
+
+def _bar(columns: dict, i: int) -> dict:
+    return {name: values[i].item() for name, values in columns.items()}
+
+
+def check_strategy_series(strategies: int = 60, seed: int = 3):
+    builder = AdvancedStrategyBuilder.__new__(AdvancedStrategyBuilder)  # No strategies file needed
+    engine = BacktestEngine()
+    columns = _columns(engine, _candles())
+    rnd = random.Random(seed)
+    regime = np.array([rnd.choice(REGIMES) for _ in range(BARS)], dtype=object)
+    aligned = np.array([rnd.random() < 0.5 for _ in range(BARS)])
+    bars = [_bar(columns, i) for i in range(BARS)]
+
+    entries = 0
+    for _ in range(strategies):
+        strategy = _strategy(rnd)
+        compiled = CompiledStrategy(strategy, AtomTable(ADVANCED_OPERATORS))
+        result = strategy_series(strategy, compiled, columns, BARS, regime, aligned)
+
+        for i in range(BARS):
+            expected = builder._evaluate_strategy_conditions(strategy, bars[i], regime[i], bool(aligned[i]))
+            assert bool(result['entry'][i]) == expected['signal'], (strategy, i, expected)
+            if expected['signal']:
+                entries += 1
+                assert result['action'][i] == expected['action'], (strategy, i)
+                assert abs(result['confidence'][i] - expected['confidence']) < 1e-9, (strategy, i)
+    assert entries > 0
+    return entries
+
+
+def check_backtest_entries(strategies: int = 60, seed: int = 5):
+    builder = AdvancedStrategyBuilder.__new__(AdvancedStrategyBuilder)
+    engine = BacktestEngine()
+    columns = _columns(engine, _candles())
+    rnd = random.Random(seed)
+    bars = [_bar(columns, i) for i in range(BARS)]
+
+    entries = 0
+    for _ in range(strategies):
+        strategy = _strategy(rnd)
+        strategy.pop('regime_filter', None)  # No historical regime / alignment series
+        strategy.pop('timeframe_alignment', None)
+        if strategy.get('entry_conditions'):
+            continue  # Old-style conditions keep the backtest's narrower operator set
+
+        entry, action = engine._entry_signals(strategy, columns, BARS)
+        for i in range(BARS):
+            expected = builder._evaluate_strategy_conditions(strategy, bars[i], None, True)
+            assert bool(entry[i]) == expected['signal'], (strategy, i, expected)
+            if expected['signal']:
+                entries += 1
+                assert action == expected['action'], (strategy, i)
+    assert entries > 0
+    return entries
+
+
+def test_strategy_series_matches_builder():
+    check_strategy_series()
+
+
+def test_backtest_entries_match_builder():
+    check_backtest_entries()
+
+
+if __name__ == '__main__':
+    print(f"✅ strategy_series: {check_strategy_series()} entries match the builder")
+    print(f"✅ backtest entries: {check_backtest_entries()} entries match the builder")
@@ -0,0 +1,187 @@
+"""
+Tick Aggregator - Incremental multi-period candle building
+Rolls candles in O(1) per tick and derives higher periods from the base stream
+
+For every (asset, period) the aggregator caches the boundary at which the
+open candle closes. A tick below it only touches the forming candle; a tick
+at or past it closes that candle, opens the bucket the tick falls in and
+emits a 'candle_closed' event to subscribers. Periods skipped entirely are
+forward-filled or marked according to gap_policy.
+
+Higher periods (5m, 15m by default) are resampled from the base (smallest)
+period's history, so they are available without their own history frames.
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from candle_store import CandleStore, CandleBuffer, TS, OPEN, CLOSE, HIGH, LOW, FLAG_FILLED, FLAG_GAP_BEFORE
+
+DEFAULT_DERIVED_PERIODS = (300, 900)
+
+# Event types
+CANDLE_CLOSED = 'candle_closed'  # A candle finished - event['candle'] is [ts, open, close, high, low]
+HISTORY_LOADED = 'history_loaded'  # A buffer was (re)loaded from a history snapshot
+CACHE_GAP = 'cache_gap'  # Restored candles did not join up with the live stream and were dropped
+CANDLE_GAP = 'candle_gap'  # Periods with no ticks at all - event['missing'] is how many
+
+# What to do with periods that had no ticks
+GAP_FILL = 'ffill'  # Insert flat candles at the last close, flagged FLAG_FILLED
+GAP_MARK = 'mark'  # Leave the hole, flag the next real candle FLAG_GAP_BEFORE
+
+
+def resample(candles: np.ndarray, period: int) -> np.ndarray:
+    """
+    Aggregate (n, 5) candles into period buckets (floor(ts / period) * period)
+
+    Returns a new (m, 5) array: first open, last close, max high, min low.
+    """
+    if len(candles) == 0:
+        return np.empty((0, 5), dtype=np.float64)
+
+    ts = candles[:, TS]
+    buckets = ts - ts % period
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.concatenate((starts[1:], [len(candles)])) - 1
+
+    out = np.empty((len(starts), 5), dtype=np.float64)
+    out[:, TS] = buckets[starts]
+    out[:, OPEN] = candles[starts, OPEN]
+    out[:, CLOSE] = candles[ends, CLOSE]
+    out[:, HIGH] = np.maximum.reduceat(candles[:, HIGH], starts)
+    out[:, LOW] = np.minimum.reduceat(candles[:, LOW], starts)
+    return out
+
+
+class TickAggregator:
+    """
+    Route ticks into a CandleStore and publish candle events
+
+    Usage:
+        aggregator = TickAggregator(CANDLES)
+        aggregator.subscribe(lambda event: ...)
+        aggregator.on_history(asset, period)   # after loading a history snapshot
+        aggregator.on_tick(asset, tstamp, price)
+    """
+
+    def __init__(self, store: CandleStore, derived_periods: Iterable[int] = DEFAULT_DERIVED_PERIODS,
+                 gap_policy: str = GAP_FILL):
+        self.store = store
+        self.derived_periods = tuple(sorted(derived_periods))
+        self.gap_policy = gap_policy
+        self._boundaries: Dict[str, Dict[int, float]] = {}  # {asset: {period: next close ts}}
+        self._native: Dict[str, set] = {}  # {asset: periods fed by their own history frames}
+        self._subscribers: List[Callable[[Dict], None]] = []
+
+    # ==================== EVENTS ====================
+
+    def subscribe(self, callback: Callable[[Dict], None]):
+        """Call callback(event) for every candle event"""
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Dict], None]):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _emit(self, event_type: str, asset: str, period: int, candle: Optional[List[float]] = None, **extra):
+        event = {'type': event_type, 'asset': asset, 'period': period, 'candle': candle}
+        event.update(extra)
+        for callback in self._subscribers:
+            callback(event)
+
+    # ==================== INGESTION ====================
+
+    def reset(self):
+        """Forget cached boundaries (e.g. after the store was cleared)"""
+        self._boundaries.clear()
+        self._native.clear()
+
+    def on_history(self, asset: str, period: int):
+        """A history snapshot was loaded into store[asset][period]"""
+        self._native.setdefault(asset, set()).add(period)
+        boundaries = self._boundaries.setdefault(asset, {})
+        boundaries.pop(period, None)
+
+        self._emit(HISTORY_LOADED, asset, period)
+
+        # Re-derive higher periods from the base stream
+        if period == min(self._native[asset]):
+            self._derive(asset, period)
+
+    def _derive(self, asset: str, base_period: int):
+        base = self.store.buffer(asset, base_period)
+        if not len(base):
+            return
+
+        for period in self.derived_periods:
+            if period <= base_period or period % base_period or period in self._native[asset]:
+                continue
+            derived = self.store.buffer(asset, period)
+            derived.load(resample(base.view(), period))
+            derived.pending = False
+            self._boundaries[asset].pop(period, None)
+            self._emit(HISTORY_LOADED, asset, period)
+
+    def on_tick(self, asset: str, tstamp: float, price: float) -> bool:
+        """
+        Apply one tick to every period of the asset - O(1) per period
+
+        Returns True when any candle changed.
+        """
+        timeframes = self.store.get(asset)
+        if not timeframes:
+            return False
+
+        changed = False
+        boundaries = self._boundaries.setdefault(asset, {})
+        for period, candles in timeframes.items():
+            if candles.pending and not self._resume(asset, period, candles, tstamp):
+                continue
+            if not len(candles):
+                continue
+
+            boundary = boundaries.get(period)
+            if boundary is None:
+                boundary = boundaries[period] = candles.last_ts + period
+
+            if tstamp < boundary:
+                if tstamp >= boundary - period:
+                    candles.update_last(price)  # close/high/low
+                    changed = True
+                continue  # else: late tick for an already closed candle
+
+            # Period rolled over - close the forming candle and open the tick's bucket
+            closed = candles.view()[-1].tolist()
+            open_ts = tstamp - tstamp % period
+            flags = 0
+
+            missing = int((open_ts - boundary) // period)
+            if missing > 0:
+                if self.gap_policy == GAP_FILL:
+                    last_close = closed[CLOSE]
+                    # Only the newest `capacity` fills can survive anyway
+                    for slot in range(max(0, missing - candles.capacity), missing):
+                        candles.append(boundary + slot * period, last_close, last_close,
+                                       last_close, last_close, FLAG_FILLED)
+                else:
+                    flags = FLAG_GAP_BEFORE
+
+            candles.append(open_ts, price, price, price, price, flags)
+            boundaries[period] = open_ts + period
+            self._emit(CANDLE_CLOSED, asset, period, closed)
+            if missing > 0:
+                self._emit(CANDLE_GAP, asset, period, missing=missing)
+            changed = True
+
+        return changed
+
+    def _resume(self, asset: str, period: int, candles: CandleBuffer, tstamp: float) -> bool:
+        """First live tick for a warm-started buffer"""
+        candles.pending = False
+        self._boundaries[asset].pop(period, None)
+        if candles.resume(tstamp, period):
+            return True
+        self._emit(CACHE_GAP, asset, period)
+        return False
@@ -0,0 +1,330 @@
+"""
+Walk Forward - Rolling train/test analysis of a custom strategy on the historical dataset
+Parameters optimised on window k are traded out-of-sample on window k + 1; the test windows form one equity curve
+
+Every series is split into `windows` consecutive windows of equal bar
+count. Fold k grid-searches the strategy_optimizer ranges on window k of
+all series, picks the best combination by `metric`, and backtests it on
+window k + 1. Folds are independent jobs run in parallel. A fold where no
+combination reaches min_trades in-sample is reported unoptimised and does
+not trade its test window.
+
+Candles and indicator series are computed once, over the full length of
+every series, for each indicator period the grid uses. They are published
+in one shared memory block; workers map it read-only and slice the
+windows out of it, so no window recomputes an indicator. The indicators
+are causal, so a slice matches a series computed up to that bar. Each
+window also takes the WARMUP bars before it, which the backtest only
+reads as history.
+
+Position sizes are a share of the balance, so the test windows of a
+series are stitched by scaling each one to the balance the previous one
+ended with. The out-of-sample curve sums the stitched curves of all series,
+and every out-of-sample total (trades, profit factor, balance, drawdown)
+comes from those stitched trades.
+
+CLI:
+    python walk_forward.py --strategy "RSI Reversal" --windows 4 \\
+        --range rsi=25:45:5 --range rsi_period=10,14
+"""
+
+import sys
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backtest_runner import (Target, curve_drawdown, load_strategy, load_target, portfolio_curve, process_pool,
+                             resolve_targets, worker_count)
+from backtesting_engine import get_backtest_engine, uses_adx
+from indicator_graph import strategy_conditions
+from strategy_optimizer import METRICS, apply_params, build_grid, evaluate, rank
+
+WARMUP = 50  # Bars of history backtest_strategy needs before its first trade
+
+# Worker side: blocks this process has mapped, by name
+_ATTACHED: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def window_rows(rows: int, windows: int, index: int) -> Tuple[int, int]:
+    """(start row, stop row) of window `index` of a series"""
+    return index * rows // windows, (index + 1) * rows // windows
+
+
+def _slice(data: Dict, lo: int, hi: int) -> Tuple[np.ndarray, Dict]:
+    """Candles + indicator memo of rows lo:hi, with WARMUP rows of history before lo"""
+    lo = max(0, lo - WARMUP)
+    memo = {key: tuple(part[lo:hi] for part in value) if isinstance(value, tuple) else value[lo:hi]
+            for key, value in data.items() if key != 'candles'}
+    return data['candles'][lo:hi], memo
+
+
+def compute_series(strategy: Dict, grid: List[Tuple[Dict, List[Dict]]], targets: List[Target],
+                   options: Dict) -> Dict[str, Dict]:
+    """{label: {'candles': candles, (indicator, period): series}} for every period set of the grid"""
+    engine = get_backtest_engine()
+    with_adx = uses_adx(list(strategy_conditions(strategy)))
+    base = strategy.get('indicator_params', {})
+
+    arrays = {}
+    for target in targets:
+        candles = load_target(target, options)
+        memo = {}
+        if len(candles):
+            for periods, _ in grid:
+                engine._calculate_indicator_series(candles, {**base, **periods}, memo, with_adx=with_adx)
+        arrays[target[0]] = {'candles': candles, **memo}
+    return arrays
+
+
+class SharedSeries:
+    """
+    Parent side: every array of compute_series() in one shared memory block
+
+    layout maps label -> key -> (offset, shape, tuple?) in float64 items;
+    pass (name, layout) to attach() in a worker.
+    """
+
+    def __init__(self, arrays: Dict[str, Dict]):
+        self.layout: Dict[str, Dict] = {}
+        parts = []
+        size = 0
+        for label, data in arrays.items():
+            entries = self.layout[label] = {}
+            for key, value in data.items():
+                stacked = np.asarray(value, dtype=np.float64)  # (indicator, period) tuples -> (k, n)
+                entries[key] = (size, stacked.shape, isinstance(value, tuple))
+                parts.append(stacked)
+                size += stacked.size
+
+        self.block = shared_memory.SharedMemory(create=True, size=max(1, size) * 8)
+        flat = np.ndarray((size,), dtype=np.float64, buffer=self.block.buf)
+        offset = 0
+        for stacked in parts:
+            flat[offset:offset + stacked.size] = stacked.ravel()
+            offset += stacked.size
+        del flat  # The block can only be closed once no array uses its buffer
+
+    @property
+    def name(self) -> str:
+        return self.block.name
+
+    def close(self):
+        try:
+            self.block.close()
+            self.block.unlink()
+        except (FileNotFoundError, BufferError):
+            pass
+
+
+def attach(name: str, layout: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Read-only views of a SharedSeries block, in the compute_series() shape (worker side)"""
+    block = _ATTACHED.get(name)
+    if block is None:
+        block = shared_memory.SharedMemory(name=name)
+        _ATTACHED[name] = block
+
+    arrays = {}
+    for label, entries in layout.items():
+        data = arrays[label] = {}
+        for key, (offset, shape, is_tuple) in entries.items():
+            view = np.ndarray(shape, dtype=np.float64, buffer=block.buf, offset=offset * 8)
+            view.flags.writeable = False
+            data[key] = tuple(view) if is_tuple else view
+    return arrays
+
+
+def run_fold(strategy: Dict, grid: List[Tuple[Dict, List[Dict]]], fold: int, windows: int,
+             targets: List[Target], arrays: Dict[str, Dict], options: Dict) -> Dict:
+    """Optimise on window `fold`, backtest the best combination on window fold + 1 (params None: unoptimised)"""
+    train, test = [], []
+    for target in targets:
+        data = arrays[target[0]]
+        rows = len(data['candles'])
+        train.append((target, *_slice(data, *window_rows(rows, windows, fold))))
+        test.append((target, *_slice(data, *window_rows(rows, windows, fold + 1))))
+
+    evaluated = []
+    for periods, thresholds in grid:
+        for combo in thresholds:
+            params = {**periods, **combo}
+            evaluated.append((params, evaluate(apply_params(strategy, params), train, options)[0]))
+    params, in_sample = rank(evaluated, options['metric'], options['min_trades'])[0]
+    in_sample.pop('per_asset')
+    if in_sample['total_trades'] < options['min_trades']:
+        # rank() puts combinations below min_trades last - none reached it
+        return {'fold': fold, 'params': None, 'in_sample': in_sample, 'out_of_sample': None, 'curves': {}}
+
+    out_of_sample, results = evaluate(apply_params(strategy, params), test, options)
+    out_of_sample.pop('per_asset')
+    return {
+        'fold': fold,
+        'params': params,
+        'in_sample': in_sample,
+        'out_of_sample': out_of_sample,
+        'curves': {label: result['equity_curve'] for label, result in results if 'equity_curve' in result},
+    }
+
+
+def _fold_task(strategy: Dict, grid: List[Tuple[Dict, List[Dict]]], fold: int, windows: int,
+               targets: List[Target], name: str, layout: Dict[str, Dict], options: Dict) -> Dict:
+    """Pool entry point: map the shared series, then run_fold()"""
+    return run_fold(strategy, grid, fold, windows, targets, attach(name, layout), options)
+
+
+def stitch(folds: List[Dict], initial_balance: float) -> Dict[str, List[List[float]]]:
+    """{label: out-of-sample curve} - each fold's curve scaled to where the previous one ended"""
+    stitched: Dict[str, List[List[float]]] = {}
+    scale: Dict[str, float] = {}
+    for fold in folds:
+        for label, curve in fold['curves'].items():
+            factor = scale.get(label, 1.0)
+            stitched.setdefault(label, []).extend([ts, balance * factor] for ts, balance in curve)
+            if curve:
+                scale[label] = factor * curve[-1][1] / initial_balance
+    return stitched
+
+
+def curve_profits(curve: List[List[float]], initial_balance: float) -> List[float]:
+    """Profit of every trade of a stitched curve (balance changes from initial_balance on)"""
+    balances = [initial_balance] + [balance for _, balance in curve]
+    return [after - before for before, after in zip(balances, balances[1:])]
+
+
+def walk_forward(strategy, ranges: Dict, assets='all', files: Optional[List[str]] = None,
+                 timeframes: Optional[List[int]] = None, windows: int = 4, metric: str = 'profit_factor',
+                 min_trades: int = 10, workers: int = 0, start=None, end=None,
+                 initial_balance: float = 100.0, payout_percent: float = 85.0,
+                 min_data_quality: float = 0.8) -> Dict:
+    """
+    Walk-forward analysis of a strategy (config dict, or id / name / JSON file) over ranges
+
+    windows - 1 folds: fold k is optimised on window k and tested on window k + 1.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric '{metric}' (one of {', '.join(METRICS)})")
+    if windows < 2:
+        raise ValueError('Walk-forward needs at least 2 windows')
+
+    started = time.perf_counter()
+    strategy_config = load_strategy(strategy) if isinstance(strategy, str) else strategy
+    grid = build_grid(strategy_config, ranges)
+    if not grid:
+        raise ValueError('No valid parameter combinations (fast_period must be below slow_period)')
+
+    targets = resolve_targets(assets, files, timeframes)
+    if not targets:
+        raise ValueError('No historical data for the requested assets/files')
+    options = {
+        'start': start, 'end': end, 'limit': None,
+        'initial_balance': initial_balance, 'payout_percent': payout_percent,
+        'min_data_quality': min_data_quality, 'metric': metric, 'min_trades': min_trades,
+    }
+
+    # ⚡ Every indicator series once, over the full length of every series
+    arrays = compute_series(strategy_config, grid, targets, options)
+
+    folds = windows - 1
+    # Each fold backtests every combination in-sample plus the winner out-of-sample
+    combinations = sum(len(thresholds) for _, thresholds in grid)
+    workers = worker_count(workers, folds, folds * (combinations + 1) * len(targets))
+    if workers == 1:
+        results = [run_fold(strategy_config, grid, fold, windows, targets, arrays, options) for fold in range(folds)]
+    else:
+        shared = SharedSeries(arrays)
+        try:
+            with process_pool(workers) as executor:
+                futures = [executor.submit(_fold_task, strategy_config, grid, fold, windows, targets,
+                                           shared.name, shared.layout, options)
+                           for fold in range(folds)]
+                results = [future.result() for future in futures]
+        finally:
+            shared.close()
+
+    stitched = stitch(results, initial_balance)
+    curve = portfolio_curve(list(stitched.values()), initial_balance)
+    starting = initial_balance * len(stitched)
+    final_balance = curve[-1][1] if curve else starting
+    profits = [profit for stitched_curve in stitched.values()
+               for profit in curve_profits(stitched_curve, initial_balance)]
+    wins = sum(1 for profit in profits if profit > 0)
+    losses = len(profits) - wins
+    gross_profit = sum(profit for profit in profits if profit > 0)
+    gross_loss = -sum(profit for profit in profits if profit < 0)
+
+    for fold in results:
+        del fold['curves']
+    return {
+        'strategy': strategy_config.get('name', strategy if isinstance(strategy, str) else None),
+        'metric': metric,
+        'windows': windows,
+        'combinations': combinations,
+        'targets': len(targets),
+        'workers': workers,
+        'elapsed_sec': round(time.perf_counter() - started, 3),
+        'folds': results,
+        'out_of_sample': {
+            'unoptimised_folds': sum(1 for fold in results if fold['params'] is None),
+            'assets_tested': len(stitched),
+            'total_trades': wins + losses,
+            'wins': wins,
+            'losses': losses,
+            'win_rate': round(wins / (wins + losses) * 100, 2) if wins + losses else 0.0,
+            'initial_balance': starting,
+            'final_balance': round(final_balance, 2),
+            'total_profit': round(final_balance - starting, 2),
+            'profit_percent': round((final_balance - starting) / starting * 100, 2) if starting else 0.0,
+            'profit_factor': round(gross_profit / gross_loss, 2) if gross_loss > 0 else 0,
+            'max_drawdown': round(curve_drawdown(curve, starting), 2),
+        },
+        'equity_curve': [[ts, round(equity, 4)] for ts, equity in curve],
+    }
+
+
+def main(argv=None):
+    import argparse
+
+    from strategy_optimizer import parse_ranges
+
+    parser = argparse.ArgumentParser(description='Walk-forward analysis of a custom strategy on the historical dataset')
+    parser.add_argument('--strategy', required=True, help='Strategy id / name in custom_strategies.json, or JSON file')
+    parser.add_argument('--range', action='append', default=[], metavar='KEY=SPEC',
+                        help="e.g. rsi=60:80:2, entry_conditions.4=15,20,25, condition_groups.0.2=55,60, fast_period=5,9")
+    parser.add_argument('--windows', type=int, default=4, help='Windows per series (windows - 1 folds)')
+    parser.add_argument('--metric', default='profit_factor', choices=sorted(METRICS))
+    parser.add_argument('--min-trades', type=int, default=10, help='Rank combinations with fewer trades last')
+    parser.add_argument('--assets', default='all', help="Comma-separated assets, or 'all'")
+    parser.add_argument('--files', nargs='*', default=[], help='CSV files instead of dataset assets')
+    parser.add_argument('--timeframe', type=int, action='append', help='60 and/or 300 (default: all)')
+    parser.add_argument('--workers', type=int, default=0, help='Processes (0 = one per CPU core)')
+    args = parser.parse_args(argv)
+
+    ranges = parse_ranges(args.range)
+    if not ranges:
+        parser.error('at least one --range is required')
+
+    report = walk_forward(args.strategy, ranges, assets=None if args.files else args.assets, files=args.files,
+                          timeframes=args.timeframe, windows=args.windows, metric=args.metric,
+                          min_trades=args.min_trades, workers=args.workers)
+
+    print(f"\n🚶 {report['strategy']}: {report['windows']} windows x {report['targets']} series, "
+          f"{report['combinations']} combinations, {report['workers']} workers, {report['elapsed_sec']}s")
+    for fold in report['folds']:
+        ins, oos = fold['in_sample'], fold['out_of_sample']
+        if fold['params'] is None:
+            print(f"   {fold['fold'] + 1}. ⚠️ unoptimised: no combination reached {args.min_trades} trades "
+                  f"(best had {ins['total_trades']}) - window {fold['fold'] + 2} not traded")
+            continue
+        print(f"   {fold['fold'] + 1}. {fold['params']}")
+        print(f"      in-sample  trades {ins['total_trades']:>4} | win {ins['win_rate']:>6.2f}% | PF {ins['profit_factor']}")
+        print(f"      out-sample trades {oos['total_trades']:>4} | win {oos['win_rate']:>6.2f}% | PF {oos['profit_factor']}")
+
+    oos = report['out_of_sample']
+    print(f"\n   Out-of-sample: {oos['total_trades']} trades | Win rate: {oos['win_rate']}% | "
+          f"Profit factor: {oos['profit_factor']} | Max drawdown: {oos['max_drawdown']}%")
+    print(f"   Profit: {oos['total_profit']} ({oos['profit_percent']}%)")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
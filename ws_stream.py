@@ -0,0 +1,454 @@
+"""
+WebSocket Stream - Pocket Option frame ingestion from Chrome
+Event-driven DevTools subscriber with a performance-log polling fallback
+
+Two ways to get WebSocket frames out of the browser:
+1. poll: drain driver.get_log('performance') (every network event, JSON x2)
+2. cdp:  open our own DevTools connection, enable the Network domain and
+         keep only Network.webSocketFrameReceived events, pushed into an
+         asyncio queue the moment Chrome emits them
+
+Both paths yield the same thing - decoded payload strings - so every bot's
+websocket_log() only has to call read_payloads(driver).
+
+A dropped or failed CDP subscription is re-attached from wait_for_frames()
+with a growing backoff. Until then frames are polled from the log when
+Chrome was started with performance logging; when it wasn't, the stream is
+reported 'stalled' by get_status() / status_message() instead of quietly
+returning nothing.
+
+decode() then classifies each payload by its first bytes, so ticks skip
+json.loads entirely and message types we don't use are never parsed.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# websockets is optional - without it we stay on performance-log polling
+try:
+    import websockets
+    CDP_AVAILABLE = True
+except ImportError:
+    CDP_AVAILABLE = False
+
+FRAME_EVENT = 'Network.webSocketFrameReceived'
+RECONNECT_MIN = 2.0    # Seconds before the first re-attach attempt
+RECONNECT_MAX = 60.0   # Backoff cap between attempts
+_FRAME_EVENT_TOKEN = f'"{FRAME_EVENT}"'
+
+
+# Payload kinds
+TICK = 'tick'          # [["EURUSD_otc",1707138060.123,1.08123]]
+HISTORY = 'history'    # {"asset":...,"period":60,"history":[...],"candles":[...]}
+UNKNOWN = 'unknown'    # Balances, deals, asset lists... - skipped unparsed
+MALFORMED = 'malformed'
+
+
+class DecodeStats:
+    """Per payload kind counters: frames, bytes and decode time"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self.started_at = time.time()
+
+    def record(self, kind: str, nbytes: int, elapsed_ns: int):
+        counter = self.counters.get(kind)
+        if counter is None:
+            counter = self.counters[kind] = {'frames': 0, 'bytes': 0, 'decode_ns': 0}
+        counter['frames'] += 1
+        counter['bytes'] += nbytes
+        counter['decode_ns'] += elapsed_ns
+
+    def summary(self) -> Dict:
+        """JSON-friendly snapshot for the API"""
+        elapsed = max(time.time() - self.started_at, 1e-9)
+        total_ns = sum(c['decode_ns'] for c in self.counters.values()) or 1
+        kinds = {}
+        for kind, c in self.counters.items():
+            kinds[kind] = {
+                'frames': c['frames'],
+                'bytes': c['bytes'],
+                'frames_per_sec': round(c['frames'] / elapsed, 2),
+                'avg_decode_us': round(c['decode_ns'] / c['frames'] / 1000, 2),
+                'cpu_share_pct': round(c['decode_ns'] * 100 / total_ns, 1),
+            }
+        return {'uptime_sec': round(elapsed, 1), 'kinds': kinds}
+
+
+decode_stats = DecodeStats()
+
+
+def get_decode_stats() -> DecodeStats:
+    return decode_stats
+
+
+def classify_payload(payload: str) -> str:
+    """Cheap prefix check - no parsing"""
+    if payload.startswith('[["'):
+        return TICK
+    if payload.startswith('{') and '"history"' in payload:
+        return HISTORY
+    return UNKNOWN
+
+
+def parse_tick(payload: str) -> Tuple[str, float, float]:
+    """
+    Parse the first tick of a [[asset, ts, price], ...] payload without json
+
+    Raises ValueError on anything that doesn't look like a tick.
+    """
+    end = payload.find('"', 3)
+    close = payload.find(']', end)
+    if end < 0 or close < 0:
+        raise ValueError("not a tick payload")
+
+    fields = payload[end + 1:close].split(',')
+    # fields[0] is the empty string before the first comma
+    return payload[3:end], float(fields[1]), float(fields[2])
+
+
+def decode(payload: str) -> Tuple[str, Any]:
+    """
+    Classify and parse one payload
+
+    Returns:
+        (TICK, (asset, ts, price)) | (HISTORY, dict) | (UNKNOWN, None) | (MALFORMED, None)
+    """
+    started = time.perf_counter_ns()
+    kind = classify_payload(payload)
+    result = None
+    try:
+        if kind == TICK:
+            result = parse_tick(payload)
+        elif kind == HISTORY:
+            result = json.loads(payload)
+    except (ValueError, IndexError):
+        kind = MALFORMED
+
+    decode_stats.record(kind, len(payload), time.perf_counter_ns() - started)
+    return kind, result
+
+
+def needs_performance_log(mode: str = 'cdp') -> bool:
+    """
+    Whether Chrome must be started with performance logging
+
+    Only the polling path reads the log. In CDP mode leaving it on would make
+    chromedriver buffer every network event nobody ever collects.
+    """
+    return mode != 'cdp' or not CDP_AVAILABLE
+
+
+def decode_payload(response: Dict) -> Optional[str]:
+    """Decode a binary (opcode 2) frame payload to text, None for anything else"""
+    if response.get('opcode', 0) != 2:
+        return None
+    return base64.b64decode(response['payloadData']).decode('utf-8')
+
+
+def get_debugger_address(driver) -> Optional[str]:
+    """host:port of the browser's DevTools endpoint"""
+    options = getattr(driver, 'options', None)
+    address = getattr(options, 'debugger_address', None)
+    if address:
+        return address
+
+    capabilities = getattr(driver, 'capabilities', {}) or {}
+    return capabilities.get('goog:chromeOptions', {}).get('debuggerAddress')
+
+
+class CDPFrameSubscriber:
+    """
+    Subscribe to WebSocket frames over the Chrome DevTools Protocol
+
+    Runs as a task on the caller's event loop. Frames are decoded once on
+    arrival and queued; consumers drain() them or wait() for the next one.
+    """
+
+    def __init__(self, debugger_address: str, page_hint: str = '', max_queue: int = 10000):
+        self.debugger_address = debugger_address
+        self.page_hint = page_hint
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.connected = False
+        self.frames_received = 0
+        self.frames_dropped = 0
+        self._arrived = asyncio.Event()
+        self._task = None
+        self._ws = None
+        self._next_id = 0
+
+    def _find_page_socket(self) -> str:
+        """Pick the page target to attach to (the Pocket Option tab if we can tell)"""
+        with urllib.request.urlopen(f'http://{self.debugger_address}/json', timeout=5) as response:
+            targets = json.loads(response.read().decode('utf-8'))
+
+        pages = [t for t in targets if t.get('type') == 'page' and t.get('webSocketDebuggerUrl')]
+        if not pages:
+            raise ConnectionError(f"No page targets at {self.debugger_address}")
+
+        for target in pages:
+            if self.page_hint and self.page_hint in target.get('url', ''):
+                return target['webSocketDebuggerUrl']
+        return pages[0]['webSocketDebuggerUrl']
+
+    async def _send(self, method: str, params: Optional[Dict] = None):
+        self._next_id += 1
+        await self._ws.send(json.dumps({'id': self._next_id, 'method': method, 'params': params or {}}))
+
+    async def start(self):
+        """Connect, enable network events and start the reader task"""
+        socket_url = await asyncio.get_running_loop().run_in_executor(None, self._find_page_socket)
+        self._ws = await websockets.connect(socket_url, max_size=None)
+        await self._send('Network.enable')
+        self.connected = True
+        self._task = asyncio.ensure_future(self._read_frames())
+
+    async def stop(self):
+        """Close the DevTools connection"""
+        self.connected = False
+        if self._task:
+            self._task.cancel()
+        if self._ws:
+            await self._ws.close()
+
+    def _push(self, payload: str):
+        if self.queue.full():
+            # Keep the newest data - stale ticks are worth less than fresh ones
+            self.queue.get_nowait()
+            self.frames_dropped += 1
+        self.queue.put_nowait(payload)
+        self.frames_received += 1
+        self._arrived.set()
+
+    async def _read_frames(self):
+        try:
+            async for raw in self._ws:
+                # Cheap substring test first - most DevTools traffic is not a frame
+                if _FRAME_EVENT_TOKEN not in raw:
+                    continue
+
+                message = json.loads(raw)
+                if message.get('method') != FRAME_EVENT:
+                    continue
+
+                payload = decode_payload(message.get('params', {}).get('response', {}))
+                if payload is not None:
+                    self._push(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ CDP frame subscriber stopped: {e}")
+        finally:
+            self.connected = False
+            self._arrived.set()  # Wake any waiter so it can fall back
+
+    def drain(self) -> List[str]:
+        """Return all queued payloads without blocking"""
+        payloads = []
+        while not self.queue.empty():
+            payloads.append(self.queue.get_nowait())
+        self._arrived.clear()
+        return payloads
+
+    async def wait(self, timeout: float) -> bool:
+        """Wait until a frame is queued (True) or the timeout passes (False)"""
+        if not self.queue.empty():
+            return True
+        self._arrived.clear()
+        try:
+            await asyncio.wait_for(self._arrived.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return not self.queue.empty()
+
+
+class StreamStatus:
+    """Which path delivers a driver's frames ('cdp', 'poll' or 'stalled'), and why"""
+
+    def __init__(self, page_hint: str = ''):
+        self.page_hint = page_hint
+        self.mode = 'poll'
+        self.error: Optional[str] = None
+        self.since = time.time()
+        self.reconnects = 0
+        self.failures = 0
+        self.retry_at: Optional[float] = None  # Next re-attach attempt, None = don't
+        self.reported: Optional[str] = None    # Mode last returned by status_message()
+
+    def set_mode(self, mode: str, error: Optional[str] = None):
+        if mode != self.mode:
+            self.mode = mode
+            self.since = time.time()
+        self.error = error
+
+    def schedule_retry(self):
+        self.retry_at = time.time() + min(RECONNECT_MAX, RECONNECT_MIN * 2 ** self.failures)
+
+    def to_dict(self) -> Dict:
+        return {
+            'mode': self.mode,
+            'error': self.error,
+            'since': self.since,
+            'reconnects': self.reconnects,
+            'retrying': self.retry_at is not None,
+        }
+
+
+# Active subscribers and ingestion status, one per driver
+_subscribers: Dict[int, CDPFrameSubscriber] = {}
+_status: Dict[int, StreamStatus] = {}
+
+
+def _get_status(driver) -> StreamStatus:
+    status = _status.get(id(driver))
+    if status is None:
+        status = _status[id(driver)] = StreamStatus()
+    return status
+
+
+async def attach(driver, page_hint: str = '') -> bool:
+    """
+    Switch a driver to event-driven ingestion
+
+    Returns True when the DevTools subscription is live. On False the caller
+    keeps working through performance-log polling, and if the subscription
+    failed (rather than being unsupported) wait_for_frames() retries it.
+    """
+    status = _get_status(driver)
+    status.page_hint = page_hint
+    if not CDP_AVAILABLE:
+        return False
+
+    address = get_debugger_address(driver)
+    if not address:
+        return False
+
+    subscriber = CDPFrameSubscriber(address, page_hint=page_hint)
+    try:
+        await subscriber.start()
+    except Exception as e:
+        logger.warning(f"⚠️ CDP subscribe failed ({address}): {e}")
+        status.failures += 1
+        status.schedule_retry()
+        return False
+
+    old = _subscribers.pop(id(driver), None)
+    if old:
+        await old.stop()
+    _subscribers[id(driver)] = subscriber
+    status.set_mode('cdp')
+    status.failures = 0
+    status.retry_at = None
+    return True
+
+
+async def detach(driver):
+    """Stop the driver's subscriber (if any) and forget its status"""
+    _status.pop(id(driver), None)
+    subscriber = _subscribers.pop(id(driver), None)
+    if subscriber:
+        await subscriber.stop()
+
+
+def get_status(driver) -> Dict:
+    """Ingestion status of a driver (see StreamStatus)"""
+    return _get_status(driver).to_dict()
+
+
+def status_message(driver) -> Optional[str]:
+    """A log line when the driver's ingestion mode changed since the last call, else None"""
+    status = _get_status(driver)
+    if status.mode == status.reported:
+        return None
+    first = status.reported is None
+    status.reported = status.mode
+
+    if status.mode == 'stalled':
+        retry = ' - retrying the CDP stream' if status.retry_at is not None else ''
+        return f"❌ WebSocket ingestion stalled: {status.error}{retry}"
+    if status.mode == 'cdp':
+        return None if first else "📡 Live WebSocket stream reconnected (CDP)"
+    return None if first else "⚠️ CDP stream lost - polling the performance log"
+
+
+def get_subscriber(driver) -> Optional[CDPFrameSubscriber]:
+    return _subscribers.get(id(driver))
+
+
+def read_payloads(driver) -> List[str]:
+    """
+    Decoded payloads of all WebSocket frames received since the last call
+
+    Uses the CDP queue when a live subscriber is attached, otherwise drains
+    the performance log (skipping non-frame events before JSON decoding).
+    """
+    subscriber = _subscribers.get(id(driver))
+    if subscriber:
+        payloads = subscriber.drain()
+        if subscriber.connected:
+            return payloads
+        # Connection dropped - hand back what was queued, poll until wait_for_frames() re-attaches
+        _subscribers.pop(id(driver), None)
+        status = _get_status(driver)
+        status.set_mode('poll')
+        status.schedule_retry()
+        logger.warning("⚠️ CDP frame subscriber disconnected - falling back to log polling")
+        return payloads + _poll_payloads(driver)
+
+    return _poll_payloads(driver)
+
+
+def _poll_payloads(driver) -> List[str]:
+    payloads = []
+    status = _get_status(driver)
+    try:
+        entries = driver.get_log('performance')
+    except Exception as e:
+        # Chrome started without performance logging (CDP mode) - nothing to poll
+        if status.mode != 'stalled':
+            logger.warning(f"⚠️ Performance log unavailable, no WebSocket frames until CDP reconnects: {e}")
+        status.set_mode('stalled', f"performance log unavailable ({e})")
+        return payloads
+
+    status.set_mode('poll')
+
+    for entry in entries:
+        raw = entry['message']
+        if _FRAME_EVENT_TOKEN not in raw:
+            continue
+        message = json.loads(raw)['message']
+        payload = decode_payload(message.get('params', {}).get('response', {}))
+        if payload is not None:
+            payloads.append(payload)
+    return payloads
+
+
+async def wait_for_frames(driver, timeout: float):
+    """
+    Sleep until new frames arrive (CDP mode) or for the full timeout (poll mode)
+
+    Without a live subscriber this is also where a failed or dropped CDP
+    subscription is re-attached, once its backoff has passed.
+    """
+    subscriber = _subscribers.get(id(driver))
+    if subscriber and subscriber.connected:
+        await subscriber.wait(timeout)
+        return
+
+    status = _status.get(id(driver))
+    if status and status.retry_at is not None and time.time() >= status.retry_at:
+        if await attach(driver, status.page_hint):
+            status.reconnects += 1
+            logger.info("📡 CDP frame subscriber reconnected")
+            return
+    await asyncio.sleep(timeout)